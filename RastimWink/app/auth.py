@@ -1,25 +1,34 @@
+from dataclasses import dataclass
 from datetime import datetime, timedelta
+from typing import Optional
 import os
 from jose import jwt, JWTError
-from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
-from app.database import get_db
-from app.crud.user import get_user_by_email, get_user_by_id
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db
+from app.core.config import settings
+from app.core.security import pwd_context, get_password_hash, verify_password, verify_and_update_password
+from app.core.revocation import token_versions
+from app.core.password_pool import password_hasher
+from app.crud.user import get_user_by_email, update_password_hash
+from app.crud import aio
+from app.models.user import UserRole
 
 SECRET_KEY = os.getenv("SECRET_KEY", "krasnodiplomshik")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24
 
-pwd_context = CryptContext(schemes = ["bcrypt"], deprecated = "auto")
 security = HTTPBearer()
 
-def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
-
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+@dataclass(frozen = True)
+class Principal:
+    """Caller identity taken from the token claims alone."""
+    id: int
+    role: UserRole
+    department_id: Optional[int]
+    token_version: int
 
 def create_access_token(data: dict, expires_delta: timedelta = None):
     to_encode = data.copy()
@@ -27,25 +36,73 @@ def create_access_token(data: dict, expires_delta: timedelta = None):
     to_encode.update({"exp": expire})
     return jwt.encode(to_encode, SECRET_KEY, algorithm = ALGORITHM)
 
+def create_user_access_token(user, expires_delta: timedelta = None):
+    role = user.role.value if isinstance(user.role, UserRole) else user.role
+    return create_access_token({
+        "sub": str(user.id),
+        "role": role,
+        "dept": user.department_id,
+        "ver": user.token_version or 0
+    }, expires_delta)
+
 def authenticate_user(db: Session, email: str, password: str):
     user = get_user_by_email(db, email)
     if not user or not user.password_hash:
         return None
-    if not verify_password(password, user.password_hash):
+    ok, new_hash = verify_and_update_password(password, user.password_hash)
+    if not ok:
+        return None
+    if new_hash:
+        update_password_hash(db, user, new_hash)
+    return user
+
+async def authenticate_user_async(db: AsyncSession, email: str, password: str):
+    """``authenticate_user`` with the hash check on the password worker pool."""
+    user = await aio.user.get_user_by_email(db, email)
+    if not user or not user.password_hash:
+        return None
+    ok, new_hash = await password_hasher.verify_and_update(password, user.password_hash)
+    if not ok:
         return None
+    if new_hash:
+        await aio.user.update_password_hash(db, user, new_hash)
     return user
 
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security), db: Session = Depends(get_db)):
-    token = credentials.credentials
+def _decode_token(token: str) -> dict:
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms = [ALGORITHM])
-        sub = payload.get("sub")
-        if sub is None:
+        if payload.get("sub") is None:
             raise HTTPException(status_code = status.HTTP_401_UNAUTHORIZED)
-        user_id = int(sub)
+        payload["sub"] = int(payload["sub"])
     except (JWTError, ValueError):
         raise HTTPException(status_code = status.HTTP_401_UNAUTHORIZED)
-    user = get_user_by_id(db, user_id)
+    return payload
+
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security), db: AsyncSession = Depends(get_async_db)):
+    payload = _decode_token(credentials.credentials)
+    user = await aio.user.get_cached_user_by_id(db, payload["sub"])
     if not user:
         raise HTTPException(status_code = status.HTTP_401_UNAUTHORIZED)
-    return user
\ No newline at end of file
+    # Tokens issued before versioning carry no "ver"; they count as version 0,
+    # so logging out revokes them too.
+    if payload.get("ver", 0) < user.token_version:
+        raise HTTPException(status_code = status.HTTP_401_UNAUTHORIZED)
+    return user
+
+async def get_current_principal(credentials: HTTPAuthorizationCredentials = Depends(security), db: AsyncSession = Depends(get_async_db)) -> Principal:
+    """Authorize from the token claims for endpoints that only need id, role and department.
+
+    With ``AUTH_STATELESS`` enabled this does no per-request query: revocation
+    is checked against the in-memory token version registry. Otherwise, and for
+    tokens issued without claims, the user is loaded as in ``get_current_user``."""
+    payload = _decode_token(credentials.credentials)
+    if settings.AUTH_STATELESS and "role" in payload and "ver" in payload:
+        if not await token_versions.is_current_async(db, payload["sub"], payload["ver"]):
+            raise HTTPException(status_code = status.HTTP_401_UNAUTHORIZED)
+        try:
+            role = UserRole(payload["role"])
+        except ValueError:
+            raise HTTPException(status_code = status.HTTP_401_UNAUTHORIZED)
+        return Principal(payload["sub"], role, payload.get("dept"), payload["ver"])
+    user = await get_current_user(credentials, db)
+    return Principal(user.id, user.role, user.department_id, user.token_version)
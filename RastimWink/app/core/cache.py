@@ -0,0 +1,92 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional
+from app.core.config import settings
+
+_MISSING = object()
+
+class TTLCache:
+    """Thread-safe in-process cache with per-entry TTL and LRU eviction.
+
+    Entries are not shared between workers, so every write path that changes a
+    cached entity must call ``invalidate``; the TTL bounds staleness for writes
+    made by other processes."""
+
+    def __init__(self, name: str, maxsize: int = settings.CACHE_MAX_ENTRIES, ttl: float = settings.CACHE_TTL_SECONDS):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        _caches[name] = self
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING and entry[1] > time.monotonic():
+                self._data.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            if entry is not _MISSING:
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key: Hashable, value: Any):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last = False)
+                self.evictions += 1
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """Cached value for ``key``, calling ``loader`` on a miss. None results are not cached."""
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = loader()
+            if value is not None:
+                self.set(key, value)
+        return value
+
+    def invalidate(self, *keys: Hashable):
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "name": self.name,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else None
+            }
+
+_caches: Dict[str, TTLCache] = {}
+
+def cache_stats() -> List[Dict[str, Any]]:
+    return [c.stats() for c in _caches.values()]
+
+def clear_caches(name: Optional[str] = None):
+    for cache in _caches.values():
+        if name is None or cache.name == name:
+            cache.clear()
+
+gar_weights_cache = TTLCache("gar_weights", maxsize = 1)
+users_by_id_cache = TTLCache("users_by_id")
+users_by_email_cache = TTLCache("users_by_email")
+departments_cache = TTLCache("departments", maxsize = 1024)
@@ -0,0 +1,136 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Optional
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.database import AsyncSessionLocal
+from app.crud.aio.stats import get_company_stats
+from app.models.user import User
+from app.models.task import Task
+from app.models.review import ManagerReview
+
+logger = logging.getLogger(__name__)
+
+class CompanyStatsSnapshot:
+    """Company KPIs served from memory.
+
+    A background task reloads them every ``refresh_interval`` seconds, and
+    sooner (but at most once per ``min_interval``) after a session in this
+    process writes users, tasks or reviews. Writes made by other workers show up
+    within one interval; ``as_of`` in the response says how old the numbers are."""
+
+    def __init__(self, refresh_interval: float = settings.COMPANY_STATS_REFRESH_SECONDS, min_interval: float = settings.COMPANY_STATS_MIN_REFRESH_SECONDS):
+        self.refresh_interval = refresh_interval
+        self.min_interval = min_interval
+        self.refreshes = 0
+        self.failures = 0
+        self._stats: Optional[dict] = None
+        self._as_of: Optional[datetime] = None
+        self._loaded_at = float("-inf")
+        self._lock = asyncio.Lock()
+        self._dirty: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def _load(self):
+        async with AsyncSessionLocal() as db:
+            stats = await get_company_stats(db)
+        self._stats = stats
+        self._as_of = datetime.now(timezone.utc)
+        self._loaded_at = time.monotonic()
+        self.refreshes += 1
+
+    async def refresh(self):
+        async with self._lock:
+            await self._load()
+
+    def _stale(self) -> bool:
+        # Without the background task (e.g. no lifespan) fall back to refresh-on-read.
+        return self._stats is None or (self._task is None and time.monotonic() - self._loaded_at > self.refresh_interval)
+
+    async def get(self) -> dict:
+        if self._stale():
+            async with self._lock:
+                # Requests that queued behind the first one's refresh reuse it.
+                if self._stale():
+                    await self._load()
+        return {**self._stats, "as_of": self._as_of, "age_seconds": round(time.monotonic() - self._loaded_at, 1)}
+
+    def mark_dirty(self):
+        """Request an early refresh; safe to call from any thread."""
+        if self._loop is not None and self._dirty is not None:
+            self._loop.call_soon_threadsafe(self._dirty.set)
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._dirty.wait(), timeout = self.refresh_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._dirty.clear()
+            try:
+                await self.refresh()
+            except Exception:
+                self.failures += 1
+                logger.exception("company stats refresh failed")
+            await asyncio.sleep(self.min_interval)
+
+    def start(self):
+        if self._task is None:
+            self._loop = asyncio.get_running_loop()
+            self._dirty = asyncio.Event()
+            self._dirty.set()
+            self._task = self._loop.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            self._loop = None
+
+    def stats(self) -> dict:
+        return {
+            "refreshes": self.refreshes,
+            "failures": self.failures,
+            "as_of": self._as_of,
+            "running": self._task is not None,
+        }
+
+company_stats = CompanyStatsSnapshot()
+
+_DIRTY_KEY = "company_stats_dirty"
+
+def _touches(objects, watched) -> bool:
+    return any(isinstance(obj, watched) for obj in objects)
+
+def watch_writes(*models):
+    """Mark the snapshot dirty when a session that flushed or bulk-wrote ``models`` commits."""
+
+    @event.listens_for(Session, "after_flush")
+    def _after_flush(session, flush_context):
+        if _touches(session.new, models) or _touches(session.dirty, models) or _touches(session.deleted, models):
+            session.info[_DIRTY_KEY] = True
+
+    @event.listens_for(Session, "do_orm_execute")
+    def _on_execute(orm_execute_state):
+        mapper = orm_execute_state.bind_mapper
+        if (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete) and mapper is not None and mapper.class_ in models:
+            orm_execute_state.session.info[_DIRTY_KEY] = True
+
+    @event.listens_for(Session, "after_commit")
+    def _after_commit(session):
+        if session.info.pop(_DIRTY_KEY, False):
+            company_stats.mark_dirty()
+
+    @event.listens_for(Session, "after_rollback")
+    def _after_rollback(session):
+        session.info.pop(_DIRTY_KEY, None)
+
+watch_writes(User, Task, ManagerReview)
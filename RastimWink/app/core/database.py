@@ -1,10 +1,105 @@
-from sqlalchemy import create_engine
+import threading
+import time
+from typing import Optional
+from sqlalchemy import create_engine, exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
 from app.core.config import settings
 
-engine = create_engine(settings.DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+class _PoolMetricsMixin:
+    """Checkout wait time and timeout counters on top of the QueuePool gauges.
+
+    The wait includes opening a new connection when the pool has to grow. The
+    counters live on the pool instance, so ``engine.dispose()`` resets them."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._metrics_lock = threading.Lock()
+        self._checkouts = 0
+        self._timeouts = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except exc.TimeoutError:
+            with self._metrics_lock:
+                self._timeouts += 1
+            raise
+        waited = time.perf_counter() - start
+        with self._metrics_lock:
+            self._checkouts += 1
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+        return conn
+
+    def stats(self) -> dict:
+        with self._metrics_lock:
+            checkouts, timeouts, wait_total, wait_max = self._checkouts, self._timeouts, self._wait_total, self._wait_max
+        return {
+            "size": self.size(),
+            "max_overflow": self._max_overflow,
+            "timeout": self._timeout,
+            "checked_in": self.checkedin(),
+            "checked_out": self.checkedout(),
+            "overflow": self.overflow(),
+            "checkouts": checkouts,
+            "timeouts": timeouts,
+            "wait_avg_ms": round(wait_total / checkouts * 1000, 3) if checkouts else 0.0,
+            "wait_max_ms": round(wait_max * 1000, 3),
+        }
+
+class InstrumentedQueuePool(_PoolMetricsMixin, QueuePool):
+    pass
+
+class InstrumentedAsyncQueuePool(_PoolMetricsMixin, AsyncAdaptedQueuePool):
+    pass
+
+def _connect_args(url: str) -> dict:
+    """Server-side statement timeout for Postgres drivers; 0 leaves the server default."""
+    timeout = settings.DB_STATEMENT_TIMEOUT_MS
+    u = make_url(url)
+    if not timeout or u.get_backend_name() != "postgresql":
+        return {}
+    if u.get_driver_name() == "asyncpg":
+        return {"server_settings": {"statement_timeout": str(timeout)}}
+    return {"options": f"-c statement_timeout={timeout}"}
+
+def _pool_kwargs() -> dict:
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+def async_database_url() -> str:
+    return settings.ASYNC_DATABASE_URL or settings.DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://", 1)
+
+def create_db_engine(url: Optional[str] = None):
+    url = url or settings.DATABASE_URL
+    return create_engine(url, poolclass = InstrumentedQueuePool, connect_args = _connect_args(url), **_pool_kwargs())
+
+def create_async_db_engine(url: Optional[str] = None):
+    url = url or async_database_url()
+    return create_async_engine(url, poolclass = InstrumentedAsyncQueuePool, connect_args = _connect_args(url), **_pool_kwargs())
+
+def pool_stats(engine) -> dict:
+    pool = getattr(engine, "sync_engine", engine).pool
+    if isinstance(pool, _PoolMetricsMixin):
+        return pool.stats()
+    return {"status": pool.status()}
+
+engine = create_db_engine()
+async_engine = create_async_db_engine()
+SessionLocal = sessionmaker(autocommit = False, autoflush = False, bind = engine)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush = False, expire_on_commit = False)
 Base = declarative_base()
 
 def get_db():
@@ -13,3 +108,7 @@ def get_db():
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
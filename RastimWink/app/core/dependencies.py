@@ -1,18 +1,19 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer
-from sqlalchemy.orm import Session
-from app.core.database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db
 from app.core.security import verify_token
-from app.models.user import User
+from app.crud.user import CachedUser
+from app.crud.aio.user import get_cached_user_by_email
 
 security = HTTPBearer()
 
-async def get_current_user(token: str = Depends(security), db: Session = Depends(get_db)) -> User:
+async def get_current_user(token: str = Depends(security), db: AsyncSession = Depends(get_async_db)) -> CachedUser:
     credentials_exception = HTTPException(status_code = status.HTTP_401_UNAUTHORIZED, detail = "Could not varidate credentials")
     email = verify_token(token.credentials)
     if email is None:
         raise credentials_exception
-    user = db.query(User).filter(User.email == email).first()
+    user = await get_cached_user_by_email(db, email)
     if user is None:
         raise credentials_exception
     
@@ -0,0 +1,268 @@
+import logging
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter, deque
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+class RequestMetrics:
+    """Database work done on behalf of the current request.
+
+    Filled by the engine-wide cursor hooks below; the context variable follows
+    the request into ``run_sync`` greenlets and threadpool calls. After
+    ``capture()`` the statements themselves and timed code sections are kept
+    too, as ``(offset, duration, name)`` relative to the request start, for the
+    slow request log."""
+
+    __slots__ = ("start", "queries", "db_time", "statements", "sections")
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.statements: Optional[List[tuple]] = None
+        self.sections: Optional[List[tuple]] = None
+
+    def capture(self):
+        if self.statements is None:
+            self.statements = []
+            self.sections = []
+
+    def server_timing(self, duration: float) -> str:
+        return f'db;dur={self.db_time * 1000:.2f};desc="{self.queries} queries", app;dur={duration * 1000:.2f}'
+
+_current: ContextVar[Optional[RequestMetrics]] = ContextVar("request_metrics", default = None)
+
+def current_request() -> Optional[RequestMetrics]:
+    return _current.get()
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+class _RouteMetrics:
+    __slots__ = ("latency", "queries", "db_time")
+
+    def __init__(self):
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.queries = Histogram(QUERY_BUCKETS)
+        self.db_time = Histogram(LATENCY_BUCKETS)
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _labels(**labels) -> str:
+    return ",".join(f'{name}="{_escape(str(value))}"' for name, value in labels.items())
+
+def _bound(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+class MetricsRegistry:
+    """Per-route request counters and histograms, rendered in the Prometheus
+    text format. Routes are labelled by their path template, so the series count
+    is bounded by the number of endpoints."""
+
+    def __init__(self, query_threshold: int = settings.METRICS_QUERY_THRESHOLD):
+        self.query_threshold = query_threshold
+        self._lock = threading.Lock()
+        self._routes: Dict[Tuple[str, str], _RouteMetrics] = {}
+        self._requests: Counter = Counter()
+        self._query_heavy: Counter = Counter()
+
+    def record(self, method: str, route: str, status: int, duration: float, request: RequestMetrics):
+        key = (method, route)
+        heavy = 0 < self.query_threshold < request.queries
+        with self._lock:
+            metrics = self._routes.get(key)
+            if metrics is None:
+                metrics = self._routes[key] = _RouteMetrics()
+            metrics.latency.observe(duration)
+            metrics.queries.observe(request.queries)
+            metrics.db_time.observe(request.db_time)
+            self._requests[(method, route, status)] += 1
+            if heavy:
+                self._query_heavy[key] += 1
+        if heavy:
+            logger.warning("%s %s ran %d queries (%.1f ms in the database, %.1f ms total)", method, route, request.queries, request.db_time * 1000, duration * 1000)
+
+    def reset(self):
+        with self._lock:
+            self._routes.clear()
+            self._requests.clear()
+            self._query_heavy.clear()
+
+    def render(self) -> str:
+        with self._lock:
+            snapshot = {key: _copy((m.latency, m.queries, m.db_time)) for key, m in self._routes.items()}
+            requests = dict(self._requests)
+            query_heavy = dict(self._query_heavy)
+
+        lines = [
+            "# HELP http_requests_total Requests handled, by route template and status code.",
+            "# TYPE http_requests_total counter",
+        ]
+        for (method, route, status), count in sorted(requests.items()):
+            lines.append(f"http_requests_total{{{_labels(method = method, route = route, status = status)}}} {count}")
+        for index, (name, kind, help_text) in enumerate((
+            ("http_request_duration_seconds", "histogram", "Request latency, from the first byte received to the end of the handler."),
+            ("http_request_db_queries", "histogram", "Database statements executed per request."),
+            ("http_request_db_duration_seconds", "histogram", "Time spent in database statements per request."),
+        )):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for (method, route), hists in sorted(snapshot.items()):
+                _render_histogram(lines, name, hists[index], _labels(method = method, route = route))
+        lines.append(f"# HELP http_requests_query_heavy_total Requests that ran more than {self.query_threshold} database statements.")
+        lines.append("# TYPE http_requests_query_heavy_total counter")
+        for (method, route), count in sorted(query_heavy.items()):
+            lines.append(f"http_requests_query_heavy_total{{{_labels(method = method, route = route)}}} {count}")
+        return "\n".join(lines) + "\n"
+
+def _copy(histograms) -> tuple:
+    copies = []
+    for h in histograms:
+        c = Histogram(h.buckets)
+        c.counts, c.sum, c.count = list(h.counts), h.sum, h.count
+        copies.append(c)
+    return tuple(copies)
+
+def _render_histogram(lines: list, name: str, h: Histogram, labels: str):
+    cumulative = 0
+    for bound, count in zip(h.buckets, h.counts):
+        cumulative += count
+        lines.append(f'{name}_bucket{{{labels},le="{_bound(bound)}"}} {cumulative}')
+    lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {h.count}')
+    lines.append(f"{name}_sum{{{labels}}} {h.sum:.6f}")
+    lines.append(f"{name}_count{{{labels}}} {h.count}")
+
+request_metrics = MetricsRegistry()
+
+def _timeline(entries: List[tuple], key: str) -> List[dict]:
+    return [{"at_ms": round(offset * 1000, 2), "ms": round(duration * 1000, 2), key: value} for offset, duration, value in entries]
+
+class SlowRequestLog:
+    """The last ``size`` captured requests that took at least ``threshold_ms``,
+    with the statements they ran. Only requests that opted into capture (see
+    ``app.core.profiling.profile_request``) are considered."""
+
+    def __init__(self, size: int = settings.SLOW_REQUEST_LOG_SIZE, threshold_ms: float = settings.SLOW_REQUEST_MS):
+        self.threshold_ms = threshold_ms
+        self._entries: deque = deque(maxlen = size)
+        self._lock = threading.Lock()
+
+    def observe(self, scope, status: int, duration: float, request: RequestMetrics):
+        if request.statements is None or duration * 1000 < self.threshold_ms:
+            return
+        entry = (datetime.now(timezone.utc), scope["method"], route_label(scope), scope["path"], scope.get("query_string", b"").decode("latin-1"),
+                 status, duration, request.queries, request.db_time, list(request.statements), list(request.sections))
+        with self._lock:
+            self._entries.append(entry)
+
+    def entries(self) -> List[dict]:
+        """Slowest first; statement text and timings are formatted only here."""
+        with self._lock:
+            entries = list(self._entries)
+        entries.sort(key = lambda e: e[6], reverse = True)
+        return [
+            {
+                "at": at, "method": method, "route": route, "path": path, "query": query, "status": status,
+                "duration_ms": round(duration * 1000, 2), "queries": queries, "db_ms": round(db_time * 1000, 2),
+                "truncated": queries > len(statements), "sections": _timeline(sections, "name"), "statements": _timeline(statements, "sql"),
+            }
+            for at, method, route, path, query, status, duration, queries, db_time, statements, sections in entries
+        ]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+slow_requests = SlowRequestLog()
+
+def route_label(scope) -> str:
+    # The router stores the matched route in the (shared) scope dict.
+    route = scope.get("route")
+    return getattr(route, "path", None) or UNMATCHED_ROUTE
+
+class MetricsMiddleware:
+    """Pure ASGI middleware: records latency and database usage per route and
+    optionally reports them to the client in a ``Server-Timing`` header.
+
+    The header is sent with the response start, so for streaming responses it
+    only covers the work done before the first byte."""
+
+    def __init__(self, app, registry: MetricsRegistry = request_metrics, slow_log: SlowRequestLog = slow_requests, server_timing: bool = settings.METRICS_SERVER_TIMING):
+        self.app = app
+        self.registry = registry
+        self.slow_log = slow_log
+        self.server_timing = server_timing
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        request = RequestMetrics()
+        token = _current.set(request)
+        status = 500
+
+        async def send_with_metrics(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if self.server_timing:
+                    timing = request.server_timing(time.perf_counter() - request.start)
+                    message = {**message, "headers": [*message.get("headers", ()), (b"server-timing", timing.encode("latin-1"))]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            _current.reset(token)
+            duration = time.perf_counter() - request.start
+            self.registry.record(scope["method"], route_label(scope), status, duration, request)
+            self.slow_log.observe(scope, status, duration, request)
+
+_STARTED_KEY = "_request_metrics_started"
+
+def instrument_engines():
+    """Count statements and their time against the current request, for every engine.
+
+    Outside a request the hooks only do a context variable lookup."""
+
+    @event.listens_for(Engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if context is not None and _current.get() is not None:
+            setattr(context, _STARTED_KEY, time.perf_counter())
+
+    @event.listens_for(Engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        request = _current.get()
+        started = getattr(context, _STARTED_KEY, None)
+        if request is not None and started is not None:
+            elapsed = time.perf_counter() - started
+            request.queries += 1
+            request.db_time += elapsed
+            if request.statements is not None and len(request.statements) < settings.SLOW_REQUEST_MAX_STATEMENTS:
+                request.statements.append((started - request.start, elapsed, statement))
+
+instrument_engines()
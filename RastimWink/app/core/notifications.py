@@ -0,0 +1,221 @@
+import asyncio
+import json
+import logging
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from typing import Callable, Dict, Optional, Set
+from sqlalchemy.engine import make_url
+from app.core.config import settings
+from app.core.streaming import dumps
+
+logger = logging.getLogger(__name__)
+
+Deliver = Callable[[dict], None]
+
+class Broker(ABC):
+    """Carries notification events between workers.
+
+    ``publish`` sends an event to every worker's hub, including this one;
+    ``start`` registers the callback that hands received events to the local
+    hub. Delivery is best effort: clients recover missed events by reconnecting
+    with the last id they saw."""
+
+    @abstractmethod
+    async def start(self, deliver: Deliver): ...
+
+    @abstractmethod
+    async def publish(self, event: dict): ...
+
+    async def stop(self):
+        pass
+
+class MemoryBroker(Broker):
+    """In-process broker for a single worker and for tests. Hubs started on the
+    same instance see each other's events, like workers sharing a real broker."""
+
+    def __init__(self):
+        self._subscribers: list = []
+
+    async def start(self, deliver: Deliver):
+        self._subscribers.append(deliver)
+
+    async def publish(self, event: dict):
+        for deliver in list(self._subscribers):
+            deliver(event)
+
+    async def stop(self):
+        self._subscribers.clear()
+
+class PostgresBroker(Broker):
+    """Postgres ``LISTEN``/``NOTIFY`` on a dedicated asyncpg connection.
+
+    NOTIFY payloads are limited to 8000 bytes, so an event whose message does
+    not fit is sent without it and marked ``truncated``; clients fetch it with
+    the REST API. An asyncpg connection runs one operation at a time, so
+    publishes share the listener connection under a lock."""
+
+    channel = "notifications"
+    max_payload = 7900
+
+    def __init__(self, dsn: str, reconnect_delay: float = 1.0):
+        self.dsn = dsn
+        self.reconnect_delay = reconnect_delay
+        self._conn = None
+        self._task: Optional[asyncio.Task] = None
+        self._send_lock: Optional[asyncio.Lock] = None
+
+    async def start(self, deliver: Deliver):
+        self._send_lock = asyncio.Lock()
+        self._task = asyncio.get_running_loop().create_task(self._listen(deliver))
+
+    async def _listen(self, deliver: Deliver):
+        import asyncpg
+
+        def on_notify(conn, pid, channel, payload):
+            try:
+                deliver(json.loads(payload))
+            except ValueError:
+                logger.warning("dropping malformed notification payload")
+
+        while True:
+            try:
+                conn = await asyncpg.connect(self.dsn)
+                closed = asyncio.get_running_loop().create_future()
+                conn.add_termination_listener(lambda c: closed.done() or closed.set_result(None))
+                await conn.add_listener(self.channel, on_notify)
+                self._conn = conn
+                await closed
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("notification listener connection failed")
+            self._conn = None
+            await asyncio.sleep(self.reconnect_delay)
+
+    async def publish(self, event: dict):
+        payload = dumps(event)
+        if len(payload.encode()) > self.max_payload:
+            payload = dumps({**event, "message": None, "truncated": True})
+        async with self._send_lock:
+            conn = self._conn
+            if conn is None:
+                logger.warning("notification %s not published: listener is not connected", event.get("id"))
+                return
+            await conn.execute("SELECT pg_notify($1, $2)", self.channel, payload)
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._conn is not None:
+            await self._conn.close()
+            self._conn = None
+
+class Subscription:
+    """One client stream. ``overflowed`` is set when the client fell more than
+    ``maxsize`` events behind; the stream should end so the client reconnects
+    and replays from the database."""
+
+    def __init__(self, user_id: int, maxsize: int):
+        self.user_id = user_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize = maxsize)
+        self.overflowed = False
+
+    def put(self, event: dict):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+class NotificationHub:
+    """Fans notification events out to the streams of their recipient.
+
+    ``publish`` may be called from sync crud code on any thread once the hub is
+    started; the event goes through the broker so streams held by other workers
+    receive it too."""
+
+    def __init__(self, broker: Broker, queue_size: int = settings.NOTIFICATION_QUEUE_SIZE):
+        self.broker = broker
+        self.queue_size = queue_size
+        self.published = 0
+        self.delivered = 0
+        self.overflows = 0
+        self._subscriptions: Dict[int, Set[Subscription]] = defaultdict(set)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pending: Set[asyncio.Future] = set()
+
+    async def start(self):
+        if self._loop is None:
+            self._loop = asyncio.get_running_loop()
+            await self.broker.start(self._deliver)
+
+    async def stop(self):
+        if self._loop is not None:
+            await self.broker.stop()
+            self._loop = None
+
+    def subscribe(self, user_id: int) -> Subscription:
+        sub = Subscription(user_id, self.queue_size)
+        self._subscriptions[user_id].add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription):
+        subs = self._subscriptions.get(sub.user_id)
+        if subs is not None:
+            subs.discard(sub)
+            if not subs:
+                del self._subscriptions[sub.user_id]
+
+    def _deliver(self, event: dict):
+        for sub in list(self._subscriptions.get(event.get("user_id"), ())):
+            sub.put(event)
+            if sub.overflowed:
+                self.overflows += 1
+            else:
+                self.delivered += 1
+
+    def publish(self, event: dict):
+        loop = self._loop
+        if loop is None:
+            return
+        self.published += 1
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            future = loop.create_task(self.broker.publish(event))
+        else:
+            future = asyncio.run_coroutine_threadsafe(self.broker.publish(event), loop)
+        self._pending.add(future)
+        future.add_done_callback(self._published)
+
+    def _published(self, future):
+        self._pending.discard(future)
+        if not future.cancelled() and future.exception() is not None:
+            logger.error("notification publish failed", exc_info = future.exception())
+
+    def stats(self) -> dict:
+        return {
+            "broker": type(self.broker).__name__,
+            "users": len(self._subscriptions),
+            "streams": sum(len(s) for s in self._subscriptions.values()),
+            "published": self.published,
+            "delivered": self.delivered,
+            "overflows": self.overflows,
+        }
+
+def create_broker(kind: str = settings.NOTIFICATION_BROKER) -> Broker:
+    if kind == "memory":
+        return MemoryBroker()
+    if kind == "postgres":
+        from app.core.database import async_database_url
+        dsn = make_url(async_database_url()).set(drivername = "postgresql").render_as_string(hide_password = False)
+        return PostgresBroker(dsn)
+    raise ValueError(f"Unknown notification broker {kind!r}")
+
+notification_hub = NotificationHub(create_broker())
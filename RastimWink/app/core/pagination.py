@@ -0,0 +1,18 @@
+import base64
+import json
+from datetime import datetime
+from typing import Tuple
+
+def encode_cursor(created_at: datetime, id: int) -> str:
+    """Opaque cursor pointing just past the row with this ``(created_at, id)``."""
+    raw = json.dumps([created_at.isoformat(), id], separators = (",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Inverse of ``encode_cursor``; raises ValueError on anything malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, id = json.loads(raw)
+        return datetime.fromisoformat(created_at), int(id)
+    except (TypeError, ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
@@ -0,0 +1,67 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+from fastapi import HTTPException, status
+from app.core.config import settings
+
+# Run inside the worker processes. They are started by a forkserver rather
+# than forked from the app, which has the event loop, engine pools and threads
+# running; app.core.security only pulls in the settings, so workers start
+# without the database or FastAPI app.
+def _hash_password(password: str) -> str:
+    from app.core.security import get_password_hash
+    return get_password_hash(password)
+
+def _verify_and_update_password(password: str, hashed_password: str):
+    from app.core.security import verify_and_update_password
+    return verify_and_update_password(password, hashed_password)
+
+class PasswordHasher:
+    """Runs password hashing on a small process pool with admission control.
+
+    At most ``workers`` hashes run at once and at most ``max_pending`` are
+    admitted (running plus queued); beyond that callers get 503 straight away
+    instead of tying up the event loop or Starlette's threadpool."""
+
+    def __init__(self, workers: int = settings.PASSWORD_HASH_WORKERS, max_pending: int = settings.PASSWORD_HASH_MAX_PENDING):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self.rejected = 0
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers = self.workers, mp_context = multiprocessing.get_context("forkserver"))
+        return self._executor
+
+    async def _submit(self, fn, *args):
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise HTTPException(status_code = status.HTTP_503_SERVICE_UNAVAILABLE, detail = "Сервис перегружен, повторите попытку", headers = {"Retry-After": "1"})
+        self.pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._pool(), fn, *args)
+        finally:
+            self.pending -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._submit(_hash_password, password)
+
+    async def verify_and_update(self, password: str, hashed_password: str):
+        """``(ok, new_hash)`` as in ``core.security.verify_and_update_password``."""
+        return await self._submit(_verify_and_update_password, password, hashed_password)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        return (await self.verify_and_update(password, hashed_password))[0]
+
+    def stats(self) -> dict:
+        return {"workers": self.workers, "max_pending": self.max_pending, "pending": self.pending, "rejected": self.rejected}
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait = False, cancel_futures = True)
+            self._executor = None
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,156 @@
+import enum
+from functools import lru_cache
+from typing import Dict, Iterable, Optional, Tuple, Union
+from fastapi import Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.auth import Principal, get_current_principal
+from app.models.user import User, UserRole
+
+class Action(enum.IntFlag):
+    VIEW_OWN_ANALYTICS = enum.auto()
+    VIEW_ANALYTICS = enum.auto()
+    COMPANY_WIDE = enum.auto()  # not an action: lifts the department scope of the others
+    MANAGE_TASKS = enum.auto()
+    IMPORT_EXPORT_TASKS = enum.auto()
+    UPDATE_ANY_TASK = enum.auto()
+    REVIEW_TASKS = enum.auto()
+    MANAGE_IDEAS = enum.auto()
+    SEND_NOTIFICATIONS = enum.auto()
+    SIMULATE_GAR_WEIGHTS = enum.auto()
+    MANAGE_GAR_WEIGHTS = enum.auto()
+    ONBOARD_EMPLOYEES = enum.auto()
+    ADMIN = enum.auto()
+
+_TEAM_LEAD = (
+    Action.VIEW_OWN_ANALYTICS | Action.VIEW_ANALYTICS | Action.MANAGE_TASKS | Action.IMPORT_EXPORT_TASKS
+    | Action.UPDATE_ANY_TASK | Action.MANAGE_IDEAS | Action.SEND_NOTIFICATIONS
+)
+
+# Role x action matrix. Managers act on their own department only; roles with
+# COMPANY_WIDE act on every department.
+ROLE_PERMISSIONS: Dict[UserRole, Action] = {
+    UserRole.employee: Action.VIEW_OWN_ANALYTICS,
+    UserRole.manager: _TEAM_LEAD | Action.REVIEW_TASKS,
+    UserRole.hr: _TEAM_LEAD | Action.COMPANY_WIDE | Action.SIMULATE_GAR_WEIGHTS | Action.ONBOARD_EMPLOYEES,
+    UserRole.admin: Action(sum(Action)),
+}
+
+def _forbidden() -> HTTPException:
+    return HTTPException(status_code = 403, detail = "Not enough permissions")
+
+class Access:
+    """The caller's permissions, resolved once per request.
+
+    Checks are bit tests against the role's mask; the department of other
+    employees is looked up at most once per employee per request."""
+
+    def __init__(self, principal: Principal):
+        self.principal = principal
+        self.permissions = ROLE_PERMISSIONS.get(principal.role, Action(0))
+        self._departments: Dict[int, Optional[int]] = {}
+
+    @property
+    def user_id(self) -> int:
+        return self.principal.id
+
+    @property
+    def role(self) -> UserRole:
+        return self.principal.role
+
+    @property
+    def company_wide(self) -> bool:
+        return bool(self.permissions & Action.COMPANY_WIDE)
+
+    def can(self, action: Action) -> bool:
+        return self.permissions & action == action
+
+    def department_scope(self, department_id: Optional[int] = None) -> Optional[int]:
+        """Department a list or analytics query must be filtered by.
+
+        Company-wide roles get the requested one (None means all departments);
+        others are pinned to their own department and refused any other."""
+        if self.company_wide:
+            return department_id
+        own = self.principal.department_id
+        if own is None or (department_id is not None and department_id != own):
+            raise _forbidden()
+        return own
+
+    def task_visibility(self) -> Optional[Tuple[int, Optional[int]]]:
+        """``visible_to`` for ``crud.aio.task.filter_tasks``; None for a company-wide view."""
+        return None if self.company_wide else (self.user_id, self.principal.department_id)
+
+    def check_task(self, task):
+        """Single-task counterpart of ``task_visibility``."""
+        if self.company_wide or self.user_id in (task.assignee_id, task.creator_id):
+            return
+        own = self.principal.department_id
+        if own is None or task.department_id != own:
+            raise _forbidden()
+
+    def check_department(self, department_id: Optional[int]):
+        """Refuse writes touching a department outside the caller's scope."""
+        if not self.company_wide and department_id is not None and department_id != self.principal.department_id:
+            raise _forbidden()
+
+    async def employee_department(self, db: Union[AsyncSession, Session], employee_id: int) -> Optional[int]:
+        if employee_id not in self._departments:
+            user = await db.get(User, employee_id) if isinstance(db, AsyncSession) else await run_in_threadpool(db.get, User, employee_id)
+            self._departments[employee_id] = user.department_id if user else None
+        return self._departments[employee_id]
+
+    def check_members(self, departments: Dict[int, Optional[int]]):
+        """Refuse acting on users outside the caller's scope, given ``{user_id: department_id}``."""
+        if self.company_wide:
+            return
+        own = self.principal.department_id
+        if own is None or any(department_id != own for department_id in departments.values()):
+            raise _forbidden()
+
+    async def check_employees(self, db: AsyncSession, employee_ids: Iterable[Optional[int]]):
+        """``check_members`` for ids, looking up the departments not seen yet in one query.
+        Unknown users count as outside the scope."""
+        if self.company_wide:
+            return
+        ids = {i for i in employee_ids if i is not None}
+        unseen = ids - self._departments.keys()
+        if unseen:
+            found = dict((await db.execute(select(User.id, User.department_id).where(User.id.in_(unseen)))).all())
+            self._departments.update({i: found.get(i) for i in unseen})
+        self.check_members({i: self._departments[i] for i in ids})
+
+    async def check_task_scope(self, db: AsyncSession, department_id: Optional[int], assignee_id: Optional[int]):
+        """Refuse writes to a task outside the caller's scope. A task without a
+        department is in scope when its assignee is."""
+        self.check_department(department_id)
+        if department_id is None:
+            await self.check_employees(db, [assignee_id])
+
+    async def check_employee(self, db: Union[AsyncSession, Session], employee_id: int):
+        """Allow reading an employee's analytics: one's own, any in the department, or anyone company-wide."""
+        if employee_id == self.user_id and self.can(Action.VIEW_OWN_ANALYTICS):
+            return
+        if not self.can(Action.VIEW_ANALYTICS):
+            raise _forbidden()
+        if self.company_wide:
+            return
+        own = self.principal.department_id
+        if own is None or await self.employee_department(db, employee_id) != own:
+            raise _forbidden()
+
+async def get_access(principal: Principal = Depends(get_current_principal)) -> Access:
+    return Access(principal)
+
+@lru_cache(maxsize = None)
+def require(action: Action):
+    """Dependency that returns the caller's ``Access`` if their role allows ``action``, else 403.
+
+    Async so the check runs on the event loop rather than the threadpool."""
+    async def dependency(access: Access = Depends(get_access)) -> Access:
+        if not access.can(action):
+            raise _forbidden()
+        return access
+    return dependency
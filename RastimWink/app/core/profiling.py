@@ -0,0 +1,199 @@
+import asyncio
+import functools
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+from fastapi import HTTPException, Request, status
+from app.core.config import settings
+from app.core.metrics import current_request
+
+# Leaf frames of threads that are parked: the event loop in select(), pool
+# workers waiting for a job. Their samples would drown the busy ones.
+IDLE_FUNCTIONS = frozenset({"select", "poll", "wait"})
+
+_ROOTS = sorted({p.rstrip("/") + "/" for p in sys.path if p}, key = len, reverse = True)
+_labels: Dict[object, str] = {}
+
+def _frame_label(code) -> str:
+    label = _labels.get(code)
+    if label is None:
+        filename = code.co_filename
+        for root in _ROOTS:
+            if filename.startswith(root):
+                filename = filename[len(root):]
+                break
+        label = _labels[code] = f"{code.co_name} ({filename}:{code.co_firstlineno})"
+    return label
+
+class StackSampler:
+    """Samples the Python stacks of every thread from a background thread and
+    counts them as collapsed stacks (``thread;outer;...;leaf count``), the input
+    format of flamegraph.pl and speedscope.
+
+    Sampling only happens while the sampler is resumed; ``resume``/``pause``
+    nest, so overlapping profiled requests keep it running until the last ends.
+    Coroutines are on the stack only while they run, so time spent awaiting
+    the database shows up as the driver's frames or not at all."""
+
+    def __init__(self, interval: float = settings.PROFILE_INTERVAL_MS / 1000):
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._active = 0
+        self._resumed = threading.Event()
+        self._closed = False
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target = self._run, name = "stack-sampler", daemon = True)
+        self._thread.start()
+
+    def resume(self):
+        with self._lock:
+            self._active += 1
+            self._resumed.set()
+
+    def pause(self):
+        with self._lock:
+            self._active = max(self._active - 1, 0)
+            if not self._active:
+                self._resumed.clear()
+
+    def close(self):
+        self._closed = True
+        self._resumed.set()
+        self._thread.join()
+
+    def _run(self):
+        own = threading.get_ident()
+        while True:
+            self._resumed.wait()
+            if self._closed:
+                return
+            self._sample(own)
+            time.sleep(self.interval)
+
+    def _sample(self, own: int):
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == own or frame.f_code.co_name in IDLE_FUNCTIONS:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+            stack.append(names.get(ident, f"thread-{ident}"))
+            self.stacks[";".join(reversed(stack))] += 1
+        self.samples += 1
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+class RequestProfile:
+    """Samples stacks while any of the next ``count`` requests to ``route`` runs.
+
+    Concurrent requests share the event loop thread, so samples taken while a
+    profiled request is in flight may include other requests' frames."""
+
+    def __init__(self, route: str, count: int, sampler: StackSampler):
+        self.route = route
+        self.remaining = count
+        self.sampler = sampler
+        self.in_flight = 0
+        self.requests: List[dict] = []
+        self.done = asyncio.Event()
+
+    def claim(self, route: Optional[str]) -> bool:
+        if route != self.route or self.remaining <= 0:
+            return False
+        self.remaining -= 1
+        self.in_flight += 1
+        self.sampler.resume()
+        return True
+
+    def release(self, path: str, duration: float):
+        self.sampler.pause()
+        self.in_flight -= 1
+        self.requests.append({"path": path, "duration_ms": round(duration * 1000, 2)})
+        if self.remaining <= 0 and not self.in_flight:
+            self.done.set()
+
+class Profiler:
+    """Admin-triggered profiling, one session per worker at a time."""
+
+    def __init__(self):
+        self._busy = False
+        self._request_profile: Optional[RequestProfile] = None
+
+    def _begin(self, interval: float) -> StackSampler:
+        if self._busy:
+            raise HTTPException(status_code = status.HTTP_409_CONFLICT, detail = "Another profile is already running")
+        self._busy = True
+        return StackSampler(interval)
+
+    async def sample(self, seconds: float, interval: float = settings.PROFILE_INTERVAL_MS / 1000) -> StackSampler:
+        """Sample the whole worker for ``seconds``."""
+        sampler = self._begin(interval)
+        sampler.resume()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            sampler.close()
+            self._busy = False
+        return sampler
+
+    async def profile_requests(self, route: str, count: int, timeout: float, interval: float = settings.PROFILE_INTERVAL_MS / 1000) -> RequestProfile:
+        """Sample the next ``count`` requests to the route template ``route``,
+        or fewer if ``timeout`` runs out first."""
+        profile = RequestProfile(route, count, self._begin(interval))
+        self._request_profile = profile
+        try:
+            await asyncio.wait_for(profile.done.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            self._request_profile = None
+            profile.sampler.close()
+            self._busy = False
+        return profile
+
+    def claim(self, route: Optional[str]) -> Optional[RequestProfile]:
+        profile = self._request_profile
+        if profile is not None and profile.claim(route):
+            return profile
+        return None
+
+profiler = Profiler()
+
+async def profile_request(request: Request):
+    """Router dependency: keeps the request's SQL for the slow request log and
+    lets an armed ``Profiler.profile_requests`` session sample it."""
+    metrics = current_request()
+    if metrics is not None:
+        metrics.capture()
+    profile = profiler.claim(getattr(request.scope.get("route"), "path", None))
+    if profile is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.release(request.url.path, time.perf_counter() - start)
+
+def profiled(fn):
+    """Record calls to ``fn`` as a section of the current request's timeline
+    when the request is being captured; a context variable lookup otherwise."""
+    name = f"{fn.__module__}.{fn.__qualname__}"
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        metrics = current_request()
+        if metrics is None or metrics.sections is None:
+            return fn(*args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            metrics.sections.append((start - metrics.start, time.perf_counter() - start, name))
+    return wrapper
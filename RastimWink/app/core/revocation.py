@@ -0,0 +1,68 @@
+import threading
+import time
+from typing import Dict
+from sqlalchemy import select, or_
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.models.user import User
+
+REVOKED = -1
+
+class TokenVersionRegistry:
+    """Minimum accepted token version per user, for stateless token checks.
+
+    Only users that ever bumped ``token_version`` or were deactivated are kept,
+    so the map stays small. It is reloaded from ``users`` at most once per
+    ``refresh_interval`` seconds; bumps made in this process apply immediately,
+    bumps made by other workers within one interval."""
+
+    def __init__(self, refresh_interval: float = settings.AUTH_REVOCATION_REFRESH_SECONDS):
+        self.refresh_interval = refresh_interval
+        self._versions: Dict[int, int] = {}
+        self._loaded_at = float("-inf")
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _query():
+        return select(User.id, User.token_version, User.is_active).where(
+            or_(User.token_version > 0, User.is_active == False)
+        )
+
+    def _store(self, rows):
+        versions = {r.id: (r.token_version or 0) if r.is_active else REVOKED for r in rows}
+        with self._lock:
+            self._versions = versions
+            self._loaded_at = time.monotonic()
+
+    def refresh(self, db: Session):
+        self._store(db.execute(self._query()).all())
+
+    async def refresh_async(self, db: AsyncSession):
+        self._store((await db.execute(self._query())).all())
+
+    def _stale(self) -> bool:
+        return time.monotonic() - self._loaded_at > self.refresh_interval
+
+    def _accepts(self, user_id: int, version: int) -> bool:
+        current = self._versions.get(user_id, 0)
+        return current != REVOKED and version >= current
+
+    def is_current(self, db: Session, user_id: int, version: int) -> bool:
+        if self._stale():
+            self.refresh(db)
+        return self._accepts(user_id, version)
+
+    async def is_current_async(self, db: AsyncSession, user_id: int, version: int) -> bool:
+        if self._stale():
+            await self.refresh_async(db)
+        return self._accepts(user_id, version)
+
+    def bump(self, user_id: int, version: int):
+        with self._lock:
+            self._versions[user_id] = version
+
+    def revoke(self, user_id: int):
+        self.bump(user_id, REVOKED)
+
+token_versions = TokenVersionRegistry()
@@ -1,14 +1,55 @@
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import HTTPException, status
 from app.core.config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated = "auto")
+def _argon2_available() -> bool:
+    try:
+        import argon2
+    except ImportError:
+        return False
+    return True
+
+def _build_pwd_context() -> CryptContext:
+    # The configured scheme hashes new passwords; the others are only kept so
+    # existing hashes still verify. hex_sha256 covers the unsalted SHA-256
+    # hashes of the early prototype. "auto" marks every non-default scheme
+    # (and outdated cost settings) as needing an update on next login.
+    # argon2 needs the optional argon2-cffi package; without it argon2 hashes
+    # can't be verified, and choosing it for new ones fails at startup rather
+    # than on the first registration.
+    if settings.PASSWORD_HASH_SCHEME == "argon2" and not _argon2_available():
+        raise RuntimeError("PASSWORD_HASH_SCHEME=argon2 requires the argon2-cffi package")
+    schemes = [settings.PASSWORD_HASH_SCHEME]
+    for scheme in ("bcrypt", "argon2", "hex_sha256"):
+        if scheme in schemes or (scheme == "argon2" and not _argon2_available()):
+            continue
+        schemes.append(scheme)
+    return CryptContext(
+        schemes = schemes,
+        deprecated = "auto",
+        bcrypt__rounds = settings.BCRYPT_ROUNDS,
+        argon2__memory_cost = settings.ARGON2_MEMORY_COST,
+        argon2__time_cost = settings.ARGON2_TIME_COST,
+        argon2__parallelism = settings.ARGON2_PARALLELISM,
+    )
+
+pwd_context = _build_pwd_context()
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return verify_and_update_password(plain_password, hashed_password)[0]
+
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Returns ``(ok, new_hash)``; ``new_hash`` is set when the stored hash uses
+    a legacy scheme or outdated cost and should be replaced."""
+    if not hashed_password:
+        return False, None
+    try:
+        return pwd_context.verify_and_update(plain_password, hashed_password)
+    except ValueError:
+        return False, None
 
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
@@ -31,4 +72,20 @@ def verify_token(token: str) -> Optional[str]:
         email: str = payload.get("sub")
         return email
     except JWTError:
-        return None
\ No newline at end of file
+        return None
+
+def create_set_password_token(user_id: int, expires_delta: Optional[timedelta] = None) -> str:
+    expire = datetime.utcnow() + (expires_delta or timedelta(days = 7))
+    return jwt.encode({"sub": str(user_id), "purpose": "set_password", "exp": expire}, settings.SECRET_KEY, algorithm = settings.ALGORITHM)
+
+def verify_set_password_token(token: str) -> Optional[int]:
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms = [settings.ALGORITHM])
+    except JWTError:
+        return None
+    if payload.get("purpose") != "set_password":
+        return None
+    try:
+        return int(payload.get("sub"))
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,148 @@
+import codecs
+import csv
+import io
+import json
+from datetime import date, datetime
+from enum import Enum
+from typing import AsyncIterable, AsyncIterator, Optional, Sequence, Tuple
+from fastapi.responses import StreamingResponse
+
+JSON_MEDIA_TYPE = "application/json"
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+CSV_MEDIA_TYPE = "text/csv"
+
+def _default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def dumps(obj) -> str:
+    return json.dumps(obj, default = _default, ensure_ascii = False, separators = (",", ":"))
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+async def ndjson_lines(rows: AsyncIterable[dict]) -> AsyncIterator[str]:
+    async for row in rows:
+        yield dumps(row) + "\n"
+
+async def csv_lines(rows: AsyncIterable[dict], fieldnames: Sequence[str]) -> AsyncIterator[str]:
+    """Header, then one CSV line per row; ``None`` becomes an empty cell."""
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(fieldnames)
+    async for row in rows:
+        writer.writerow([_csv_value(row.get(f)) for f in fieldnames])
+        if buf.tell() >= 64 * 1024:
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+    yield buf.getvalue()
+
+async def json_array(rows: AsyncIterable[dict], prefix: str = "", suffix: str = "") -> AsyncIterator[str]:
+    """A JSON array streamed element by element, optionally wrapped as ``prefix[...]suffix``."""
+    yield prefix + "["
+    first = True
+    async for row in rows:
+        yield ("" if first else ",") + dumps(row)
+        first = False
+    yield "]" + suffix
+
+def streaming_response(rows: AsyncIterable[dict], format: str = "json", fieldnames: Optional[Sequence[str]] = None, filename: Optional[str] = None) -> StreamingResponse:
+    """Serialize ``rows`` as they are produced: a JSON array, NDJSON, or CSV (needs ``fieldnames``)."""
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'} if filename else None
+    if format == "ndjson":
+        return StreamingResponse(ndjson_lines(rows), media_type = NDJSON_MEDIA_TYPE, headers = headers)
+    if format == "csv":
+        return StreamingResponse(csv_lines(rows, fieldnames), media_type = CSV_MEDIA_TYPE, headers = headers)
+    return StreamingResponse(json_array(rows), media_type = JSON_MEDIA_TYPE, headers = headers)
+
+async def text_lines(chunks: AsyncIterable[bytes], encoding: str = "utf-8") -> AsyncIterator[Tuple[Optional[str], Optional[str]]]:
+    """``(line, error)`` per line of a byte stream, without the line break.
+
+    Lines are split before decoding, so an invalid byte sequence only costs its
+    own line (``line`` is ``None``). A leading byte order mark, as written by
+    Excel and LibreOffice, is dropped."""
+    pending = b""
+    first = True
+
+    def decode(raw: bytes):
+        nonlocal first
+        if first:
+            first = False
+            if raw.startswith(codecs.BOM_UTF8):
+                raw = raw[len(codecs.BOM_UTF8):]
+        try:
+            return raw.decode(encoding).rstrip("\r"), None
+        except UnicodeDecodeError as e:
+            return None, f"Invalid {encoding} at byte {e.start}: {e.reason}"
+
+    async for chunk in chunks:
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            yield decode(line)
+    if pending:
+        yield decode(pending)
+
+async def parse_ndjson(chunks: AsyncIterable[bytes]) -> AsyncIterator[Tuple[int, Optional[dict], Optional[str]]]:
+    """``(line_number, record, error)`` per non-empty line of an NDJSON body."""
+    n = 0
+    async for line, error in text_lines(chunks):
+        n += 1
+        if error:
+            yield n, None, error
+            continue
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield n, None, f"Invalid JSON: {e}"
+            continue
+        if not isinstance(record, dict):
+            yield n, None, "Expected a JSON object"
+            continue
+        yield n, record, None
+
+async def parse_csv(chunks: AsyncIterable[bytes]) -> AsyncIterator[Tuple[int, Optional[dict], Optional[str]]]:
+    """``(line_number, record, error)`` per record of a CSV body with a header row.
+
+    Physical lines are joined while a quoted field is still open, so values
+    may contain line breaks. Empty cells are dropped from the record; a line
+    that cannot be decoded is reported and drops the record it belongs to."""
+    header = None
+    record_lines, start = [], 0
+    n = 0
+    async for line, error in text_lines(chunks):
+        n += 1
+        if error:
+            yield n, None, error
+            record_lines = []
+            continue
+        if not record_lines:
+            start = n
+        record_lines.append(line)
+        if sum(l.count('"') for l in record_lines) % 2:
+            continue
+        text, record_lines = "\n".join(record_lines), []
+        if not text.strip():
+            continue
+        values = next(csv.reader([text]))
+        if header is None:
+            header = [h.strip() for h in values]
+            continue
+        if len(values) != len(header):
+            yield start, None, f"Expected {len(header)} columns, got {len(values)}"
+            continue
+        yield start, {k: v for k, v in zip(header, values) if v != ""}, None
+    if record_lines:
+        yield start, None, "Unterminated quoted field"
@@ -0,0 +1,6 @@
+"""Async counterparts of ``app.crud`` for ``AsyncSession``.
+
+Plain reads are native async queries; writes and the GAR engine call the sync
+crud functions through ``AsyncSession.run_sync`` so there is one implementation
+of the aggregate bookkeeping."""
+from app.crud.aio import gar, notification, stats, task, user
@@ -0,0 +1,68 @@
+from typing import Optional, List, AsyncIterator
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.crud import gar as gar_crud
+from app.crud import gar_aggregate, gar_simulation
+from app.models.user import User
+
+# GAR reads take a sync Session and run on the threadpool: the grouping and
+# NumPy scoring are CPU-bound, and AsyncSession.run_sync would run them on
+# the event loop thread, stalling every other request on the worker.
+
+def _employee_gar(db, employee_id: int, since_ts=None, until_ts=None):
+    if since_ts is None and until_ts is None:
+        result = gar_aggregate.get_gar_from_aggregate(db, employee_id)
+        if result is not None:
+            return result
+    return gar_crud.calculate_gar(db, employee_id, since_ts, until_ts)
+
+async def get_employee_gar(db: Session, employee_id: int, since_ts=None, until_ts=None):
+    """Aggregate-backed GAR when no window is given, live computation otherwise."""
+    return await run_in_threadpool(_employee_gar, db, employee_id, since_ts, until_ts)
+
+async def calculate_gar(db: Session, employee_id: int, since_ts=None, until_ts=None):
+    return await run_in_threadpool(gar_crud.calculate_gar, db, employee_id, since_ts, until_ts)
+
+async def calculate_gar_batch(db: Session, department_id: Optional[int] = None, since_ts=None, until_ts=None):
+    return await run_in_threadpool(gar_crud.calculate_gar_batch, db, department_id = department_id, since_ts = since_ts, until_ts = until_ts)
+
+def _gar_chunk(db: Session, after_id: int, chunk_size: int, department_id: Optional[int], since_ts, until_ts):
+    q = select(User.id, User.full_name).where(User.id > after_id).order_by(User.id).limit(chunk_size)
+    if department_id is not None:
+        q = q.where(User.department_id == department_id)
+    names = dict(db.execute(q).all())
+    if not names:
+        return names, {}
+    return names, gar_crud.calculate_gar_batch(db, employee_ids = list(names), since_ts = since_ts, until_ts = until_ts)
+
+async def stream_gar_batch(db: Session, department_id: Optional[int] = None, since_ts=None, until_ts=None, chunk_size: int = 500) -> AsyncIterator[dict]:
+    """``calculate_gar_batch`` one chunk of employees at a time, as ``GARResponse`` dicts.
+
+    Employees are paged by id, so only ``chunk_size`` employees' tasks are held
+    in memory at once."""
+    last_id = 0
+    while True:
+        names, results = await run_in_threadpool(_gar_chunk, db, last_id, chunk_size, department_id, since_ts, until_ts)
+        if not names:
+            return
+        for employee_id, name in names.items():
+            gar_res, metrics, weights = results[employee_id]
+            yield {
+                "employee_id": employee_id,
+                "employee_name": name,
+                "metrics": metrics,
+                "GAR": float(gar_res["GAR"]),
+                "weights": weights
+            }
+            last_id = employee_id
+
+async def get_gar_trend(db: Session, employee_id: Optional[int] = None, department_id: Optional[int] = None, period: str = "month", periods: int = 12):
+    return await run_in_threadpool(gar_aggregate.get_gar_trend, db, employee_id = employee_id, department_id = department_id, period = period, periods = periods)
+
+async def simulate_gar_weights(db: Session, candidates: List[dict], department_id: Optional[int] = None, since_ts=None, until_ts=None, top: Optional[int] = None):
+    return await run_in_threadpool(gar_simulation.simulate_gar_weights, db, candidates, department_id, since_ts, until_ts, top)
+
+async def update_gar_weights_db(db: AsyncSession, w_tcr: float = None, w_goal: float = None, w_timeliness: float = None, w_quality: float = None):
+    return await db.run_sync(gar_crud.update_gar_weights_db, w_tcr, w_goal, w_timeliness, w_quality)
@@ -0,0 +1,43 @@
+from typing import Iterable, List, Optional
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.notification import Notification
+from app.schemas.notification import NotificationBase
+from app.crud import notification as notification_crud
+
+async def get_notifications(db: AsyncSession, user_id: int, before_id: Optional[int] = None, unread_only: bool = False, limit: int = 50) -> List[Notification]:
+    """A user's notifications newest first, paged by ``before_id``."""
+    q = select(Notification).where(Notification.user_id == user_id)
+    if before_id is not None:
+        q = q.where(Notification.id < before_id)
+    if unread_only:
+        q = q.where(Notification.is_read == False)
+    return (await db.execute(q.order_by(Notification.id.desc()).limit(limit))).scalars().all()
+
+async def get_notifications_after(db: AsyncSession, user_id: int, after_id: int, limit: int) -> List[Notification]:
+    """Notifications created after ``after_id``, oldest first, for stream replay."""
+    q = (
+        select(Notification)
+        .where(Notification.user_id == user_id, Notification.id > after_id)
+        .order_by(Notification.id)
+        .limit(limit)
+    )
+    return (await db.execute(q)).scalars().all()
+
+async def create_notification(db: AsyncSession, notification: NotificationBase, user_id: int):
+    return await db.run_sync(notification_crud.create_notification, notification, user_id)
+
+async def create_notifications(db: AsyncSession, notification: NotificationBase, user_ids: Iterable[int]) -> List[dict]:
+    return await db.run_sync(notification_crud.create_notifications, notification, list(user_ids))
+
+async def create_department_notifications(db: AsyncSession, notification: NotificationBase, department_id: int) -> List[dict]:
+    return await db.run_sync(notification_crud.create_department_notifications, notification, department_id)
+
+async def mark_notification_as_read(db: AsyncSession, notification_id: int, user_id: Optional[int] = None):
+    return await db.run_sync(notification_crud.mark_notification_as_read, notification_id, user_id)
+
+async def mark_notifications_read(db: AsyncSession, user_id: int, ids: Optional[Iterable[int]] = None, up_to_id: Optional[int] = None) -> int:
+    return await db.run_sync(notification_crud.mark_notifications_read, user_id, ids, up_to_id)
+
+async def count_unread_notifications(db: AsyncSession, user_id: int) -> int:
+    return await db.scalar(select(func.count()).select_from(Notification).where(Notification.user_id == user_id, Notification.is_read == False))
@@ -0,0 +1,33 @@
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.stats import EmployeeStats
+from app.models.user import User
+from app.models.task import Task, TaskStatus
+from app.models.review import ManagerReview
+from app.crud import stats as stats_crud
+
+async def get_employee_stats(db: AsyncSession, employee_id: int):
+    return (await db.execute(select(EmployeeStats).where(EmployeeStats.employee_id == employee_id))).scalars().first()
+
+async def get_employee_detailed_stats(db: AsyncSession, employee_id: int):
+    return await db.run_sync(stats_crud.get_employee_detailed_stats, employee_id)
+
+def _week_start(now: datetime) -> datetime:
+    return (now - timedelta(days = now.weekday())).replace(hour = 0, minute = 0, second = 0, microsecond = 0)
+
+async def get_company_stats(db: AsyncSession, now: Optional[datetime] = None):
+    """Company-wide KPIs in one round trip; "this week" starts on Monday, UTC."""
+    now = now or datetime.now(timezone.utc)
+    row = (await db.execute(select(
+        select(func.count()).select_from(User).scalar_subquery().label("total_employees"),
+        select(func.count()).select_from(User).where(User.is_active == True).scalar_subquery().label("active_employees"),
+        select(func.count()).select_from(Task).where(Task.status == TaskStatus.completed).scalar_subquery().label("total_tasks_completed"),
+        select(func.count()).select_from(Task).where(Task.status == TaskStatus.completed, Task.completed_at >= _week_start(now)).scalar_subquery().label("tasks_completed_this_week"),
+        select(func.count()).select_from(ManagerReview).scalar_subquery().label("manager_reviews_total"),
+        select(func.avg(ManagerReview.rating)).scalar_subquery().label("average_rating")
+    ))).one()
+    stats = dict(row._mapping)
+    stats["average_rating"] = round(float(stats["average_rating"]), 2) if stats["average_rating"] is not None else None
+    return stats
@@ -0,0 +1,149 @@
+from datetime import datetime
+from typing import Optional, List, Tuple, AsyncIterable, AsyncIterator
+from pydantic import ValidationError
+from sqlalchemy import select, tuple_, or_
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.pagination import encode_cursor, decode_cursor
+from app.models.task import Task, TaskStatus, TaskPriority
+from app.schemas.task import TaskCreate, TaskUpdate
+from app.crud import task as task_crud
+from app.crud.task_bulk import EXPORT_COLUMNS, IMPORT_BATCH_SIZE, check_references, insert_task_batch
+
+MAX_REPORTED_ERRORS = 1000
+
+async def get_task(db: AsyncSession, task_id: int):
+    return await db.get(Task, task_id)
+
+async def get_tasks(db: AsyncSession, skip: int = 0, limit: int = 100):
+    return (await db.execute(select(Task).offset(skip).limit(limit))).scalars().all()
+
+async def get_user_tasks(db: AsyncSession, user_id: int):
+    return (await db.execute(select(Task).where(Task.assignee_id == user_id))).scalars().all()
+
+def filter_tasks(
+    q,
+    assignee_id: Optional[int] = None,
+    creator_id: Optional[int] = None,
+    department_id: Optional[int] = None,
+    statuses: Optional[List[TaskStatus]] = None,
+    priorities: Optional[List[TaskPriority]] = None,
+    deadline_from: Optional[datetime] = None,
+    deadline_to: Optional[datetime] = None,
+    visible_to: Optional[Tuple[int, Optional[int]]] = None
+):
+    """``visible_to`` is ``(user_id, department_id)`` for callers without a
+    company-wide view: only their department's tasks and tasks they are the
+    assignee or creator of match."""
+    if visible_to is not None:
+        user_id, own_department_id = visible_to
+        q = q.where(or_(Task.department_id == own_department_id, Task.assignee_id == user_id, Task.creator_id == user_id))
+    if assignee_id is not None:
+        q = q.where(Task.assignee_id == assignee_id)
+    if creator_id is not None:
+        q = q.where(Task.creator_id == creator_id)
+    if department_id is not None:
+        q = q.where(Task.department_id == department_id)
+    if statuses:
+        q = q.where(Task.status.in_(statuses))
+    if priorities:
+        q = q.where(Task.priority.in_(priorities))
+    if deadline_from is not None:
+        q = q.where(Task.deadline >= deadline_from)
+    if deadline_to is not None:
+        q = q.where(Task.deadline <= deadline_to)
+    return q
+
+async def list_tasks(db: AsyncSession, cursor: Optional[str] = None, limit: int = 50, **filters) -> Tuple[List[Task], Optional[str]]:
+    """One page of tasks, newest first, and the cursor of the next page (None on the last).
+
+    Pages by keyset on ``(created_at, id)`` so every page costs the same index
+    range scan however deep it is. ``filters`` are those of ``filter_tasks``.
+    Raises ValueError for a malformed cursor."""
+    q = filter_tasks(select(Task), **filters)
+    if cursor:
+        q = q.where(tuple_(Task.created_at, Task.id) < tuple_(*decode_cursor(cursor)))
+    q = q.order_by(Task.created_at.desc(), Task.id.desc()).limit(limit + 1)
+
+    tasks = (await db.execute(q)).scalars().all()
+    if len(tasks) <= limit:
+        return tasks, None
+    tasks = tasks[:limit]
+    return tasks, encode_cursor(tasks[-1].created_at, tasks[-1].id)
+
+async def stream_tasks(db: AsyncSession, columns = EXPORT_COLUMNS, batch_size: int = 1000, **filters) -> AsyncIterator[dict]:
+    """Matching tasks as dicts, newest first, read through a server-side cursor
+    ``batch_size`` rows at a time."""
+    q = filter_tasks(select(*(getattr(Task, c) for c in columns)), **filters).order_by(Task.created_at.desc(), Task.id.desc())
+    result = await db.stream(q.execution_options(yield_per = batch_size))
+    async for row in result.mappings():
+        yield dict(row)
+
+async def import_tasks(db: AsyncSession, records: AsyncIterable[Tuple[int, Optional[dict], Optional[str]]], creator_id: int, batch_size: int = IMPORT_BATCH_SIZE, department_scope: Optional[int] = None) -> dict:
+    """Validate ``(line, record, parse_error)`` items against ``TaskCreate`` and
+    insert the valid ones in batches, each batch in its own transaction.
+
+    Rows with a parse or validation error, an unknown assignee or department,
+    or in a batch the database rejected are reported by line and skipped. With
+    ``department_scope`` set, rows for any other department or assigned to
+    someone outside it are refused too."""
+    report = {"imported": 0, "failed": 0, "ids": [], "errors": []}
+
+    def fail(line: int, *messages: str):
+        report["failed"] += 1
+        if len(report["errors"]) < MAX_REPORTED_ERRORS:
+            report["errors"].append({"line": line, "errors": list(messages)})
+
+    async def flush(batch):
+        assignees, missing_departments = await db.run_sync(check_references, [t for _, t in batch])
+        valid = []
+        for line, task in batch:
+            messages = []
+            if task.assignee_id not in assignees:
+                messages.append(f"assignee_id: user {task.assignee_id} does not exist")
+            elif department_scope is not None and assignees[task.assignee_id] != department_scope:
+                messages.append(f"assignee_id: user {task.assignee_id} is outside your scope")
+            if task.department_id in missing_departments:
+                messages.append(f"department_id: department {task.department_id} does not exist")
+            elif department_scope is not None and task.department_id not in (None, department_scope):
+                messages.append(f"department_id: department {task.department_id} is outside your scope")
+            if messages:
+                fail(line, *messages)
+            else:
+                valid.append((line, task))
+        try:
+            ids = await db.run_sync(insert_task_batch, [t for _, t in valid], creator_id)
+        except SQLAlchemyError as e:
+            await db.rollback()
+            for line, _ in valid:
+                fail(line, f"batch rejected by the database: {e.__class__.__name__}")
+            return
+        report["imported"] += len(ids)
+        report["ids"].extend(ids)
+
+    batch = []
+    async for line, record, error in records:
+        if error:
+            fail(line, error)
+            continue
+        try:
+            batch.append((line, TaskCreate.model_validate(record)))
+        except ValidationError as e:
+            fail(line, *(f"{'.'.join(map(str, err['loc'])) or 'row'}: {err['msg']}" for err in e.errors()))
+            continue
+        if len(batch) >= batch_size:
+            await flush(batch)
+            batch = []
+    if batch:
+        await flush(batch)
+    report["errors"].sort(key = lambda e: e["line"])
+    return report
+
+async def create_task(db: AsyncSession, task: TaskCreate, creator_id: int):
+    return await db.run_sync(task_crud.create_task, task, creator_id)
+
+async def update_task(db: AsyncSession, task_id: int, task_update: TaskUpdate):
+    return await db.run_sync(task_crud.update_task, task_id, task_update)
+
+async def delete_task(db: AsyncSession, task_id: int):
+    return await db.run_sync(task_crud.delete_task, task_id)
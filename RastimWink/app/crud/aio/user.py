@@ -0,0 +1,66 @@
+from typing import Dict, Iterable, Optional, AsyncIterator
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.user import User
+from app.crud import user as user_crud
+from app.crud import onboarding
+from app.crud.user import CachedUser
+from app.core.cache import users_by_id_cache, users_by_email_cache
+
+async def get_user_by_id(db: AsyncSession, user_id: int):
+    return await db.get(User, user_id)
+
+async def get_user_by_email(db: AsyncSession, email: str):
+    if email is None:
+        return None
+    return (await db.execute(select(User).where(User.email == email))).scalars().first()
+
+async def get_user_departments(db: AsyncSession, user_ids: Iterable[int]) -> Dict[int, Optional[int]]:
+    """``{user_id: department_id}`` for the ids that exist, in one query."""
+    ids = set(user_ids)
+    if not ids:
+        return {}
+    return dict((await db.execute(select(User.id, User.department_id).where(User.id.in_(ids)))).all())
+
+async def get_all_users(db: AsyncSession):
+    return (await db.execute(select(User))).scalars().all()
+
+USER_COLUMNS = ("id", "email", "full_name", "role", "department_id", "is_active", "created_at")
+
+async def stream_users(db: AsyncSession, batch_size: int = 1000) -> AsyncIterator[dict]:
+    """Every user as a ``UserResponse``-shaped dict, read through a server-side cursor."""
+    q = select(*(getattr(User, c) for c in USER_COLUMNS)).order_by(User.id).execution_options(yield_per = batch_size)
+    result = await db.stream(q)
+    async for row in result.mappings():
+        yield dict(row)
+
+async def get_cached_user_by_id(db: AsyncSession, user_id: int) -> Optional[CachedUser]:
+    user = users_by_id_cache.get(user_id)
+    if user is None:
+        user = CachedUser.from_orm(await get_user_by_id(db, user_id))
+        if user is not None:
+            users_by_id_cache.set(user_id, user)
+    return user
+
+async def get_cached_user_by_email(db: AsyncSession, email: str) -> Optional[CachedUser]:
+    user = users_by_email_cache.get(email)
+    if user is None:
+        user = CachedUser.from_orm(await get_user_by_email(db, email))
+        if user is not None:
+            users_by_email_cache.set(email, user)
+    return user
+
+async def create_user_direct(db: AsyncSession, email: str, full_name: str, password_hash: str = None):
+    return await db.run_sync(user_crud.create_user_direct, email, full_name, password_hash)
+
+async def set_user_password(db: AsyncSession, user: User, password_hash: str):
+    return await db.run_sync(user_crud.set_user_password, user, password_hash)
+
+async def update_password_hash(db: AsyncSession, user: User, password_hash: str):
+    return await db.run_sync(user_crud.update_password_hash, user, password_hash)
+
+async def bump_token_version(db: AsyncSession, user_id: int) -> Optional[int]:
+    return await db.run_sync(user_crud.bump_token_version, user_id)
+
+async def onboard_employees(db: AsyncSession, rows, invited_by: int):
+    return await db.run_sync(onboarding.onboard_employees, rows, invited_by)
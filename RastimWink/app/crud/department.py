@@ -0,0 +1,19 @@
+from dataclasses import dataclass
+from typing import Optional
+from sqlalchemy.orm import Session
+from app.models.department import Department
+from app.core.cache import departments_cache
+
+@dataclass(frozen = True)
+class CachedDepartment:
+    id: int
+    name: str
+
+def get_department(db: Session, department_id: int):
+    return db.query(Department).filter(Department.id == department_id).first()
+
+def get_cached_department(db: Session, department_id: int) -> Optional[CachedDepartment]:
+    def load():
+        department = get_department(db, department_id)
+        return CachedDepartment(department.id, department.name) if department else None
+    return departments_cache.get_or_load(department_id, load)
@@ -0,0 +1,78 @@
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, NamedTuple, Optional
+from sqlalchemy import select, update, func, or_, and_
+from sqlalchemy.orm import Session
+from app.models.email_outbox import EmailOutbox, EmailStatus
+
+class OutboxEmail(NamedTuple):
+    id: int
+    to_email: str
+    from_email: Optional[str]
+    subject: str
+    body: str
+    html: Optional[str]
+    attempts: int
+    locked_until: datetime
+
+def enqueue_email(db: Session, to_email: str, subject: str, body: str, html: Optional[str] = None, from_email: Optional[str] = None) -> EmailOutbox:
+    """Add an email to the outbox in the caller's transaction. Does not commit."""
+    email = EmailOutbox(to_email = to_email, subject = subject, body = body, html = html, from_email = from_email)
+    db.add(email)
+    return email
+
+def claim_emails(db: Session, limit: int, lease_seconds: float, now: Optional[datetime] = None) -> List[OutboxEmail]:
+    """Lock up to ``limit`` due emails for this worker and commit.
+
+    Due means pending with ``next_attempt_at`` reached, or claimed by a worker
+    whose lease ran out (it crashed mid-batch). ``SKIP LOCKED`` lets several
+    workers claim disjoint batches concurrently. The new ``locked_until`` is
+    the claim's token: ``mark_sent``/``mark_failed`` only touch rows that still
+    carry it, so a worker that overran its lease can't overwrite the outcome
+    recorded by the worker that reclaimed them."""
+    now = now or datetime.now(timezone.utc)
+    due = or_(
+        and_(EmailOutbox.status == EmailStatus.pending, EmailOutbox.next_attempt_at <= now),
+        and_(EmailOutbox.status == EmailStatus.sending, EmailOutbox.locked_until < now),
+    )
+    ids = db.execute(
+        select(EmailOutbox.id).where(due).order_by(EmailOutbox.next_attempt_at, EmailOutbox.id).limit(limit).with_for_update(skip_locked = True)
+    ).scalars().all()
+    if not ids:
+        db.commit()
+        return []
+    rows = db.execute(
+        update(EmailOutbox)
+        .where(EmailOutbox.id.in_(ids))
+        .values(status = EmailStatus.sending, locked_until = now + timedelta(seconds = lease_seconds), attempts = EmailOutbox.attempts + 1)
+        .returning(*(getattr(EmailOutbox, f) for f in OutboxEmail._fields))
+    ).all()
+    db.commit()
+    order = {email_id: i for i, email_id in enumerate(ids)}
+    return sorted((OutboxEmail(*row) for row in rows), key = lambda e: order[e.id])
+
+def mark_sent(db: Session, email_ids: Iterable[int], lease: datetime) -> int:
+    """Returns how many of the emails were still claimed with ``lease``. Does not commit."""
+    email_ids = list(email_ids)
+    if not email_ids:
+        return 0
+    return db.execute(
+        update(EmailOutbox).where(EmailOutbox.id.in_(email_ids), EmailOutbox.locked_until == lease)
+        .values(status = EmailStatus.sent, sent_at = func.now(), locked_until = None, last_error = None)
+    ).rowcount
+
+def mark_failed(db: Session, email_id: int, lease: datetime, error: str, retry_at: Optional[datetime] = None) -> int:
+    """Put the email back as pending until ``retry_at``, or give up on it when
+    ``retry_at`` is None. Returns 0 if the claim with ``lease`` was lost. Does
+    not commit."""
+    values = {"locked_until": None, "last_error": error}
+    if retry_at is None:
+        values["status"] = EmailStatus.failed
+    else:
+        values.update(status = EmailStatus.pending, next_attempt_at = retry_at)
+    return db.execute(update(EmailOutbox).where(EmailOutbox.id == email_id, EmailOutbox.locked_until == lease).values(**values)).rowcount
+
+def outbox_status_counts(db: Session) -> Dict[str, int]:
+    counts = {s.value: 0 for s in EmailStatus}
+    for status, count in db.execute(select(EmailOutbox.status, func.count()).group_by(EmailOutbox.status)):
+        counts[status.value] = count
+    return counts
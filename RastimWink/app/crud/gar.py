@@ -1,15 +1,28 @@
+from collections import defaultdict
+from datetime import datetime, timezone
+from math import fsum
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from typing import Tuple, List
-from app.models.task import Task
+from typing import Dict, Tuple, List, Iterable, Optional
+from app.models.task import Task, TaskStatus
 from app.models.subtask import Subtask
 from app.models.user import User
+from app.models.review import ManagerReview
 from app.models.gar_settings import GARSettings
+from app.core.cache import gar_weights_cache
+from app.core.profiling import profiled
 
-def get_gar_weights_db(db: Session):
+def _weights_dict(settings: GARSettings) -> dict:
+    return {"TCR": settings.w_tcr, "GoalProgress": settings.w_goal, "Timeliness": settings.w_timeliness, "Quality": settings.w_quality}
+
+def _load_gar_weights(db: Session) -> dict:
     settings = db.query(GARSettings).first()
     if not settings:
         return {"TCR":0.4, "GoalProgress":0.3, "Timeliness":0.2, "Quality":0.1}
-    return {"TCR": settings.w_tcr, "GoalProgress": settings.w_goal, "Timeliness": settings.w_timeliness, "Quality": settings.w_quality}
+    return _weights_dict(settings)
+
+def get_gar_weights_db(db: Session):
+    return dict(gar_weights_cache.get_or_load("weights", lambda: _load_gar_weights(db)))
 
 def update_gar_weights_db(db: Session, w_tcr: float=None, w_goal: float=None, w_timeliness: float=None, w_quality: float=None):
     settings = db.query(GARSettings).first()
@@ -22,67 +35,177 @@ def update_gar_weights_db(db: Session, w_tcr: float=None, w_goal: float=None, w_
     if w_quality is not None: settings.w_quality = w_quality
     db.commit()
     db.refresh(settings)
-    return {"TCR": settings.w_tcr, "GoalProgress": settings.w_goal, "Timeliness": settings.w_timeliness, "Quality": settings.w_quality}
+    gar_weights_cache.invalidate("weights")
+    return _weights_dict(settings)
 
-def _task_goal_progress(db: Session, task: Task) -> float:
+# Scoring below works on anything exposing the Task column attributes, so the
+# per-employee path (ORM objects) and the batch path (column rows) share it.
+
+def _is_completed(task) -> bool:
+    return task.status in (TaskStatus.completed, "completed")
+
+def _progress_from_subtasks(task, subtasks: Iterable) -> float:
     if task.is_quantitative:
         if task.goal_target and task.goal_target > 0:
             return min(float(task.goal_progress or 0) / float(task.goal_target), 1.0)
         return 0.0
-    subtasks: List[Subtask] = db.query(Subtask).filter(Subtask.task_id == task.id).all()
+    subtasks = list(subtasks)
     if not subtasks:
-        if task.status == "completed": return 1.0
-        if task.status == "in_progress": return 0.5
+        if _is_completed(task): return 1.0
+        if task.status in (TaskStatus.in_progress, "in_progress"): return 0.5
         return 0.0
-    total_weight = sum(s.weight or 1.0 for s in subtasks)
+    total_weight = fsum(s.weight or 1.0 for s in subtasks)
     if total_weight == 0:
         return 0.0
-    done_weight = sum((s.weight or 1.0) for s in subtasks if s.completed)
+    done_weight = fsum((s.weight or 1.0) for s in subtasks if s.completed)
     return done_weight / total_weight
 
-def calculate_gar(db: Session, employee_id: int, since_ts=None, until_ts=None) -> Tuple[dict, dict]:
+def _task_goal_progress(db: Session, task: Task) -> float:
+    if task.is_quantitative:
+        return _progress_from_subtasks(task, ())
+    subtasks: List[Subtask] = db.query(Subtask).filter(Subtask.task_id == task.id).all()
+    return _progress_from_subtasks(task, subtasks)
+
+def _utc(value: datetime) -> datetime:
+    return value.replace(tzinfo = timezone.utc) if value.tzinfo is None else value
+
+def _is_timely(task) -> bool:
+    if task.deadline and task.completed_at:
+        return _utc(task.completed_at) <= _utc(task.deadline)
+    return True
+
+def _components_from_sums(total: int, completed: int, timely: int, progress_sum: float, rating_sum: float, rating_count: int) -> dict:
+    quality_val = (rating_sum / rating_count) if rating_count else 0.0
+    return {
+        "total": total,
+        "completed": completed,
+        "timely": timely,
+        "progress_sum": progress_sum,
+        "rating_sum": rating_sum,
+        "rating_count": rating_count,
+        "TCR": completed / total if total else 0.0,
+        "GoalProgress": (progress_sum / total) if total else 0.0,
+        "Timeliness": (timely / completed) if completed else 0.0,
+        "QualityRaw": quality_val,
+        "Quality": quality_val / 5.0 if quality_val else 0.0,
+    }
+
+def _gar_components(tasks: list, progresses: List[float], ratings: List[float]) -> dict:
+    completed = [t for t in tasks if _is_completed(t)]
+    ratings = [r for r in ratings if r is not None]
+    return _components_from_sums(
+        total = len(tasks),
+        completed = len(completed),
+        timely = sum(1 for t in completed if _is_timely(t)),
+        progress_sum = fsum(progresses),
+        rating_sum = fsum(ratings),
+        rating_count = len(ratings)
+    )
+
+def _score_components(c: dict, weights: dict) -> Tuple[dict, dict, dict]:
+    if c["total"] == 0:
+        return {"GAR":0.0}, {"TCR":"0/0","GoalProgress":"0%","Timeliness":"0/0","Quality":0.0}, weights
+
+    gar_score = (c["TCR"] * weights["TCR"]) + (c["GoalProgress"] * weights["GoalProgress"]) + (c["Timeliness"] * weights["Timeliness"]) + (c["Quality"] * weights["Quality"])
+
+    metrics = {
+        "TCR": f"{c['completed']}/{c['total']}",
+        "GoalProgress": f"{round(c['GoalProgress']*100, 1)}%",
+        "Timeliness": f"{c['timely']}/{c['completed']}",
+        "Quality": round(c["QualityRaw"], 2)
+    }
+    return {"GAR": round(gar_score, 4)}, metrics, weights
+
+def _score_gar(tasks: list, progresses: List[float], ratings: List[float], weights: dict) -> Tuple[dict, dict, dict]:
+    return _score_components(_gar_components(tasks, progresses, ratings), weights)
+
+@profiled
+def calculate_gar(db: Session, employee_id: int, since_ts=None, until_ts=None) -> Tuple[dict, dict, dict]:
     q = db.query(Task).filter(Task.assignee_id == employee_id)
     if since_ts:
         q = q.filter(Task.created_at >= since_ts)
     if until_ts:
         q = q.filter(Task.created_at <= until_ts)
     tasks = q.all()
-    total = len(tasks)
-    if total == 0:
-        return {"GAR":0.0}, {"TCR":"0/0","GoalProgress":"0%","Timeliness":"0/0","Quality":0.0}
-
-    completed_tasks = [t for t in tasks if t.status == "completed"]
-    tcr_val = len(completed_tasks) / total
 
     progresses = [_task_goal_progress(db, t) for t in tasks]
-    goal_progress_val = (sum(progresses) / len(progresses)) if progresses else 0.0
-
-    timely_count = 0
-    for t in completed_tasks:
-        if t.deadline and t.completed_at:
-            if t.completed_at <= t.deadline:
-                timely_count += 1
-        else:
-            timely_count += 1
-    timeliness_val = (timely_count / len(completed_tasks)) if completed_tasks else 0.0
 
-    reviews = db.execute(
-        "SELECT rating FROM manager_reviews mr JOIN tasks t ON mr.task_id = t.id WHERE t.assignee_id = :eid",
-        {"eid": employee_id}
-    ).fetchall()
-    ratings = [r[0] for r in reviews if r[0] is not None]
-    quality_val = (sum(ratings) / len(ratings)) if ratings else 0.0
+    ratings = db.execute(
+        select(ManagerReview.rating).join(Task, ManagerReview.task_id == Task.id).where(Task.assignee_id == employee_id)
+    ).scalars().all()
 
     weights = get_gar_weights_db(db)
+    return _score_gar(tasks, progresses, ratings, weights)
 
-    quality_norm = quality_val / 5.0 if quality_val else 0.0
+def _employee_scope(department_id: Optional[int] = None, employee_ids: Optional[Iterable[int]] = None):
+    scope = select(User.id)
+    if department_id is not None:
+        scope = scope.where(User.department_id == department_id)
+    if employee_ids is not None:
+        scope = scope.where(User.id.in_(list(employee_ids)))
+    return scope
 
-    gar_score = (tcr_val * weights["TCR"]) + (goal_progress_val * weights["GoalProgress"]) + (timeliness_val * weights["Timeliness"]) + (quality_norm * weights["Quality"])
+@profiled
+def _load_gar_inputs(db: Session, scope, since_ts=None, until_ts=None):
+    """Task rows, per-task goal progress and review rows for every assignee in ``scope``."""
+    task_filter = [Task.assignee_id.in_(scope)]
+    if since_ts:
+        task_filter.append(Task.created_at >= since_ts)
+    if until_ts:
+        task_filter.append(Task.created_at <= until_ts)
 
-    metrics = {
-        "TCR": f"{len(completed_tasks)}/{total}",
-        "GoalProgress": f"{round(goal_progress_val*100, 1)}%",
-        "Timeliness": f"{timely_count}/{len(completed_tasks) if completed_tasks else 0}",
-        "Quality": round(quality_val, 2)
+    tasks = db.execute(
+        select(Task.id, Task.assignee_id, Task.status, Task.is_quantitative, Task.goal_target,
+               Task.goal_progress, Task.deadline, Task.completed_at, Task.created_at).where(*task_filter)
+    ).all()
+
+    subtasks_by_task = defaultdict(list)
+    for s in db.execute(
+        select(Subtask.task_id, Subtask.weight, Subtask.completed)
+        .join(Task, Subtask.task_id == Task.id)
+        .where(*task_filter, Task.is_quantitative.isnot(True))
+    ):
+        subtasks_by_task[s.task_id].append(s)
+    progress_by_task = {t.id: _progress_from_subtasks(t, subtasks_by_task.get(t.id, ())) for t in tasks}
+
+    # Quality is never windowed, matching calculate_gar.
+    reviews = db.execute(
+        select(Task.assignee_id, Task.created_at, ManagerReview.rating)
+        .join(Task, ManagerReview.task_id == Task.id)
+        .where(Task.assignee_id.in_(scope))
+    ).all()
+    return tasks, progress_by_task, reviews
+
+@profiled
+def _group_components(tasks, progress_by_task: dict, reviews, key) -> Dict[object, dict]:
+    """GAR components of ``tasks``/``reviews`` grouped by ``key(row)``."""
+    tasks_by_key = defaultdict(list)
+    for t in tasks:
+        tasks_by_key[key(t)].append(t)
+    ratings_by_key = defaultdict(list)
+    for r in reviews:
+        ratings_by_key[key(r)].append(r.rating)
+    return {
+        k: _gar_components(tasks_by_key[k], [progress_by_task[t.id] for t in tasks_by_key[k]], ratings_by_key[k])
+        for k in set(tasks_by_key) | set(ratings_by_key)
     }
-    return {"GAR": round(gar_score, 4)}, metrics, weights
+
+@profiled
+def load_gar_components_batch(db: Session, department_id: Optional[int] = None, employee_ids: Optional[Iterable[int]] = None, since_ts=None, until_ts=None) -> Dict[int, dict]:
+    """Unweighted GAR components for every employee in scope (the whole company by default) in four queries."""
+    scope = _employee_scope(department_id, employee_ids)
+    ids = db.execute(scope).scalars().all()
+    tasks, progress_by_task, reviews = _load_gar_inputs(db, scope, since_ts, until_ts)
+    grouped = _group_components(tasks, progress_by_task, reviews, key = lambda row: row.assignee_id)
+    empty = _gar_components([], [], [])
+    return {employee_id: grouped.get(employee_id, empty) for employee_id in ids}
+
+@profiled
+def calculate_gar_batch(db: Session, department_id: Optional[int] = None, employee_ids: Optional[Iterable[int]] = None, since_ts=None, until_ts=None) -> Dict[int, Tuple[dict, dict, dict]]:
+    """GAR for every employee in scope in five queries.
+
+    Returns ``{employee_id: (gar, metrics, weights)}`` with the same values as
+    calling ``calculate_gar`` for each employee separately."""
+    components = load_gar_components_batch(db, department_id, employee_ids, since_ts, until_ts)
+    weights = get_gar_weights_db(db)
+    return {employee_id: _score_components(c, dict(weights)) for employee_id, c in components.items()}
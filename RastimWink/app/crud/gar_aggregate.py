@@ -0,0 +1,242 @@
+import argparse
+import sys
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from sqlalchemy import select, delete, func, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from typing import Optional, NamedTuple, List
+from app.crud.gar import _task_goal_progress, _progress_from_subtasks, _is_completed, _is_timely, _components_from_sums, _score_components, _employee_scope, _load_gar_inputs, _group_components, get_gar_weights_db, load_gar_components_batch
+from app.models.gar_aggregate import EmployeeGARAggregate, GARPeriodRollup
+from app.models.review import ManagerReview
+from app.models.task import Task
+from app.models.user import User
+
+COUNTERS = ("total_count", "completed_count", "progress_sum", "timely_count", "rating_sum", "rating_count")
+
+# counter column -> key in crud.gar components
+COMPONENT_KEYS = {
+    "total_count": "total",
+    "completed_count": "completed",
+    "progress_sum": "progress_sum",
+    "timely_count": "timely",
+    "rating_sum": "rating_sum",
+    "rating_count": "rating_count",
+}
+
+PERIODS = ("week", "month")
+
+def period_start(ts, period: str) -> date:
+    d = ts.date() if isinstance(ts, datetime) else ts
+    if period == "week":
+        return d - timedelta(days = d.weekday())
+    if period == "month":
+        return d.replace(day = 1)
+    raise ValueError(f"Unknown period {period!r}")
+
+def shift_period(start: date, period: str, n: int) -> date:
+    if period == "week":
+        return start + timedelta(weeks = n)
+    months = start.year * 12 + start.month - 1 + n
+    return date(months // 12, months % 12 + 1, 1)
+
+class TaskSnapshot(NamedTuple):
+    assignee_id: Optional[int]
+    created_at: Optional[datetime]
+    counters: dict
+
+EMPTY_SNAPSHOT = TaskSnapshot(None, None, {})
+
+def snapshot_task(db: Session, task: Optional[Task]) -> TaskSnapshot:
+    """What a task currently contributes to its assignee's aggregate and period rollups.
+
+    Take one before and one after a write (flush first, so subtask changes are
+    visible) and pass both to ``record_task_change``."""
+    if task is None or task.assignee_id is None:
+        return EMPTY_SNAPSHOT
+    completed = _is_completed(task)
+    rating = None
+    if task.id is not None:
+        rating = db.execute(select(ManagerReview.rating).where(ManagerReview.task_id == task.id)).scalar()
+    return TaskSnapshot(task.assignee_id, task.created_at, {
+        "total_count": 1,
+        "completed_count": int(completed),
+        "progress_sum": _task_goal_progress(db, task),
+        "timely_count": int(completed and _is_timely(task)),
+        "rating_sum": rating if rating is not None else 0.0,
+        "rating_count": int(rating is not None),
+    })
+
+def snapshot_new_task(task) -> TaskSnapshot:
+    """``snapshot_task`` for a row that was just inserted: it has no subtasks or
+    review yet, so nothing needs to be queried. ``task`` may be a column row."""
+    if task.assignee_id is None:
+        return EMPTY_SNAPSHOT
+    completed = _is_completed(task)
+    return TaskSnapshot(task.assignee_id, task.created_at, {
+        "total_count": 1,
+        "completed_count": int(completed),
+        "progress_sum": _progress_from_subtasks(task, ()),
+        "timely_count": int(completed and _is_timely(task)),
+        "rating_sum": 0.0,
+        "rating_count": 0,
+    })
+
+def _upsert_delta(db: Session, model, key: dict, delta: dict):
+    delta = {k: v for k, v in delta.items() if v}
+    if not delta:
+        return
+    stmt = insert(model).values(**key, **{k: delta.get(k, 0) for k in COUNTERS})
+    update = {k: getattr(model, k) + stmt.excluded[k] for k in delta}
+    if model is EmployeeGARAggregate:
+        update["updated_at"] = func.now()
+    stmt = stmt.on_conflict_do_update(index_elements = list(key), set_ = update)
+    db.execute(stmt)
+
+def apply_gar_deltas(db: Session, deltas: dict):
+    """Atomically add counter deltas. Keys are ``(employee_id, period, period_start)``
+    with ``period`` None for the all-time aggregate. Does not commit."""
+    for (employee_id, period, start), delta in deltas.items():
+        if period is None:
+            _upsert_delta(db, EmployeeGARAggregate, {"employee_id": employee_id}, delta)
+        else:
+            _upsert_delta(db, GARPeriodRollup, {"employee_id": employee_id, "period": period, "period_start": start}, delta)
+
+def _delta_keys(employee_id: int, created_at):
+    yield (employee_id, None, None)
+    if created_at is not None:
+        for period in PERIODS:
+            yield (employee_id, period, period_start(created_at, period))
+
+def add_snapshot_delta(deltas: dict, snapshot: TaskSnapshot, sign: int = 1):
+    if snapshot.assignee_id is None:
+        return
+    for key in _delta_keys(snapshot.assignee_id, snapshot.created_at):
+        target = deltas.setdefault(key, defaultdict(float))
+        for k, v in snapshot.counters.items():
+            target[k] += sign * v
+
+def record_task_change(db: Session, before: TaskSnapshot, after: TaskSnapshot):
+    deltas = {}
+    add_snapshot_delta(deltas, before, -1)
+    add_snapshot_delta(deltas, after, 1)
+    apply_gar_deltas(db, deltas)
+
+def record_review(db: Session, task_id: int, rating: Optional[float]):
+    if rating is None:
+        return
+    task = db.execute(select(Task.assignee_id, Task.created_at).where(Task.id == task_id)).first()
+    if task is None or task.assignee_id is None:
+        return
+    apply_gar_deltas(db, {key: {"rating_sum": rating, "rating_count": 1} for key in _delta_keys(task.assignee_id, task.created_at)})
+
+def get_gar_from_aggregate(db: Session, employee_id: int):
+    """``calculate_gar`` without a window, from one primary-key read.
+
+    ``progress_sum`` is accumulated from float deltas, so values can differ from
+    the live computation in the last bits. Returns None when the employee has no
+    aggregate row."""
+    row = db.get(EmployeeGARAggregate, employee_id)
+    if row is None:
+        return None
+    components = _components_from_sums(row.total_count, row.completed_count, row.timely_count, row.progress_sum, row.rating_sum, row.rating_count)
+    return _score_components(components, get_gar_weights_db(db))
+
+def get_gar_trend(db: Session, employee_id: Optional[int] = None, department_id: Optional[int] = None, period: str = "month", periods: int = 12, until: Optional[date] = None) -> List[dict]:
+    """GAR per week or month for one employee or a whole department, oldest first.
+
+    Each point covers the tasks created in that period and the reviews of those
+    tasks. Reads only ``gar_period_rollups``; periods without data score 0."""
+    last = period_start(until or date.today(), period)
+    first = shift_period(last, period, -(periods - 1))
+    sums = [func.sum(getattr(GARPeriodRollup, k)).label(k) for k in COUNTERS]
+    q = (
+        select(GARPeriodRollup.period_start, *sums)
+        .where(GARPeriodRollup.period == period, GARPeriodRollup.period_start.between(first, last))
+        .group_by(GARPeriodRollup.period_start)
+    )
+    if employee_id is not None:
+        q = q.where(GARPeriodRollup.employee_id == employee_id)
+    if department_id is not None:
+        q = q.join(User, User.id == GARPeriodRollup.employee_id).where(User.department_id == department_id)
+    rows = {r.period_start: r for r in db.execute(q)}
+
+    weights = get_gar_weights_db(db)
+    points = []
+    for i in range(periods):
+        start = shift_period(first, period, i)
+        r = rows.get(start)
+        components = _components_from_sums(*(
+            (r.total_count, r.completed_count, r.timely_count, r.progress_sum, r.rating_sum, r.rating_count) if r else (0, 0, 0, 0.0, 0.0, 0)
+        ))
+        gar_res, metrics, _ = _score_components(components, weights)
+        points.append({"period_start": start, "GAR": float(gar_res["GAR"]), "metrics": metrics})
+    return points
+
+def _counter_rows(components: dict, key_columns) -> List[dict]:
+    return [
+        {**dict(zip(key_columns, key)), **{col: c[ck] for col, ck in COMPONENT_KEYS.items()}}
+        for key, c in components.items()
+        if c["total"] or c["rating_count"]
+    ]
+
+def rebuild_gar_aggregates(db: Session) -> int:
+    # Writers update these tables inside their own transaction, so holding the
+    # locks for the whole rebuild keeps their deltas from landing on stale rows.
+    db.execute(text("LOCK TABLE employee_gar_aggregates, gar_period_rollups IN EXCLUSIVE MODE"))
+    tasks, progress_by_task, reviews = _load_gar_inputs(db, _employee_scope())
+
+    db.execute(delete(EmployeeGARAggregate))
+    db.execute(delete(GARPeriodRollup))
+
+    totals = _group_components(tasks, progress_by_task, reviews, key = lambda row: (row.assignee_id,))
+    rows = _counter_rows(totals, ("employee_id",))
+    if rows:
+        db.execute(insert(EmployeeGARAggregate), rows)
+
+    for period in PERIODS:
+        buckets = _group_components(
+            [t for t in tasks if t.created_at is not None], progress_by_task, [r for r in reviews if r.created_at is not None],
+            key = lambda row: (row.assignee_id, period, period_start(row.created_at, period))
+        )
+        rollup_rows = _counter_rows(buckets, ("employee_id", "period", "period_start"))
+        if rollup_rows:
+            db.execute(insert(GARPeriodRollup), rollup_rows)
+
+    db.commit()
+    return len(rows)
+
+def check_gar_aggregates(db: Session, tolerance: float = 1e-6) -> List[dict]:
+    """Compare stored all-time counters with a live recomputation; returns the mismatches."""
+    live = load_gar_components_batch(db)
+    stored = {row.employee_id: row for row in db.query(EmployeeGARAggregate).all()}
+    mismatches = []
+    for employee_id in sorted(set(live) | set(stored)):
+        c = live.get(employee_id)
+        row = stored.get(employee_id)
+        for col, key in COMPONENT_KEYS.items():
+            expected = c[key] if c else 0
+            actual = getattr(row, col) if row else 0
+            if abs((actual or 0) - expected) > tolerance:
+                mismatches.append({"employee_id": employee_id, "field": col, "stored": actual, "live": expected})
+    return mismatches
+
+if __name__ == "__main__":
+    from app.database import SessionLocal
+
+    parser = argparse.ArgumentParser(description = "Maintain the employee_gar_aggregates and gar_period_rollups tables")
+    parser.add_argument("command", choices = ["rebuild", "check"])
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if args.command == "rebuild":
+            print(f"rebuilt {rebuild_gar_aggregates(db)} employee aggregates")
+        else:
+            mismatches = check_gar_aggregates(db)
+            for m in mismatches:
+                print(f"employee {m['employee_id']}: {m['field']} stored={m['stored']} live={m['live']}")
+            print(f"{len(mismatches)} mismatches")
+            sys.exit(1 if mismatches else 0)
+    finally:
+        db.close()
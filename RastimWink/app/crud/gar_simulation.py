@@ -0,0 +1,86 @@
+import numpy as np
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from app.crud.gar import load_gar_components_batch, get_gar_weights_db
+
+GAR_COMPONENTS = ("TCR", "GoalProgress", "Timeliness", "Quality")
+
+class GARMatrix:
+    """Per-employee GAR components held column-wise.
+
+    ``components`` has one row per employee (sorted by id) and one column per
+    entry of ``GAR_COMPONENTS``; ``has_tasks`` masks employees whose GAR is
+    pinned to 0 because they have no tasks in the window."""
+
+    def __init__(self, employee_ids: np.ndarray, components: np.ndarray, has_tasks: np.ndarray):
+        self.employee_ids = employee_ids
+        self.components = components
+        self.has_tasks = has_tasks
+
+    def __len__(self):
+        return len(self.employee_ids)
+
+def build_gar_matrix(db: Session, department_id: Optional[int] = None, since_ts=None, until_ts=None) -> GARMatrix:
+    components = load_gar_components_batch(db, department_id=department_id, since_ts=since_ts, until_ts=until_ts)
+    ids = sorted(components)
+    matrix = np.array([[components[i][k] for k in GAR_COMPONENTS] for i in ids], dtype = np.float64).reshape(len(ids), len(GAR_COMPONENTS))
+    has_tasks = np.array([components[i]["total"] > 0 for i in ids], dtype = bool)
+    return GARMatrix(np.array(ids, dtype = np.int64), matrix, has_tasks)
+
+def weight_vectors(candidates: List[dict], base: dict) -> np.ndarray:
+    """(k, 4) weight matrix; components missing from a candidate fall back to ``base``."""
+    return np.array([[c.get(k) if c.get(k) is not None else base[k] for k in GAR_COMPONENTS] for c in candidates], dtype = np.float64).reshape(len(candidates), len(GAR_COMPONENTS))
+
+def score_matrix(matrix: GARMatrix, weights: np.ndarray) -> np.ndarray:
+    """(n, k) GAR scores of every employee under every weight vector."""
+    scores = matrix.components @ weights.T
+    scores[~matrix.has_tasks] = 0.0
+    return np.round(scores, 4)
+
+def rank_scores(scores: np.ndarray) -> np.ndarray:
+    """1-based rank of each employee per column, highest score first; ties keep id order."""
+    order = np.argsort(-scores, axis = 0, kind = "stable")
+    ranks = np.empty_like(order)
+    np.put_along_axis(ranks, order, np.arange(1, scores.shape[0] + 1)[:, None].repeat(scores.shape[1], axis = 1), axis = 0)
+    return ranks
+
+def simulate_gar_weights(db: Session, candidates: List[dict], department_id: Optional[int] = None, since_ts=None, until_ts=None, top: Optional[int] = None) -> dict:
+    """Rescore every employee under the current weights and each candidate at once.
+
+    Nothing is written to ``gar_settings``; rank changes are relative to the
+    ranking under the current weights (positive means moved up)."""
+    current = get_gar_weights_db(db)
+    matrix = build_gar_matrix(db, department_id, since_ts, until_ts)
+    weights = weight_vectors([current] + list(candidates), current)
+
+    scores = score_matrix(matrix, weights)
+    ranks = rank_scores(scores)
+    rank_changes = ranks[:, :1] - ranks
+
+    def ranking(col: int) -> List[dict]:
+        order = np.argsort(ranks[:, col], kind = "stable")
+        if top is not None:
+            order = order[:top]
+        return [
+            {
+                "employee_id": int(matrix.employee_ids[i]),
+                "GAR": float(scores[i, col]),
+                "rank": int(ranks[i, col]),
+                "rank_change": int(rank_changes[i, col])
+            }
+            for i in order
+        ]
+
+    return {
+        "employees": len(matrix),
+        "current": {"weights": current, "ranking": ranking(0)},
+        "candidates": [
+            {
+                "weights": dict(zip(GAR_COMPONENTS, map(float, weights[col]))),
+                "moved": int(np.count_nonzero(rank_changes[:, col])),
+                "max_rank_change": int(np.abs(rank_changes[:, col]).max()) if len(matrix) else 0,
+                "ranking": ranking(col)
+            }
+            for col in range(1, weights.shape[0])
+        ]
+    }
@@ -0,0 +1,21 @@
+from sqlalchemy.orm import Session
+from app.models.idea import Idea, IdeaStatus
+from app.schemas.idea import IdeaCreate
+
+def get_idea(db: Session, idea_id: int):
+    return db.get(Idea, idea_id)
+
+def create_idea(db: Session, idea: IdeaCreate, author_id: int):
+    db_idea = Idea(**idea.model_dump(), author_id = author_id)
+    db.add(db_idea)
+    db.commit()
+    db.refresh(db_idea)
+    return db_idea
+
+def set_idea_status(db: Session, idea_id: int, status: IdeaStatus):
+    db_idea = get_idea(db, idea_id)
+    if db_idea:
+        db_idea.status = status
+        db.commit()
+        db.refresh(db_idea)
+    return db_idea
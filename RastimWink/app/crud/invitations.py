@@ -5,18 +5,12 @@ from datetime import datetime, timedelta
 from app.models.stats import EmployeeInvitation
 from app.models.user import User
 from app.schemas.stats import InvitationCreate
-from app.auth import get_password_hash
+from app.crud.user import invalidate_user_cache, allocate_corporate_emails, corporate_email_base
 
-def generate_corporate_email(full_name: str, db: Session):
-    base_name = full_name.lower().replace(' ', '.')
-    corporate_email = f"{base_name}@wink.ru"
-
-    counter = 1
-    while db.query(User).filter(User.email == corporate_email).first():
-        corporate_email = f"{base_name}.{counter}@wink.ru"
-        counter += 1
+INVITATION_TTL = timedelta(days=7)
 
-    return corporate_email
+def generate_corporate_email(full_name: str, db: Session):
+    return allocate_corporate_emails(db, [corporate_email_base(full_name)])[0]
 
 def create_invitation(db: Session, invitation: InvitationCreate, invited_by: int):
     corporate_email = generate_corporate_email(invitation.full_name, db)
@@ -28,7 +22,7 @@ def create_invitation(db: Session, invitation: InvitationCreate, invited_by: int
         corporate_email=corporate_email,
         token=token,
         invited_by=invited_by,
-        expires_at=datetime.utcnow() + timedelta(days=7)
+        expires_at=datetime.utcnow() + INVITATION_TTL
     )
     
     db.add(db_invitation)
@@ -37,7 +31,7 @@ def create_invitation(db: Session, invitation: InvitationCreate, invited_by: int
     
     return db_invitation
 
-def activate_invitation(db: Session, token: str, password: str):
+def activate_invitation(db: Session, token: str, password_hash: str):
     invitation = db.query(EmployeeInvitation).filter(
         EmployeeInvitation.token == token,
         EmployeeInvitation.is_activated == False,
@@ -47,19 +41,26 @@ def activate_invitation(db: Session, token: str, password: str):
     if not invitation:
         return None
     
-    user = User(
-        email=invitation.corporate_email,
-        password_hash=get_password_hash(password),
-        full_name=invitation.email.split('@')[0].replace('.', ' ').title(),
-        role="employee",
-        department_id=1
-    )
-    
-    db.add(user)
+    # Onboarded employees already have an inactive user holding the corporate address.
+    user = db.query(User).filter(User.corporate_email == invitation.corporate_email).first()
+    if user:
+        user.password_hash = password_hash
+        user.is_active = True
+    else:
+        user = User(
+            email=invitation.corporate_email,
+            corporate_email=invitation.corporate_email,
+            password_hash=password_hash,
+            full_name=invitation.email.split('@')[0].replace('.', ' ').title(),
+            role="employee",
+            department_id=1
+        )
+        db.add(user)
     
     invitation.is_activated = True
     invitation.activated_at = datetime.utcnow()
     
     db.commit()
+    invalidate_user_cache(user.id, user.email, user.corporate_email)
     
     return user
\ No newline at end of file
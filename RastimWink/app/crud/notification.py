@@ -1,6 +1,16 @@
+from typing import Iterable, List, Optional
+from sqlalchemy import select, insert, update, func, literal
 from sqlalchemy.orm import Session
 from app.models.notification import Notification
+from app.models.user import User
 from app.schemas.notification import NotificationBase
+from app.core.notifications import notification_hub
+
+EVENT_COLUMNS = ("id", "user_id", "title", "message", "type", "related_entity_id", "is_read", "created_at")
+
+def notification_event(notification) -> dict:
+    """``NotificationResponse``-shaped dict as published to the notification hub."""
+    return {c: getattr(notification, c) for c in EVENT_COLUMNS}
 
 def create_notification(db: Session, notification: NotificationBase, user_id: int):
     db_notification = Notification(
@@ -10,19 +20,65 @@ def create_notification(db: Session, notification: NotificationBase, user_id: in
     db.add(db_notification)
     db.commit()
     db.refresh(db_notification)
+    notification_hub.publish(notification_event(db_notification))
     return db_notification
 
+def _publish_rows(rows) -> List[dict]:
+    events = [dict(row._mapping) for row in rows]
+    for event in events:
+        notification_hub.publish(event)
+    return events
+
+def create_notifications(db: Session, notification: NotificationBase, user_ids: Iterable[int]) -> List[dict]:
+    """One notification per user in a single INSERT ... RETURNING; returns the events in input order."""
+    rows = [{**notification.dict(), "user_id": user_id, "is_read": False} for user_id in dict.fromkeys(user_ids)]
+    if not rows:
+        return []
+    result = db.execute(
+        insert(Notification).returning(*(getattr(Notification, c) for c in EVENT_COLUMNS), sort_by_parameter_order = True),
+        rows
+    ).all()
+    db.commit()
+    return _publish_rows(result)
+
+def create_department_notifications(db: Session, notification: NotificationBase, department_id: int) -> List[dict]:
+    """Notify every active member of a department with one INSERT ... SELECT."""
+    values = notification.dict()
+    source = select(
+        User.id, *(literal(values[c], type_ = getattr(Notification, c).type).label(c) for c in values), literal(False).label("is_read")
+    ).where(User.department_id == department_id, User.is_active == True).order_by(User.id)
+    result = db.execute(
+        insert(Notification)
+        .from_select(["user_id", *values, "is_read"], source)
+        .returning(*(getattr(Notification, c) for c in EVENT_COLUMNS))
+    ).all()
+    db.commit()
+    return _publish_rows(result)
+
 def get_user_notifications(db: Session, user_id: int, skip: int = 0, limit: int = 100):
     return db.query(Notification).filter(
         Notification.user_id == user_id
     ).offset(skip).limit(limit).all()
 
-def mark_notification_as_read(db: Session, notification_id: int):
-    db_notification = db.query(Notification).filter(
-        Notification.id == notification_id
-    ).first()
-    if db_notification:
-        db_notification.is_read = True
-        db.commit()
-        db.refresh(db_notification)
-    return db_notification
\ No newline at end of file
+def mark_notification_as_read(db: Session, notification_id: int, user_id: Optional[int] = None):
+    q = update(Notification).where(Notification.id == notification_id).values(is_read = True).returning(Notification)
+    if user_id is not None:
+        q = q.where(Notification.user_id == user_id)
+    db_notification = db.execute(q).scalars().first()
+    db.commit()
+    return db_notification
+
+def mark_notifications_read(db: Session, user_id: int, ids: Optional[Iterable[int]] = None, up_to_id: Optional[int] = None) -> int:
+    """Mark a user's unread notifications read in one UPDATE: those in ``ids``,
+    those with id up to ``up_to_id``, or all of them. Returns how many changed."""
+    q = update(Notification).where(Notification.user_id == user_id, Notification.is_read == False)
+    if ids is not None:
+        q = q.where(Notification.id.in_(list(ids)))
+    if up_to_id is not None:
+        q = q.where(Notification.id <= up_to_id)
+    count = db.execute(q.values(is_read = True).execution_options(synchronize_session = False)).rowcount
+    db.commit()
+    return count
+
+def count_unread_notifications(db: Session, user_id: int) -> int:
+    return db.scalar(select(func.count()).select_from(Notification).where(Notification.user_id == user_id, Notification.is_read == False))
@@ -0,0 +1,69 @@
+import secrets
+from datetime import datetime
+from typing import List
+from sqlalchemy import select, insert
+from sqlalchemy.orm import Session
+from app.models.department import Department
+from app.models.email_outbox import EmailOutbox
+from app.models.stats import EmployeeInvitation
+from app.models.user import User
+from app.schemas.user import OnboardingRow
+from app.crud.user import allocate_corporate_emails, corporate_email_base, invalidate_user_cache
+from app.crud.invitations import INVITATION_TTL
+from app.email_service import set_password_email
+
+def onboard_employees(db: Session, rows: List[OnboardingRow], invited_by: int) -> List[dict]:
+    """Create inactive users, their invitations and invitation emails for a cohort.
+
+    Rows whose personal email is already registered (or repeats an earlier row)
+    or whose department does not exist are reported and skipped; the rest are
+    written with one multi-row INSERT per table and a single commit. Returns
+    one ``OnboardingResult``-shaped dict per input row, in order."""
+    emails = [r.email for r in rows]
+    registered = set(db.execute(select(User.email).where(User.email.in_(set(emails)))).scalars()) if rows else set()
+    department_ids = {r.department_id for r in rows if r.department_id is not None}
+    departments = set(db.execute(select(Department.id).where(Department.id.in_(department_ids))).scalars()) if department_ids else set()
+
+    results = [{"row": i, "email": r.email, "status": "created"} for i, r in enumerate(rows)]
+    accepted = []
+    seen = set()
+    for i, (row, email) in enumerate(zip(rows, emails)):
+        if email in registered:
+            results[i].update(status = "skipped", error = "email already registered")
+        elif email in seen:
+            results[i].update(status = "skipped", error = "duplicate email in request")
+        elif row.department_id is not None and row.department_id not in departments:
+            results[i].update(status = "skipped", error = f"department {row.department_id} does not exist")
+        else:
+            accepted.append(i)
+        seen.add(email)
+    if not accepted:
+        return results
+
+    corporate = allocate_corporate_emails(db, [corporate_email_base(f"{rows[i].first_name} {rows[i].last_name}") for i in accepted])
+    user_ids = db.execute(
+        insert(User).returning(User.id, sort_by_parameter_order = True),
+        [
+            {
+                "email": rows[i].email, "corporate_email": corp, "full_name": f"{rows[i].first_name.strip()} {rows[i].last_name.strip()}",
+                "role": rows[i].role, "department_id": rows[i].department_id, "is_active": False
+            }
+            for i, corp in zip(accepted, corporate)
+        ]
+    ).scalars().all()
+
+    expires_at = datetime.utcnow() + INVITATION_TTL
+    invitations, outbox = [], []
+    for i, corp in zip(accepted, corporate):
+        token = secrets.token_urlsafe(32)
+        invitations.append({"email": rows[i].email, "corporate_email": corp, "token": token, "invited_by": invited_by, "expires_at": expires_at})
+        subject, body = set_password_email(corp, f"https://wink.ru/activate?token={token}")
+        outbox.append({"to_email": rows[i].email, "subject": subject, "body": body})
+    db.execute(insert(EmployeeInvitation), invitations)
+    db.execute(insert(EmailOutbox), outbox)
+    db.commit()
+
+    for i, corp, user_id in zip(accepted, corporate, user_ids):
+        results[i].update(user_id = user_id, corporate_email = corp)
+        invalidate_user_cache(user_id, rows[i].email, corp)
+    return results
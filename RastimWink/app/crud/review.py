@@ -1,16 +1,28 @@
+from sqlalchemy import update, func
 from sqlalchemy.orm import Session
 from app.models.review import EmployeeComment, ManagerReview
 from app.schemas.review import EmployeeCommentCreate, ManagerReviewCreate
-from app.models.task import Task
+from app.models.task import Task, TaskStatus
+from app.models.task_commenter import TaskCommenter
+from app.crud.gar_aggregate import record_review, snapshot_task, record_task_change
+from app.crud.task import sync_completed_at, get_task_for_update
 
 def create_employee_comment(db: Session, comment: EmployeeCommentCreate, employee_id: int):
     db_comment = EmployeeComment(**comment.dict(), employee_id = employee_id)
     db.add(db_comment)
 
-    task = db.query(Task).filter(Task.id == comment.task_id).first()
-    if task:
-        task.comments_received += 1
-    
+    # Counter and obligation are updated in SQL so concurrent comments on one
+    # task cannot lose increments.
+    db.execute(
+        update(Task).where(Task.id == comment.task_id)
+        .values(comments_received = func.coalesce(Task.comments_received, 0) + 1)
+    )
+    db.execute(
+        update(TaskCommenter)
+        .where(TaskCommenter.task_id == comment.task_id, TaskCommenter.user_id == employee_id, TaskCommenter.commented_at.is_(None))
+        .values(commented_at = func.now())
+    )
+
     db.commit()
     db.refresh(db_comment)
     return db_comment
@@ -18,6 +30,21 @@ def create_employee_comment(db: Session, comment: EmployeeCommentCreate, employe
 def create_manager_review(db: Session, review: ManagerReviewCreate, manager_id: int):
     db_review = ManagerReview(**review.dict(), manager_id = manager_id)
     db.add(db_review)
+    record_review(db, review.task_id, review.rating)
+    db.commit()
+    db.refresh(db_review)
+    return db_review
+
+def submit_manager_review(db: Session, review: ManagerReviewCreate, manager_id: int):
+    """Store the review and mark its task completed in one transaction."""
+    task = get_task_for_update(db, review.task_id)
+    before = snapshot_task(db, task)
+    db_review = ManagerReview(**review.model_dump(), manager_id = manager_id)
+    db.add(db_review)
+    task.status = TaskStatus.completed
+    sync_completed_at(task)
+    db.flush()
+    record_task_change(db, before, snapshot_task(db, task))
     db.commit()
     db.refresh(db_review)
     return db_review
@@ -4,6 +4,7 @@ from app.models.user import User
 from app.models.task import Task
 from app.models.review import ManagerReview
 from datetime import datetime
+from app.crud.gar_aggregate import get_gar_trend
 
 def get_employee_stats(db: Session, employee_id: int):
     return db.query(EmployeeStats).filter(EmployeeStats.employee_id == employee_id).first()
@@ -44,6 +45,7 @@ def get_employee_detailed_stats(db: Session, employee_id: int):
         "employee_name": employee.full_name,
         "tasks_completed": tasks_completed,
         "average_rating": avg_rating,
+        "perfomance_trend": [p["GAR"] for p in get_gar_trend(db, employee_id = employee_id, period = "month", periods = 12)],
         "recent_reviews": [
             {
                 "task_id": r.task_id,
@@ -0,0 +1,52 @@
+from sqlalchemy.orm import Session
+from app.models.subtask import Subtask
+from app.schemas.subtask import SubtaskCreate, SubtaskUpdate
+from app.crud.gar_aggregate import snapshot_task, record_task_change
+from app.crud.task import get_task_for_update
+
+def get_subtask(db: Session, subtask_id: int):
+    return db.query(Subtask).filter(Subtask.id == subtask_id).first()
+
+def get_task_subtasks(db: Session, task_id: int):
+    return db.query(Subtask).filter(Subtask.task_id == task_id).all()
+
+def _task_of(db: Session, task_id: int):
+    return get_task_for_update(db, task_id)
+
+def create_subtask(db: Session, subtask: SubtaskCreate):
+    task = _task_of(db, subtask.task_id)
+    before = snapshot_task(db, task)
+    db_subtask = Subtask(**subtask.dict())
+    db.add(db_subtask)
+    db.flush()
+    record_task_change(db, before, snapshot_task(db, task))
+    db.commit()
+    db.refresh(db_subtask)
+    return db_subtask
+
+def update_subtask(db: Session, subtask_id: int, subtask_update: SubtaskUpdate):
+    db_subtask = get_subtask(db, subtask_id)
+    if db_subtask:
+        task = _task_of(db, db_subtask.task_id)
+        before = snapshot_task(db, task)
+        for field, value in subtask_update.dict(exclude_unset = True).items():
+            setattr(db_subtask, field, value)
+        db.flush()
+        record_task_change(db, before, snapshot_task(db, task))
+        db.commit()
+        db.refresh(db_subtask)
+    return db_subtask
+
+def set_subtask_completed(db: Session, subtask_id: int, completed: bool = True):
+    return update_subtask(db, subtask_id, SubtaskUpdate(completed = completed))
+
+def delete_subtask(db: Session, subtask_id: int):
+    db_subtask = get_subtask(db, subtask_id)
+    if db_subtask:
+        task = _task_of(db, db_subtask.task_id)
+        before = snapshot_task(db, task)
+        db.delete(db_subtask)
+        db.flush()
+        record_task_change(db, before, snapshot_task(db, task))
+        db.commit()
+    return db_subtask
@@ -1,39 +1,94 @@
+from datetime import datetime, timezone
+from typing import List
+from sqlalchemy import delete
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
-from app.models.task import Task
+from app.models.task import Task, TaskStatus
+from app.models.task_commenter import TaskCommenter
 from app.schemas.task import TaskCreate, TaskUpdate
+from app.crud.gar_aggregate import snapshot_task, record_task_change, EMPTY_SNAPSHOT
 
 def get_task(db: Session, task_id: int):
     return db.query(Task).filter(Task.id == task_id).first()
 
+def get_task_for_update(db: Session, task_id: int):
+    """The task row locked until commit, freshly loaded even if already in the session.
+
+    Writers take it before ``snapshot_task`` so concurrent changes to one task
+    are applied to the GAR aggregates one after another, never from the same
+    "before" state."""
+    return db.query(Task).filter(Task.id == task_id).with_for_update().populate_existing().first()
+
 def get_tasks(db: Session, skip: int = 0, limit: int = 100):
     return db.query(Task).offset(skip).limit(limit).all()
 
 def get_user_tasks(db: Session, user_id: int):
     return db.query(Task).filter(Task.assignee_id == user_id).all()
 
+def sync_completed_at(task: Task):
+    """Stamp ``completed_at`` when a task enters ``completed`` and clear it when it leaves."""
+    if task.status == TaskStatus.completed:
+        if task.completed_at is None:
+            task.completed_at = datetime.now(timezone.utc)
+    else:
+        task.completed_at = None
+
 def create_task(db: Session, task: TaskCreate, creator_id: int):
     db_task = Task(
         **task.dict(),
         creator_id = creator_id
     )
     db.add(db_task)
+    db.flush()
+    record_task_change(db, EMPTY_SNAPSHOT, snapshot_task(db, db_task))
     db.commit()
     db.refresh(db_task)
     return db_task
 
 def update_task(db: Session, task_id: int, task_update: TaskUpdate):
-    db_task = get_task(db, task_id)
+    db_task = get_task_for_update(db, task_id)
     if db_task:
+        before = snapshot_task(db, db_task)
         update_data = task_update.dict(exclude_unset = True)
         for field, value in update_data.items():
             setattr(db_task, field, value)
+        if "status" in update_data:
+            sync_completed_at(db_task)
+        db.flush()
+        record_task_change(db, before, snapshot_task(db, db_task))
         db.commit()
         db.refresh(db_task)
     return db_task
 
-def delete_task(db: Session, task_id: int):
+def assign_commenters(db: Session, task_id: int, user_ids: List[int], min_comments: int):
+    """Make ``user_ids`` the task's commenters in one multi-row insert.
+
+    Open assignments of users not in ``user_ids`` are dropped; assignments
+    already fulfilled by a comment are kept."""
     db_task = get_task(db, task_id)
     if db_task:
+        db.execute(
+            delete(TaskCommenter).where(
+                TaskCommenter.task_id == task_id,
+                TaskCommenter.commented_at.is_(None),
+                TaskCommenter.user_id.notin_(user_ids)
+            )
+        )
+        db.execute(
+            insert(TaskCommenter)
+            .values([{"task_id": task_id, "user_id": user_id} for user_id in user_ids])
+            .on_conflict_do_nothing(index_elements = ["task_id", "user_id"])
+        )
+        db_task.comments_required = True
+        db_task.min_comments = min_comments
+        db.commit()
+        db.refresh(db_task)
+    return db_task
+
+def delete_task(db: Session, task_id: int):
+    db_task = get_task_for_update(db, task_id)
+    if db_task:
+        record_task_change(db, snapshot_task(db, db_task), EMPTY_SNAPSHOT)
         db.delete(db_task)
         db.commit()
-    return db_task
\ No newline at end of file
+    return db_task
@@ -0,0 +1,47 @@
+from typing import Dict, List, Iterable, Optional, Set, Tuple
+from sqlalchemy import select, insert
+from sqlalchemy.orm import Session
+from app.models.department import Department
+from app.models.task import Task
+from app.models.user import User
+from app.schemas.task import TaskCreate
+from app.crud.gar_aggregate import snapshot_new_task, add_snapshot_delta, apply_gar_deltas
+
+IMPORT_BATCH_SIZE = 500
+
+EXPORT_COLUMNS = (
+    "id", "title", "description", "status", "priority", "assignee_id", "creator_id", "department_id",
+    "created_at", "updated_at", "deadline", "completed_at", "comments_required", "min_comments", "comments_received",
+)
+
+def check_references(db: Session, tasks: Iterable[TaskCreate]) -> Tuple[Dict[int, Optional[int]], Set[int]]:
+    """``{assignee_id: department_id}`` for the assignees of ``tasks`` that exist,
+    and the department ids referenced that do not exist, in two queries."""
+    tasks = list(tasks)
+    user_ids = {t.assignee_id for t in tasks}
+    department_ids = {t.department_id for t in tasks if t.department_id is not None}
+    assignees = dict(db.execute(select(User.id, User.department_id).where(User.id.in_(user_ids))).all()) if user_ids else {}
+    found_departments = set(db.execute(select(Department.id).where(Department.id.in_(department_ids))).scalars()) if department_ids else set()
+    return assignees, department_ids - found_departments
+
+def insert_task_batch(db: Session, tasks: List[TaskCreate], creator_id: int) -> List[int]:
+    """Insert ``tasks`` and their GAR deltas in one transaction.
+
+    SQLAlchemy's insertmanyvalues sends this as multi-row INSERT ... RETURNING
+    statements; returns the new ids in input order."""
+    if not tasks:
+        return []
+    rows = db.execute(
+        insert(Task).returning(
+            Task.id, Task.assignee_id, Task.status, Task.is_quantitative, Task.goal_target,
+            Task.goal_progress, Task.deadline, Task.completed_at, Task.created_at,
+            sort_by_parameter_order = True
+        ),
+        [{**t.model_dump(), "creator_id": creator_id} for t in tasks]
+    ).all()
+    deltas = {}
+    for row in rows:
+        add_snapshot_delta(deltas, snapshot_new_task(row))
+    apply_gar_deltas(db, deltas)
+    db.commit()
+    return [row.id for row in rows]
@@ -1,8 +1,15 @@
+from dataclasses import dataclass
+from datetime import datetime
+import re
+from typing import List, Optional
+from sqlalchemy import select, update, union_all, or_
 from sqlalchemy.orm import Session
-from fastapi import BackgroundTasks
-from app.models.user import User
+from app.models.user import User, UserRole
+from app.models.stats import EmployeeInvitation
+from app.core.cache import users_by_id_cache, users_by_email_cache
 from app.core.security import create_set_password_token
-from app.email_service import send_set_password_email
+from app.email_service import set_password_email
+from app.crud.email_outbox import enqueue_email
 
 def get_user_by_email(db: Session, email: str):
     if email is None:
@@ -10,7 +17,48 @@ def get_user_by_email(db: Session, email: str):
     return db.query(User).filter(User.email == email).first()
 
 def get_user_by_id(db: Session, user_id: int):
-    return db.query(User).filter(User,id == user_id).first()
+    return db.query(User).filter(User.id == user_id).first()
+
+@dataclass(frozen = True)
+class CachedUser:
+    """Read-only copy of a user row that is safe to share between sessions."""
+    id: int
+    email: str
+    corporate_email: Optional[str]
+    full_name: str
+    role: UserRole
+    department_id: Optional[int]
+    is_active: bool
+    created_at: Optional[datetime]
+    token_version: int = 0
+
+    @classmethod
+    def from_orm(cls, user: Optional[User]) -> Optional["CachedUser"]:
+        if user is None:
+            return None
+        return cls(user.id, user.email, user.corporate_email, user.full_name, user.role, user.department_id, user.is_active, user.created_at, user.token_version or 0)
+
+def get_cached_user_by_id(db: Session, user_id: int) -> Optional[CachedUser]:
+    return users_by_id_cache.get_or_load(user_id, lambda: CachedUser.from_orm(get_user_by_id(db, user_id)))
+
+def get_cached_user_by_email(db: Session, email: str) -> Optional[CachedUser]:
+    if email is None:
+        return None
+    return users_by_email_cache.get_or_load(email, lambda: CachedUser.from_orm(get_user_by_email(db, email)))
+
+def invalidate_user_cache(user_id: Optional[int] = None, *emails: Optional[str]):
+    if user_id is not None:
+        users_by_id_cache.invalidate(user_id)
+    users_by_email_cache.invalidate(*[e for e in emails if e])
+
+def bump_token_version(db: Session, user_id: int) -> Optional[int]:
+    """Invalidate every token issued to the user so far; call on logout and role changes."""
+    version = db.execute(
+        update(User).where(User.id == user_id).values(token_version = User.token_version + 1).returning(User.token_version)
+    ).scalar()
+    db.commit()
+    invalidate_user_cache(user_id)
+    return version
 
 def get_all_users(db: Session):
     return db.query(User).all()
@@ -20,25 +68,74 @@ def create_user_direct(db: Session, email: str, full_name: str, password_hash: s
     db.add(user)
     db.commit()
     db.refresh(user)
+    invalidate_user_cache(user.id, user.email)
+    return user
+
+def set_user_password(db: Session, user: User, password_hash: str):
+    user.password_hash = password_hash
+    user.is_active = True
+    db.commit()
+    invalidate_user_cache(user.id, user.email, user.corporate_email)
     return user
 
+def update_password_hash(db: Session, user: User, password_hash: str):
+    """Swap in a rehashed password (same password, newer scheme or cost)."""
+    user.password_hash = password_hash
+    db.commit()
+    invalidate_user_cache(user.id, user.email, user.corporate_email)
+    return user
+
+CORPORATE_DOMAIN = "@wink.ru"
+_CORPORATE_EMAIL = re.compile(r"(.*?)(\d*)" + re.escape(CORPORATE_DOMAIN))
+
+def corporate_email_base(full_name: str) -> str:
+    return ".".join(full_name.lower().split())
+
+def allocate_corporate_emails(db: Session, bases: List[str]) -> List[str]:
+    """A free corporate address for each entry of ``bases`` (repeats allowed), with one query.
+
+    Addresses go ``base@wink.ru``, ``base1@wink.ru``, ``base2@wink.ru`` and so on,
+    taking the lowest free suffix. Addresses of users (corporate or login) and
+    of invitations not yet activated count as taken."""
+    unique = list(dict.fromkeys(bases))
+    if not unique:
+        return []
+    taken_rows = db.execute(union_all(
+        select(User.corporate_email.label("email")).where(or_(*(User.corporate_email.startswith(b, autoescape = True) for b in unique))),
+        select(User.email).where(or_(*(User.email.startswith(b, autoescape = True) for b in unique))),
+        select(EmployeeInvitation.corporate_email).where(
+            EmployeeInvitation.is_activated == False,
+            or_(*(EmployeeInvitation.corporate_email.startswith(b, autoescape = True) for b in unique))
+        )
+    )).scalars()
+    taken = {b: set() for b in unique}
+    for email in taken_rows:
+        m = _CORPORATE_EMAIL.fullmatch(email or "")
+        if m and m.group(1) in taken:
+            taken[m.group(1)].add(int(m.group(2) or 0))
+    emails = []
+    for b in bases:
+        suffix = 0
+        while suffix in taken[b]:
+            suffix += 1
+        taken[b].add(suffix)
+        emails.append(f"{b}{suffix or ''}{CORPORATE_DOMAIN}")
+    return emails
+
 def generate_corporate_email(db: Session, first_name: str, last_name: str) -> str:
-    base = f"{first_name.lower()}.{last_name.lower()}"
-    domain = "@wink.ru"
-    email = base + domain
-    count = 1
-    while db.query(User).filter(User.corporate_email == email).first():
-        email = f"{base}{count}{domain}"
-        count += 1
-    return email
-
-def create_user(db: Session, background_tasks: BackgroundTasks, first_name: str, last_name: str, personal_email: str):
+    return allocate_corporate_emails(db, [corporate_email_base(f"{first_name} {last_name}")])[0]
+
+def create_user(db: Session, first_name: str, last_name: str, personal_email: str):
+    """Create an inactive user and queue the set-password email in the same transaction."""
     corporate_email = generate_corporate_email(db, first_name, last_name)
-    user = User(first_name = first_name, last_name = last_name, email = personal_email, corporate_email = corporate_email, is_active = False)
+    user = User(full_name = f"{first_name} {last_name}", email = personal_email, corporate_email = corporate_email, is_active = False)
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    db.flush()
     token = create_set_password_token(user.id)
     link = f"https://wink.ru/set-password?token={token}"
-    background_tasks.add_task(send_set_password_email, personal_email, corporate_email, link)
-    return user
\ No newline at end of file
+    subject, body = set_password_email(corporate_email, link)
+    enqueue_email(db, personal_email, subject, body)
+    db.commit()
+    db.refresh(user)
+    invalidate_user_cache(user.id, user.email, user.corporate_email)
+    return user
@@ -1,7 +1,10 @@
 import os
+import queue
 import smtplib
+import time
+from contextlib import contextmanager
 from email.message import EmailMessage
-from typing import Optional
+from typing import Optional, Tuple
 from dotenv import load_dotenv
 from fastapi.concurrency import run_in_threadpool
 
@@ -11,31 +14,134 @@ SMTP_SERVER = os.getenv("SMTP_SERVER", "smtp.gmail.com")
 SMTP_PORT = int(os.getenv("SMTP_PORT", 587))
 SMTP_USER = os.getenv("SMTP_USER")
 SMTP_PASSWORD = os.getenv("SMTP_PASSWORD")
+SMTP_STARTTLS = os.getenv("SMTP_STARTTLS", "true").lower() not in ("0", "false", "no")
+SMTP_TIMEOUT = float(os.getenv("SMTP_TIMEOUT", 30))
 DEFAULT_FROM = os.getenv("EMAIL_FROM", SMTP_USER or "noreply@wink.ru")
 
-def send_email(to_email: str, subject: str, body: str, html: Optional[str] = None, from_email: Optional[str] = None):
-    from_email = from_email or DEFAULT_FROM
-    if not all([SMTP_SERVER, SMTP_PORT, SMTP_USER, SMTP_PASSWORD]):
-        raise RuntimeError("SMTP config missing")
+def build_message(to_email: str, subject: str, body: str, html: Optional[str] = None, from_email: Optional[str] = None) -> EmailMessage:
     msg = EmailMessage()
-    msg["From"] = from_email
+    msg["From"] = from_email or DEFAULT_FROM
     msg["To"] = to_email
     msg["Subject"] = subject
     msg.set_content(body)
     if html:
         msg.add_alternative(html, subtype = "html")
-    with smtplib.SMTP(SMTP_SERVER, SMTP_PORT) as server:
-        server.starttls()
-        server.login(SMTP_USER, SMTP_PASSWORD)
-        server.send_message(msg)
+    return msg
+
+def is_permanent_error(exc: Exception) -> bool:
+    """5xx replies (bad address, rejected content) will fail again on retry."""
+    if isinstance(exc, smtplib.SMTPRecipientsRefused):
+        return all(500 <= code < 600 for code, _ in exc.recipients.values())
+    if isinstance(exc, smtplib.SMTPResponseException):
+        return 500 <= exc.smtp_code < 600
+    return False
+
+class SMTPConnection:
+    """One SMTP session (connect, STARTTLS, login) reused across messages.
+
+    The session is reopened when the server drops it or after it sat idle for
+    ``idle_timeout`` seconds, which is shorter than typical server timeouts."""
+
+    def __init__(self, host: str = SMTP_SERVER, port: int = SMTP_PORT, user: Optional[str] = SMTP_USER, password: Optional[str] = SMTP_PASSWORD,
+                 starttls: bool = SMTP_STARTTLS, timeout: float = SMTP_TIMEOUT, idle_timeout: float = 60.0):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.starttls = starttls
+        self.timeout = timeout
+        self.idle_timeout = idle_timeout
+        self.connects = 0
+        self._smtp: Optional[smtplib.SMTP] = None
+        self._last_used = 0.0
+
+    def _open(self):
+        if not self.host or not self.port or (self.user and not self.password):
+            raise RuntimeError("SMTP config missing")
+        smtp = smtplib.SMTP(self.host, self.port, timeout = self.timeout)
+        try:
+            if self.starttls:
+                smtp.starttls()
+            if self.user:
+                smtp.login(self.user, self.password)
+        except Exception:
+            smtp.close()
+            raise
+        self._smtp = smtp
+        self.connects += 1
+
+    def send(self, msg: EmailMessage):
+        if self._smtp is not None and time.monotonic() - self._last_used > self.idle_timeout:
+            self.close()
+        if self._smtp is None:
+            self._open()
+        try:
+            self._smtp.send_message(msg)
+        except smtplib.SMTPServerDisconnected:
+            self.close()
+            self._open()
+            self._smtp.send_message(msg)
+        except (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPDataError):
+            # The server rejected this message; smtplib has reset the session for the next one.
+            raise
+        except OSError:
+            self.close()
+            raise
+        finally:
+            self._last_used = time.monotonic()
+
+    def close(self):
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except (smtplib.SMTPException, OSError):
+                self._smtp.close()
+            self._smtp = None
+
+class SMTPPool:
+    """A fixed set of ``SMTPConnection``s shared by sender threads."""
+
+    def __init__(self, size: int = 1, **connection_kwargs):
+        self.size = size
+        self._connections = [SMTPConnection(**connection_kwargs) for _ in range(size)]
+        self._idle: "queue.Queue[SMTPConnection]" = queue.Queue()
+        for conn in self._connections:
+            self._idle.put(conn)
+
+    @contextmanager
+    def connection(self):
+        conn = self._idle.get()
+        try:
+            yield conn
+        finally:
+            self._idle.put(conn)
+
+    def send(self, msg: EmailMessage):
+        with self.connection() as conn:
+            conn.send(msg)
+
+    @property
+    def connects(self) -> int:
+        return sum(c.connects for c in self._connections)
+
+    def close(self):
+        for conn in self._connections:
+            conn.close()
+
+def send_email(to_email: str, subject: str, body: str, html: Optional[str] = None, from_email: Optional[str] = None):
+    """Send one message over a fresh connection. Bulk and user-facing mail should
+    go through the outbox (``crud.email_outbox.enqueue_email``) instead."""
+    conn = SMTPConnection()
+    try:
+        conn.send(build_message(to_email, subject, body, html, from_email))
+    finally:
+        conn.close()
 
 async def send_email_async(to_email: str, subject: str, body: str, html: Optional[str] = None, from_email: Optional[str] = None):
     await run_in_threadpool(send_email, to_email, subject, body, html, from_email)
 
-def send_set_password_email(personal_email: str, corporate_email: str, link: str):
+def set_password_email(corporate_email: str, link: str) -> Tuple[str, str]:
+    """Subject and body of the invitation to set a password."""
     subject = "Wink - настройка пароля"
-    body = f"Вам создана корпоративная почта: {corporate_email}\\nУстановите пароль: {link}"
-    try:
-        send_email(personal_email, subject, body)
-    except Exception:
-        pass
\ No newline at end of file
+    body = f"Вам создана корпоративная почта: {corporate_email}\nУстановите пароль: {link}"
+    return subject, body
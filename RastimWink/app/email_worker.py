@@ -0,0 +1,143 @@
+"""Drains the email outbox: ``python -m app.email_worker``.
+
+Run one or more of these next to the web workers; they claim disjoint batches,
+send them over a small pool of reused SMTP connections and record the outcome
+of the whole batch in one transaction."""
+import argparse
+import logging
+import random
+import signal
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from app.core.config import settings
+from app.crud.email_outbox import OutboxEmail, claim_emails, mark_sent, mark_failed, outbox_status_counts
+from app.email_service import SMTPPool, build_message, is_permanent_error
+
+logger = logging.getLogger("app.email_worker")
+
+# Returned by ``_send`` for emails not attempted because the batch's lease ran
+# out; another worker may have reclaimed them already.
+LEASE_EXPIRED = object()
+
+class EmailWorker:
+    def __init__(self, session_factory, pool: SMTPPool, batch_size: int = settings.EMAIL_BATCH_SIZE, poll_interval: float = settings.EMAIL_POLL_SECONDS,
+                 max_attempts: int = settings.EMAIL_MAX_ATTEMPTS, retry_base: float = settings.EMAIL_RETRY_BASE_SECONDS,
+                 retry_max: float = settings.EMAIL_RETRY_MAX_SECONDS, lease_seconds: float = settings.EMAIL_LEASE_SECONDS):
+        self.session_factory = session_factory
+        self.pool = pool
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self.lease_seconds = lease_seconds
+        self.metrics = Counter()
+        self._stop = threading.Event()
+        self._executor = ThreadPoolExecutor(max_workers = pool.size)
+
+    def retry_delay(self, attempts: int) -> float:
+        """Exponential backoff with +-20% jitter so failed batches don't retry in lockstep."""
+        delay = min(self.retry_base * 2 ** (attempts - 1), self.retry_max)
+        return delay * random.uniform(0.8, 1.2)
+
+    def _send(self, email: OutboxEmail, deadline: float):
+        if time.monotonic() >= deadline:
+            return LEASE_EXPIRED
+        try:
+            self.pool.send(build_message(email.to_email, email.subject, email.body, email.html, email.from_email))
+        except Exception as exc:
+            return exc
+        return None
+
+    def run_once(self) -> int:
+        """Send one batch; returns how many emails were claimed.
+
+        Emails are only sent while the batch's lease lasts (measured from
+        before the claim); the rest stay claimed until the lease expires and
+        are picked up again. Outcomes are recorded only for rows still held."""
+        deadline = time.monotonic() + self.lease_seconds
+        with self.session_factory() as db:
+            batch = claim_emails(db, self.batch_size, self.lease_seconds)
+            if not batch:
+                return 0
+            lease = batch[0].locked_until
+            results = list(self._executor.map(self._send, batch, [deadline] * len(batch)))
+            now = datetime.now(timezone.utc)
+            sent = [email.id for email, error in zip(batch, results) if error is None]
+            recorded = mark_sent(db, sent, lease)
+            attempted = len(sent)
+            for email, error in zip(batch, results):
+                if error is None:
+                    self.metrics["sent"] += 1
+                elif error is LEASE_EXPIRED:
+                    self.metrics["expired"] += 1
+                elif is_permanent_error(error) or email.attempts >= self.max_attempts:
+                    self.metrics["failed"] += 1
+                    logger.warning("giving up on email %s to %s after %s attempts: %r", email.id, email.to_email, email.attempts, error)
+                    recorded += mark_failed(db, email.id, lease, repr(error))
+                    attempted += 1
+                else:
+                    self.metrics["retried"] += 1
+                    recorded += mark_failed(db, email.id, lease, repr(error), now + timedelta(seconds = self.retry_delay(email.attempts)))
+                    attempted += 1
+            db.commit()
+        if recorded < attempted:
+            self.metrics["lease_lost"] += attempted - recorded
+            logger.warning("lease of %s emails ran out before their outcome was recorded", attempted - recorded)
+        self.metrics["batches"] += 1
+        return len(batch)
+
+    def stats(self) -> dict:
+        with self.session_factory() as db:
+            statuses = outbox_status_counts(db)
+        return {"outbox": statuses, "worker": dict(self.metrics), "smtp_connects": self.pool.connects}
+
+    def run(self, report_interval: float = 60.0):
+        next_report = time.monotonic() + report_interval
+        while not self._stop.is_set():
+            try:
+                claimed = self.run_once()
+            except Exception:
+                logger.exception("email batch failed")
+                claimed = 0
+            if time.monotonic() >= next_report:
+                logger.info("email worker stats: %s", self.stats())
+                next_report = time.monotonic() + report_interval
+            # A full batch means more are probably due; don't wait.
+            if claimed < self.batch_size:
+                self._stop.wait(self.poll_interval)
+
+    def stop(self):
+        self._stop.set()
+
+    def close(self):
+        self._executor.shutdown()
+        self.pool.close()
+
+if __name__ == "__main__":
+    from app.database import SessionLocal
+
+    parser = argparse.ArgumentParser(description = "Send emails queued in the email_outbox table")
+    parser.add_argument("--once", action = "store_true", help = "send one batch and exit")
+    parser.add_argument("--stats", action = "store_true", help = "print outbox counts per status and exit")
+    parser.add_argument("--batch-size", type = int, default = settings.EMAIL_BATCH_SIZE)
+    parser.add_argument("--connections", type = int, default = settings.EMAIL_SMTP_CONNECTIONS)
+    args = parser.parse_args()
+    logging.basicConfig(level = logging.INFO, format = "%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    worker = EmailWorker(SessionLocal, SMTPPool(args.connections), batch_size = args.batch_size)
+    try:
+        if args.stats:
+            print(worker.stats())
+        elif args.once:
+            print(f"claimed {worker.run_once()} emails; {worker.stats()}")
+        else:
+            signal.signal(signal.SIGTERM, lambda *_: worker.stop())
+            signal.signal(signal.SIGINT, lambda *_: worker.stop())
+            worker.run()
+    finally:
+        worker.close()
@@ -0,0 +1,12 @@
+from app.models.department import Department
+from app.models.user import User, UserRole
+from app.models.task import Task, TaskStatus, TaskPriority
+from app.models.subtask import Subtask
+from app.models.task_commenter import TaskCommenter
+from app.models.review import EmployeeComment, ManagerReview
+from app.models.idea import Idea, IdeaStatus
+from app.models.notification import Notification
+from app.models.email_outbox import EmailOutbox, EmailStatus
+from app.models.stats import EmployeeStats, EmployeeInvitation
+from app.models.gar_settings import GARSettings
+from app.models.gar_aggregate import EmployeeGARAggregate, GARPeriodRollup
@@ -0,0 +1,39 @@
+from sqlalchemy import Column, Integer, String, Text, Enum, DateTime, Index, text
+from sqlalchemy.sql import func
+import enum
+from app.database import Base
+
+class EmailStatus(enum.Enum):
+    pending = "pending"
+    sending = "sending"
+    sent = "sent"
+    failed = "failed"
+
+class EmailOutbox(Base):
+    """An email waiting to be sent by ``app.email_worker``.
+
+    Rows are added in the same transaction as the change that causes the email,
+    so a rollback drops the email too and a commit guarantees it is sent."""
+    __tablename__ = "email_outbox"
+
+    id = Column(Integer, primary_key = True)
+    to_email = Column(String, nullable = False)
+    from_email = Column(String)
+    subject = Column(String, nullable = False)
+    body = Column(Text, nullable = False)
+    html = Column(Text)
+    status = Column(Enum(EmailStatus), default = EmailStatus.pending, nullable = False)
+    attempts = Column(Integer, default = 0, nullable = False)
+    next_attempt_at = Column(DateTime(timezone = True), server_default = func.now(), nullable = False)
+    locked_until = Column(DateTime(timezone = True))
+    last_error = Column(Text)
+    created_at = Column(DateTime(timezone = True), server_default = func.now())
+    sent_at = Column(DateTime(timezone = True))
+
+    # The worker polls due rows; sent and failed rows stay out of the index.
+    __table_args__ = (
+        Index(
+            "ix_email_outbox_due", "next_attempt_at",
+            postgresql_where = text("status IN ('pending', 'sending')")
+        ),
+    )
@@ -0,0 +1,32 @@
+from sqlalchemy import Column, Integer, Float, String, Date, DateTime, ForeignKey, Index
+from sqlalchemy.sql import func
+from app.database import Base
+
+class EmployeeGARAggregate(Base):
+    __tablename__ = "employee_gar_aggregates"
+
+    employee_id = Column(Integer, ForeignKey("users.id"), primary_key = True)
+    total_count = Column(Integer, nullable = False, default = 0)
+    completed_count = Column(Integer, nullable = False, default = 0)
+    progress_sum = Column(Float, nullable = False, default = 0.0)
+    timely_count = Column(Integer, nullable = False, default = 0)
+    rating_sum = Column(Float, nullable = False, default = 0.0)
+    rating_count = Column(Integer, nullable = False, default = 0)
+    updated_at = Column(DateTime(timezone = True), server_default = func.now(), onupdate = func.now())
+
+class GARPeriodRollup(Base):
+    __tablename__ = "gar_period_rollups"
+
+    employee_id = Column(Integer, ForeignKey("users.id"), primary_key = True)
+    period = Column(String, primary_key = True)
+    period_start = Column(Date, primary_key = True)
+    total_count = Column(Integer, nullable = False, default = 0)
+    completed_count = Column(Integer, nullable = False, default = 0)
+    progress_sum = Column(Float, nullable = False, default = 0.0)
+    timely_count = Column(Integer, nullable = False, default = 0)
+    rating_sum = Column(Float, nullable = False, default = 0.0)
+    rating_count = Column(Integer, nullable = False, default = 0)
+
+    __table_args__ = (
+        Index("ix_gar_period_rollups_period_start", "period", "period_start"),
+    )
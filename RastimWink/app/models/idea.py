@@ -0,0 +1,25 @@
+from sqlalchemy import Column, Integer, Text, Enum, DateTime, ForeignKey
+from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship
+import enum
+from app.database import Base
+
+class IdeaStatus(enum.Enum):
+    proposed = "proposed"
+    under_review = "under_review"
+    accepted = "accepted"
+    rejected = "rejected"
+    implemented = "implemented"
+
+class Idea(Base):
+    __tablename__ = "ideas"
+
+    id = Column(Integer, primary_key = True, index = True)
+    task_id = Column(Integer, ForeignKey("tasks.id"), index = True)
+    author_id = Column(Integer, ForeignKey("users.id"), nullable = False, index = True)
+    comment = Column(Text, nullable = False)
+    status = Column(Enum(IdeaStatus), default = IdeaStatus.proposed, nullable = False)
+    created_at = Column(DateTime(timezone = True), server_default = func.now())
+
+    task = relationship("Task")
+    author = relationship("User")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Index, text
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.database import Base
@@ -11,8 +11,18 @@ class Notification(Base):
     title = Column(String, nullable = False)
     message = Column(String, nullable = False)
     type = Column(String, nullable = False)
-    is_read = Column(Boolean, default = False)
+    is_read = Column(Boolean, default = False, nullable = False, server_default = text("false"))
     related_entity_id = Column(Integer)
-    created_id = Column(DateTime(timezone = True), server_default = func.now())
+    created_at = Column(DateTime(timezone = True), server_default = func.now())
 
-    user = relationship("User", back_populates = "notifications")
\ No newline at end of file
+    user = relationship("User", back_populates = "notifications")
+
+    # A user's inbox pages by id, and stream reconnects replay ids after the last one seen.
+    __table_args__ = (
+        Index("ix_notifications_user_id_id", "user_id", "id"),
+        # Unread badge and mark-read updates only touch unread rows.
+        Index(
+            "ix_notifications_unread_by_user", "user_id", "is_read", "id",
+            postgresql_where = text("is_read = false")
+        ),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, Float
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, Float, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.database import Base
@@ -7,12 +7,17 @@ class EmployeeComment(Base):
     __tablename__ = "employee_comments"
 
     id = Column(Integer, primary_key = True, index = True)
-    task_id = Column(Integer, ForeignKey("task.id"), nullable = False)
-    empoyee_id = Column(Integer, ForeignKey("users.id"), nullable = False)
+    task_id = Column(Integer, ForeignKey("tasks.id"), nullable = False)
+    employee_id = Column(Integer, ForeignKey("users.id"), nullable = False)
     comment = Column(Text, nullable = False)
     created_at = Column(DateTime(timezone = True), server_default = func.now())
 
-    task = relationship("User", back_populates = "comments_given")
+    task = relationship("Task", back_populates = "employee_comments")
+    employee = relationship("User")
+
+    __table_args__ = (
+        Index("ix_employee_comments_task_employee", "task_id", "employee_id"),
+    )
 
 class ManagerReview(Base):
     __tablename__ = "manager_reviews"
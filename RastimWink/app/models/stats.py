@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text, Boolean
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text, Boolean, Index, text
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.database import Base
@@ -29,4 +29,12 @@ class EmployeeInvitation(Base):
     is_activated = Column(Boolean, default = False)
     activated_at = Column(DateTime(timezone = True))
     created_at = Column(DateTime(timezone = True), server_default = func.now())
-    expires_at = Column(DateTime(timezone = True))
\ No newline at end of file
+    expires_at = Column(DateTime(timezone = True))
+
+    __table_args__ = (
+        Index(
+            "ix_employee_invitations_pending_corporate_email", "corporate_email",
+            postgresql_ops = {"corporate_email": "text_pattern_ops"},
+            postgresql_where = text("is_activated = false")
+        ),
+    )
@@ -9,5 +9,6 @@ class Subtask(Base):
     task_id = Column(Integer, ForeignKey("tasks.id"), nullable = False)
     title = Column(String, nullable = False)
     weight = Column(Float, default = 1.0)
+    completed = Column(Boolean, default = False)
 
     task = relationship("Task", back_populates = "subtasks")
\ No newline at end of file
@@ -1,5 +1,5 @@
 from time import timezone
-from sqlalchemy import Column, Integer, String, Text, Enum, DateTime, ForeignKey, Boolean, Float
+from sqlalchemy import Column, Integer, String, Text, Enum, DateTime, ForeignKey, Boolean, Float, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 import enum
@@ -26,7 +26,7 @@ class Task(Base):
     description = Column(Text)
     status = Column(Enum(TaskStatus), default = TaskStatus.pending, nullable = False)
     priority = Column(Enum(TaskPriority), default = TaskPriority.medium, nullable = False)
-    assignee_id = Column(Integer, ForeignKey("departments.id"))
+    assignee_id = Column(Integer, ForeignKey("users.id"))
     creator_id = Column(Integer, ForeignKey("users.id"), nullable = False)
     department_id = Column(Integer, ForeignKey("departments.id"))
     created_at = Column(DateTime(timezone = True), server_default = func.now())
@@ -45,4 +45,16 @@ class Task(Base):
     department = relationship("Department", back_populates = "tasks")
     employee_comments = relationship("EmployeeComment", back_populates = "task")
     manager_review = relationship("ManagerReview", back_populates = "task", uselist = False)
-    subtasks = relationship("Subtask", back_populates = "task", uselist = False)
\ No newline at end of file
+    subtasks = relationship("Subtask", back_populates = "task")
+    commenters = relationship("TaskCommenter", back_populates = "task", passive_deletes = True)
+
+    # Task listings page on (created_at, id) newest first, optionally narrowed
+    # to one assignee, creator, department or status.
+    __table_args__ = (
+        Index("ix_tasks_created_at_id", "created_at", "id"),
+        Index("ix_tasks_assignee_created_at_id", "assignee_id", "created_at", "id"),
+        Index("ix_tasks_creator_created_at_id", "creator_id", "created_at", "id"),
+        Index("ix_tasks_department_created_at_id", "department_id", "created_at", "id"),
+        Index("ix_tasks_status_created_at_id", "status", "created_at", "id"),
+        Index("ix_tasks_deadline", "deadline"),
+    )
@@ -0,0 +1,24 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Index, text
+from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship
+from app.database import Base
+
+class TaskCommenter(Base):
+    """An employee assigned to comment on a task; ``commented_at`` is set by their first comment."""
+    __tablename__ = "task_commenters"
+
+    task_id = Column(Integer, ForeignKey("tasks.id", ondelete = "CASCADE"), primary_key = True)
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key = True)
+    assigned_at = Column(DateTime(timezone = True), server_default = func.now(), nullable = False)
+    commented_at = Column(DateTime(timezone = True))
+
+    task = relationship("Task", back_populates = "commenters")
+    user = relationship("User")
+
+    # Open obligations per user: the pending-comments inbox and the late report.
+    __table_args__ = (
+        Index(
+            "ix_task_commenters_open_by_user", "user_id", "task_id",
+            postgresql_where = text("commented_at IS NULL")
+        ),
+    )
@@ -1,6 +1,4 @@
-from email.policy import default
-from app.crud import notification
-from sqlalchemy import Column, Integer, String, Boolean, Enum, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Boolean, Enum, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
@@ -18,14 +16,23 @@ class User(Base):
     id = Column(Integer, primary_key = True, index = True)
     email = Column(String, unique = True, index = True, nullable = False)
     corporate_email = Column(String, unique = True, index = True, nullable = True)
-    password_hash = Column(String, nullable = False)
+    # Empty until an invited user sets a password.
+    password_hash = Column(String, nullable = True)
     full_name = Column(String, nullable = False)
     role = Column(Enum(UserRole), default = UserRole.employee, nullable = False)
     department_id = Column(Integer, ForeignKey("departments.id"))
     is_active = Column(Boolean, default = True)
+    token_version = Column(Integer, default = 0, nullable = False, server_default = "0")
     created_at = Column(DateTime(timezone = True), server_default = func.now())
 
-    department = relationship("Department", back_populates = "user")
+    department = relationship("Department", back_populates = "users")
     tasks_created = relationship("Task", foreign_keys = "Task.creator_id", back_populates = "creator")
-    task_assigned = relationship("Task", foreign_keys = "Task.assignee_id", back_populates = "assignee")
-    notifications = relationship("Notification", back_populates = "user")
\ No newline at end of file
+    tasks_assigned = relationship("Task", foreign_keys = "Task.assignee_id", back_populates = "assignee")
+    notifications = relationship("Notification", back_populates = "user")
+
+    # Corporate email allocation looks up taken addresses by prefix (LIKE 'base%');
+    # users activated from an invitation before corporate_email was set hold theirs in email.
+    __table_args__ = (
+        Index("ix_users_corporate_email_pattern", "corporate_email", postgresql_ops = {"corporate_email": "text_pattern_ops"}),
+        Index("ix_users_email_pattern", "email", postgresql_ops = {"email": "text_pattern_ops"}),
+    )
@@ -0,0 +1,10 @@
+from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db
+from app.repositories.base import Repository
+from app.repositories.sql import SqlRepository
+from app.repositories.memory import MemoryRepository, MemoryUser
+
+def get_repository(db: AsyncSession = Depends(get_async_db)) -> Repository:
+    """Request-scoped repository; override this dependency to swap in ``MemoryRepository``."""
+    return SqlRepository(db)
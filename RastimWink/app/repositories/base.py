@@ -0,0 +1,85 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Dict, List, Optional
+from app.models.idea import IdeaStatus
+from app.models.user import UserRole
+from app.schemas.idea import IdeaCreate, IdeaResponse
+from app.schemas.review import EmployeeCommentResponse, ManagerReviewResponse
+from app.schemas.task import TaskCreate, TaskUpdate, TaskResponse
+
+def group_late_commenters(rows) -> List[dict]:
+    """Group ``(user_id, full_name, task_id, deadline)`` rows, most overdue assignments first."""
+    report = {}
+    for user_id, full_name, task_id, deadline in rows:
+        entry = report.setdefault(user_id, {"employee_id": user_id, "employee_name": full_name, "overdue": 0, "oldest_deadline": deadline, "task_ids": []})
+        entry["overdue"] += 1
+        entry["oldest_deadline"] = min(entry["oldest_deadline"], deadline)
+        entry["task_ids"].append(task_id)
+    return sorted(report.values(), key = lambda e: (-e["overdue"], e["employee_id"]))
+
+class Repository(ABC):
+    """Storage behind the task, comment, review and idea endpoints.
+
+    Every method returns response schemas, so routes do not depend on whether
+    the data came from the database or from the in-memory test double."""
+
+    @abstractmethod
+    async def get_task(self, task_id: int) -> Optional[TaskResponse]: ...
+
+    @abstractmethod
+    async def create_task(self, task: TaskCreate, creator_id: int) -> TaskResponse: ...
+
+    @abstractmethod
+    async def update_task(self, task_id: int, task_update: TaskUpdate) -> Optional[TaskResponse]: ...
+
+    @abstractmethod
+    async def assign_commenters(self, task_id: int, user_ids: List[int], min_comments: int) -> Optional[TaskResponse]: ...
+
+    @abstractmethod
+    async def get_user_roles(self, user_ids: List[int]) -> Dict[int, UserRole]: ...
+
+    @abstractmethod
+    async def add_comment(self, task_id: int, employee_id: int, comment: str) -> EmployeeCommentResponse: ...
+
+    @abstractmethod
+    async def list_comments(self, task_id: int) -> List[EmployeeCommentResponse]: ...
+
+    @abstractmethod
+    async def count_comments(self, task_id: int) -> int: ...
+
+    @abstractmethod
+    async def get_review(self, task_id: int) -> Optional[ManagerReviewResponse]: ...
+
+    @abstractmethod
+    async def add_review(self, task_id: int, manager_id: int, comment: str, rating: float) -> ManagerReviewResponse:
+        """Store the review and mark the task completed."""
+
+    @abstractmethod
+    async def pending_comment_tasks(self, user_id: int) -> List[TaskResponse]:
+        """Open tasks ``user_id`` is assigned to comment on and has not commented on yet."""
+
+    @abstractmethod
+    async def count_pending_comment_tasks(self, user_id: int) -> int: ...
+
+    @abstractmethod
+    async def late_commenters(self, now: datetime, department_id: Optional[int] = None) -> List[dict]:
+        """Per employee, the open comment assignments on tasks whose deadline has passed."""
+
+    @abstractmethod
+    async def list_ideas(self) -> List[IdeaResponse]: ...
+
+    @abstractmethod
+    async def create_idea(self, idea: IdeaCreate, author_id: int) -> IdeaResponse: ...
+
+    @abstractmethod
+    async def set_idea_status(self, idea_id: int, status: IdeaStatus) -> Optional[IdeaResponse]: ...
+
+    @abstractmethod
+    async def task_status_counts(self, department_id: Optional[int] = None, since: Optional[datetime] = None, until: Optional[datetime] = None) -> Dict[str, int]:
+        """Tasks per status value plus ``"total"``, for tasks of ``department_id`` created in ``[since, until]``."""
+
+    @abstractmethod
+    async def employee_performance(self, department_id: Optional[int] = None, since: Optional[datetime] = None, until: Optional[datetime] = None) -> List[dict]:
+        """Per assignee of reviewed completed tasks: ``employee_id``, ``employee_name``,
+        ``total_tasks`` and ``average_rating``. Filters apply to the employee's
+        department and to the review date."""
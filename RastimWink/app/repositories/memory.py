@@ -0,0 +1,176 @@
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, NamedTuple
+from app.models.idea import IdeaStatus
+from app.models.task import TaskStatus
+from app.models.user import UserRole
+from app.repositories.base import Repository, group_late_commenters
+from app.schemas.idea import IdeaCreate, IdeaResponse
+from app.schemas.review import EmployeeCommentResponse, ManagerReviewResponse
+from app.schemas.task import TaskCreate, TaskUpdate, TaskResponse
+
+class MemoryUser(NamedTuple):
+    full_name: str
+    role: UserRole
+    department_id: Optional[int] = None
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+def _in_range(ts: datetime, since: Optional[datetime], until: Optional[datetime]) -> bool:
+    # Naive bounds are taken as UTC, as timestamptz comparisons do in Postgres.
+    since = since.replace(tzinfo = timezone.utc) if since is not None and since.tzinfo is None else since
+    until = until.replace(tzinfo = timezone.utc) if until is not None and until.tzinfo is None else until
+    return (since is None or ts >= since) and (until is None or ts <= until)
+
+class MemoryRepository(Repository):
+    """Dict-backed test double: every lookup by id is a single dict access.
+
+    Not shared between processes; use it by overriding ``get_repository``.
+    ``users`` maps user id to a ``MemoryUser``."""
+
+    def __init__(self, users: Optional[Dict[int, MemoryUser]] = None):
+        self.users: Dict[int, MemoryUser] = {i: MemoryUser(*u) for i, u in (users or {}).items()}
+        self.tasks: Dict[int, TaskResponse] = {}
+        self.comments: Dict[int, List[EmployeeCommentResponse]] = defaultdict(list)
+        self.commented: set = set()
+        self.commenters: Dict[int, set] = defaultdict(set)
+        self.open_assignments: Dict[int, set] = defaultdict(set)
+        self.reviews: Dict[int, ManagerReviewResponse] = {}
+        self.ideas: Dict[int, IdeaResponse] = {}
+        self._next_id = defaultdict(lambda: 1)
+
+    def _id(self, kind: str) -> int:
+        value = self._next_id[kind]
+        self._next_id[kind] = value + 1
+        return value
+
+    def _name(self, user_id: int) -> str:
+        user = self.users.get(user_id)
+        return user.full_name if user else ""
+
+    async def get_task(self, task_id: int) -> Optional[TaskResponse]:
+        return self.tasks.get(task_id)
+
+    async def create_task(self, task: TaskCreate, creator_id: int) -> TaskResponse:
+        t = TaskResponse(**task.model_dump(), id = self._id("task"), status = TaskStatus.pending, creator_id = creator_id, created_at = _now())
+        self.tasks[t.id] = t
+        return t
+
+    async def update_task(self, task_id: int, task_update: TaskUpdate) -> Optional[TaskResponse]:
+        t = self.tasks.get(task_id)
+        if t is None:
+            return None
+        data = task_update.model_dump(exclude_unset = True)
+        if "status" in data:
+            data["completed_at"] = (t.completed_at or _now()) if data["status"] == TaskStatus.completed else None
+        t = self.tasks[task_id] = t.model_copy(update = {**data, "updated_at": _now()})
+        return t
+
+    async def assign_commenters(self, task_id: int, user_ids: List[int], min_comments: int) -> Optional[TaskResponse]:
+        t = self.tasks.get(task_id)
+        if t is None:
+            return None
+        for user_id in self.commenters[task_id] - set(user_ids):
+            if task_id in self.open_assignments[user_id]:
+                self.open_assignments[user_id].discard(task_id)
+                self.commenters[task_id].discard(user_id)
+        for user_id in user_ids:
+            if user_id not in self.commenters[task_id]:
+                self.commenters[task_id].add(user_id)
+                self.open_assignments[user_id].add(task_id)
+        t = self.tasks[task_id] = t.model_copy(update = {"comments_required": True, "min_comments": min_comments})
+        return t
+
+    async def get_user_roles(self, user_ids: List[int]) -> Dict[int, UserRole]:
+        return {i: self.users[i].role for i in user_ids if i in self.users}
+
+    async def add_comment(self, task_id: int, employee_id: int, comment: str) -> EmployeeCommentResponse:
+        c = EmployeeCommentResponse(id = self._id("comment"), task_id = task_id, employee_id = employee_id, comment = comment, created_at = _now(), employee_name = self._name(employee_id))
+        self.comments[task_id].append(c)
+        self.commented.add((task_id, employee_id))
+        self.open_assignments[employee_id].discard(task_id)
+        t = self.tasks[task_id]
+        self.tasks[task_id] = t.model_copy(update = {"comments_received": t.comments_received + 1})
+        return c
+
+    async def list_comments(self, task_id: int) -> List[EmployeeCommentResponse]:
+        return list(self.comments.get(task_id, ()))
+
+    async def count_comments(self, task_id: int) -> int:
+        return len(self.comments.get(task_id, ()))
+
+    async def get_review(self, task_id: int) -> Optional[ManagerReviewResponse]:
+        return self.reviews.get(task_id)
+
+    async def add_review(self, task_id: int, manager_id: int, comment: str, rating: float) -> ManagerReviewResponse:
+        r = ManagerReviewResponse(id = self._id("review"), task_id = task_id, manager_id = manager_id, comment = comment, rating = rating, created_at = _now(), manager_name = self._name(manager_id))
+        self.reviews[task_id] = r
+        await self.update_task(task_id, TaskUpdate(status = TaskStatus.completed))
+        return r
+
+    async def pending_comment_tasks(self, user_id: int) -> List[TaskResponse]:
+        tasks = (self.tasks[i] for i in self.open_assignments.get(user_id, ()))
+        pending = [t for t in tasks if t.status != TaskStatus.completed]
+        return sorted(pending, key = lambda t: (t.created_at, t.id), reverse = True)
+
+    async def count_pending_comment_tasks(self, user_id: int) -> int:
+        return len(await self.pending_comment_tasks(user_id))
+
+    async def late_commenters(self, now: datetime, department_id: Optional[int] = None) -> List[dict]:
+        rows = []
+        for user_id, task_ids in self.open_assignments.items():
+            if department_id is not None and getattr(self.users.get(user_id), "department_id", None) != department_id:
+                continue
+            for task_id in task_ids:
+                t = self.tasks[task_id]
+                if t.status != TaskStatus.completed and t.deadline is not None and t.deadline < now:
+                    rows.append((user_id, self._name(user_id), task_id, t.deadline))
+        rows.sort(key = lambda r: (r[0], r[3]))
+        return group_late_commenters(rows)
+
+    async def list_ideas(self) -> List[IdeaResponse]:
+        return list(self.ideas.values())
+
+    async def create_idea(self, idea: IdeaCreate, author_id: int) -> IdeaResponse:
+        i = IdeaResponse(**idea.model_dump(), id = self._id("idea"), author_id = author_id, author_name = self._name(author_id), status = IdeaStatus.proposed, created_at = _now())
+        self.ideas[i.id] = i
+        return i
+
+    async def set_idea_status(self, idea_id: int, status: IdeaStatus) -> Optional[IdeaResponse]:
+        i = self.ideas.get(idea_id)
+        if i is None:
+            return None
+        i = self.ideas[idea_id] = i.model_copy(update = {"status": status})
+        return i
+
+    async def task_status_counts(self, department_id: Optional[int] = None, since: Optional[datetime] = None, until: Optional[datetime] = None) -> Dict[str, int]:
+        counts = {"total": 0, **{status.value: 0 for status in TaskStatus}}
+        for t in self.tasks.values():
+            if department_id is not None and t.department_id != department_id:
+                continue
+            if not _in_range(t.created_at, since, until):
+                continue
+            counts["total"] += 1
+            counts[t.status.value] += 1
+        return counts
+
+    async def employee_performance(self, department_id: Optional[int] = None, since: Optional[datetime] = None, until: Optional[datetime] = None) -> List[dict]:
+        performance = {}
+        for task_id, r in self.reviews.items():
+            t = self.tasks[task_id]
+            user = self.users.get(t.assignee_id)
+            if t.status != TaskStatus.completed or user is None:
+                continue
+            if department_id is not None and user.department_id != department_id:
+                continue
+            if not _in_range(r.created_at, since, until):
+                continue
+            entry = performance.setdefault(t.assignee_id, {"employee_id": t.assignee_id, "employee_name": user.full_name, "total_tasks": 0, "ratings": []})
+            entry["total_tasks"] += 1
+            if r.rating is not None:
+                entry["ratings"].append(r.rating)
+        for entry in performance.values():
+            ratings = entry.pop("ratings")
+            entry["average_rating"] = sum(ratings) / len(ratings) if ratings else None
+        return list(performance.values())
@@ -0,0 +1,163 @@
+from datetime import datetime
+from typing import Dict, List, Optional
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.crud import idea as idea_crud
+from app.crud import review as review_crud
+from app.crud import task as task_crud
+from app.models.idea import Idea, IdeaStatus
+from app.models.review import EmployeeComment, ManagerReview
+from app.models.task import Task, TaskStatus
+from app.models.task_commenter import TaskCommenter
+from app.models.user import User, UserRole
+from app.repositories.base import Repository, group_late_commenters
+from app.schemas.idea import IdeaCreate, IdeaResponse
+from app.schemas.review import EmployeeCommentCreate, ManagerReviewCreate, EmployeeCommentResponse, ManagerReviewResponse
+from app.schemas.task import TaskCreate, TaskUpdate, TaskResponse
+
+def _task(task: Optional[Task]) -> Optional[TaskResponse]:
+    return TaskResponse.model_validate(task) if task is not None else None
+
+def _comment(c: EmployeeComment, employee_name: Optional[str]) -> EmployeeCommentResponse:
+    return EmployeeCommentResponse(id = c.id, task_id = c.task_id, employee_id = c.employee_id, comment = c.comment, created_at = c.created_at, employee_name = employee_name or "")
+
+def _review(r: ManagerReview, manager_name: Optional[str]) -> ManagerReviewResponse:
+    return ManagerReviewResponse(id = r.id, task_id = r.task_id, manager_id = r.manager_id, comment = r.comment or "", rating = r.rating, created_at = r.created_at, manager_name = manager_name or "")
+
+def _idea(i: Idea, author_name: Optional[str]) -> IdeaResponse:
+    return IdeaResponse(id = i.id, task_id = i.task_id, author_id = i.author_id, comment = i.comment, status = i.status, created_at = i.created_at, author_name = author_name or "")
+
+class SqlRepository(Repository):
+    """Database-backed repository on an ``AsyncSession``.
+
+    Reads are single indexed queries; writes reuse the sync crud functions
+    through ``run_sync`` so they keep the GAR aggregate hooks."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def _user_name(self, user_id: int) -> Optional[str]:
+        return await self.db.scalar(select(User.full_name).where(User.id == user_id))
+
+    async def get_task(self, task_id: int) -> Optional[TaskResponse]:
+        return _task(await self.db.get(Task, task_id))
+
+    async def create_task(self, task: TaskCreate, creator_id: int) -> TaskResponse:
+        return _task(await self.db.run_sync(task_crud.create_task, task, creator_id))
+
+    async def update_task(self, task_id: int, task_update: TaskUpdate) -> Optional[TaskResponse]:
+        return _task(await self.db.run_sync(task_crud.update_task, task_id, task_update))
+
+    async def assign_commenters(self, task_id: int, user_ids: List[int], min_comments: int) -> Optional[TaskResponse]:
+        return _task(await self.db.run_sync(task_crud.assign_commenters, task_id, user_ids, min_comments))
+
+    async def get_user_roles(self, user_ids: List[int]) -> Dict[int, UserRole]:
+        rows = await self.db.execute(select(User.id, User.role).where(User.id.in_(user_ids)))
+        return dict(rows.all())
+
+    async def add_comment(self, task_id: int, employee_id: int, comment: str) -> EmployeeCommentResponse:
+        c = await self.db.run_sync(review_crud.create_employee_comment, EmployeeCommentCreate(task_id = task_id, comment = comment), employee_id)
+        return _comment(c, await self._user_name(employee_id))
+
+    async def list_comments(self, task_id: int) -> List[EmployeeCommentResponse]:
+        rows = await self.db.execute(
+            select(EmployeeComment, User.full_name)
+            .join(User, User.id == EmployeeComment.employee_id)
+            .where(EmployeeComment.task_id == task_id)
+            .order_by(EmployeeComment.id)
+        )
+        return [_comment(c, name) for c, name in rows.all()]
+
+    async def count_comments(self, task_id: int) -> int:
+        return await self.db.scalar(select(func.count()).select_from(EmployeeComment).where(EmployeeComment.task_id == task_id))
+
+    async def get_review(self, task_id: int) -> Optional[ManagerReviewResponse]:
+        row = (await self.db.execute(
+            select(ManagerReview, User.full_name)
+            .join(User, User.id == ManagerReview.manager_id)
+            .where(ManagerReview.task_id == task_id)
+        )).first()
+        return _review(*row) if row else None
+
+    async def add_review(self, task_id: int, manager_id: int, comment: str, rating: float) -> ManagerReviewResponse:
+        r = await self.db.run_sync(review_crud.submit_manager_review, ManagerReviewCreate(task_id = task_id, comment = comment, rating = rating), manager_id)
+        return _review(r, await self._user_name(manager_id))
+
+    @staticmethod
+    def _pending_query(user_id: int, *columns):
+        # Open obligations come straight off the per-user partial index on task_commenters.
+        return (
+            select(*columns)
+            .select_from(TaskCommenter)
+            .join(Task, Task.id == TaskCommenter.task_id)
+            .where(TaskCommenter.user_id == user_id, TaskCommenter.commented_at.is_(None), Task.status != TaskStatus.completed)
+        )
+
+    async def pending_comment_tasks(self, user_id: int) -> List[TaskResponse]:
+        rows = await self.db.execute(
+            self._pending_query(user_id, Task).order_by(Task.created_at.desc(), Task.id.desc())
+        )
+        return [_task(t) for t in rows.scalars()]
+
+    async def count_pending_comment_tasks(self, user_id: int) -> int:
+        return await self.db.scalar(self._pending_query(user_id, func.count()))
+
+    async def late_commenters(self, now: datetime, department_id: Optional[int] = None) -> List[dict]:
+        q = (
+            select(TaskCommenter.user_id, User.full_name, Task.id, Task.deadline)
+            .join(Task, Task.id == TaskCommenter.task_id)
+            .join(User, User.id == TaskCommenter.user_id)
+            .where(TaskCommenter.commented_at.is_(None), Task.status != TaskStatus.completed, Task.deadline < now)
+            .order_by(TaskCommenter.user_id, Task.deadline)
+        )
+        if department_id is not None:
+            q = q.where(User.department_id == department_id)
+        return group_late_commenters(await self.db.execute(q))
+
+    async def list_ideas(self) -> List[IdeaResponse]:
+        rows = await self.db.execute(
+            select(Idea, User.full_name).join(User, User.id == Idea.author_id).order_by(Idea.id)
+        )
+        return [_idea(i, name) for i, name in rows.all()]
+
+    async def create_idea(self, idea: IdeaCreate, author_id: int) -> IdeaResponse:
+        i = await self.db.run_sync(idea_crud.create_idea, idea, author_id)
+        return _idea(i, await self._user_name(author_id))
+
+    async def set_idea_status(self, idea_id: int, status: IdeaStatus) -> Optional[IdeaResponse]:
+        i = await self.db.run_sync(idea_crud.set_idea_status, idea_id, status)
+        return _idea(i, await self._user_name(i.author_id)) if i else None
+
+    async def task_status_counts(self, department_id: Optional[int] = None, since: Optional[datetime] = None, until: Optional[datetime] = None) -> Dict[str, int]:
+        q = select(
+            func.count().label("total"),
+            *(func.count().filter(Task.status == status).label(status.value) for status in TaskStatus)
+        )
+        if department_id is not None:
+            q = q.where(Task.department_id == department_id)
+        if since is not None:
+            q = q.where(Task.created_at >= since)
+        if until is not None:
+            q = q.where(Task.created_at <= until)
+        return dict((await self.db.execute(q)).one()._mapping)
+
+    async def employee_performance(self, department_id: Optional[int] = None, since: Optional[datetime] = None, until: Optional[datetime] = None) -> List[dict]:
+        q = (
+            select(
+                Task.assignee_id.label("employee_id"),
+                User.full_name.label("employee_name"),
+                func.count().label("total_tasks"),
+                func.avg(ManagerReview.rating).label("average_rating")
+            )
+            .join(ManagerReview, ManagerReview.task_id == Task.id)
+            .join(User, User.id == Task.assignee_id)
+            .where(Task.status == TaskStatus.completed)
+            .group_by(Task.assignee_id, User.full_name)
+        )
+        if department_id is not None:
+            q = q.where(User.department_id == department_id)
+        if since is not None:
+            q = q.where(ManagerReview.created_at >= since)
+        if until is not None:
+            q = q.where(ManagerReview.created_at <= until)
+        return [dict(r._mapping) for r in await self.db.execute(q)]
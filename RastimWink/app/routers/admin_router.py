@@ -0,0 +1,79 @@
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import PlainTextResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from app.core.permissions import Action, require
+from app.core.config import settings
+from app.core.metrics import slow_requests
+from app.core.profiling import profiler
+from app.core.cache import cache_stats, clear_caches
+from app.core.password_pool import password_hasher
+from app.core.company_stats import company_stats
+from app.core.notifications import notification_hub
+from app.core.database import engine, async_engine, pool_stats, get_async_db
+from app.crud.email_outbox import outbox_status_counts
+
+router = APIRouter(prefix="/api/admin", tags=["admin"])
+
+require_admin = require(Action.ADMIN)
+
+@router.get("/cache")
+def read_cache_stats(current_user = Depends(require_admin)):
+    return {"caches": cache_stats()}
+
+@router.delete("/cache")
+def reset_caches(name: Optional[str] = None, current_user = Depends(require_admin)):
+    clear_caches(name)
+    return {"message": "cleared", "caches": cache_stats()}
+
+@router.get("/password-pool")
+def read_password_pool_stats(current_user = Depends(require_admin)):
+    return password_hasher.stats()
+
+@router.get("/db-pool")
+def read_db_pool_stats(current_user = Depends(require_admin)):
+    return {"sync": pool_stats(engine), "async": pool_stats(async_engine)}
+
+@router.get("/company-stats")
+def read_company_stats_snapshot(current_user = Depends(require_admin)):
+    return company_stats.stats()
+
+@router.get("/notifications")
+def read_notification_hub_stats(current_user = Depends(require_admin)):
+    return notification_hub.stats()
+
+@router.get("/email-outbox")
+async def read_email_outbox_stats(db: AsyncSession = Depends(get_async_db), current_user = Depends(require_admin)):
+    return await db.run_sync(outbox_status_counts)
+
+@router.get("/profile", response_class=PlainTextResponse)
+async def profile_worker(
+    seconds: float = Query(10.0, gt=0, le=settings.PROFILE_MAX_SECONDS),
+    interval_ms: float = Query(settings.PROFILE_INTERVAL_MS, ge=1, le=1000),
+    current_user = Depends(require_admin)
+):
+    """Stack samples of this worker for ``seconds``, as collapsed stacks for flamegraph.pl or speedscope"""
+    sampler = await profiler.sample(seconds, interval_ms / 1000)
+    return PlainTextResponse(sampler.collapsed(), headers={"X-Profile-Samples": str(sampler.samples)})
+
+@router.get("/profile/requests", response_class=PlainTextResponse)
+async def profile_next_requests(
+    route: str,
+    count: int = Query(1, ge=1, le=100),
+    timeout: float = Query(60.0, gt=0, le=settings.PROFILE_MAX_SECONDS),
+    interval_ms: float = Query(settings.PROFILE_INTERVAL_MS, ge=1, le=1000),
+    current_user = Depends(require_admin)
+):
+    """Stack samples of the next ``count`` requests to ``route`` (a path template, e.g. ``/api/analytics/gar``) on this worker"""
+    profile = await profiler.profile_requests(route, count, timeout, interval_ms / 1000)
+    headers = {"X-Profile-Samples": str(profile.sampler.samples), "X-Profiled-Requests": str(len(profile.requests))}
+    return PlainTextResponse(profile.sampler.collapsed(), headers=headers)
+
+@router.get("/slow-requests")
+def read_slow_requests(current_user = Depends(require_admin)):
+    return {"threshold_ms": slow_requests.threshold_ms, "requests": slow_requests.entries()}
+
+@router.delete("/slow-requests")
+def reset_slow_requests(current_user = Depends(require_admin)):
+    slow_requests.clear()
+    return {"message": "cleared"}
@@ -1,22 +1,26 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Query
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import Optional
-from pydantic import BaseModel
-from app.database import get_db
-from app.auth import get_current_user
-from app.models.user import UserRole
-from app.schemas.analytics import GARResponse
-from app.crud.gar import calculate_gar, update_gar_weights_db
+from typing import Optional, List
+from datetime import datetime, timezone
+from pydantic import BaseModel, Field
+from app.database import get_db, get_async_db
+from app.core.permissions import Access, Action, require
+from app.core.profiling import profile_request
+from app.schemas.analytics import GARResponse, GARTrendResponse
+from app.crud.aio import gar as gar_crud
+from app.repositories import Repository, get_repository
+from app.core.streaming import streaming_response
 from app.models.user import User
 
-router = APIRouter(prefix="/api/analytics", tags=["analytics"])
+router = APIRouter(prefix="/api/analytics", tags=["analytics"], dependencies=[Depends(profile_request)])
 
 @router.get("/employee/{employee_id}/gar", response_model=GARResponse)
-def employee_gar(employee_id: int, db: Session = Depends(get_db), current_user = Depends(get_current_user)):
-    if current_user.role not in [UserRole.admin, UserRole.hr, UserRole.manager] and current_user.id != employee_id:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
-    gar_res, metrics, weights = calculate_gar(db, employee_id)
-    user = db.query(User).filter(User.id == employee_id).first()
+async def employee_gar(employee_id: int, since: Optional[datetime] = None, until: Optional[datetime] = None, db: Session = Depends(get_db), access: Access = Depends(require(Action.VIEW_OWN_ANALYTICS))):
+    await access.check_employee(db, employee_id)
+    gar_res, metrics, weights = await gar_crud.get_employee_gar(db, employee_id, since, until)
+    user = await run_in_threadpool(db.get, User, employee_id)
     return {
         "employee_id": employee_id,
         "employee_name": user.full_name if user else "Unknown",
@@ -25,6 +29,57 @@ def employee_gar(employee_id: int, db: Session = Depends(get_db), current_user =
         "weights": weights
     }
 
+@router.get("/gar")
+async def gar_batch(department_id: Optional[int] = None, since: Optional[datetime] = None, until: Optional[datetime] = None, format: str = Query("json", pattern="^(json|ndjson)$"), db: Session = Depends(get_db), access: Access = Depends(require(Action.VIEW_ANALYTICS))):
+    """GAR of every employee (``GARResponse`` items), streamed as a JSON array or NDJSON."""
+    return streaming_response(gar_crud.stream_gar_batch(db, department_id=access.department_scope(department_id), since_ts=since, until_ts=until), format)
+
+@router.get("/tasks")
+async def get_task_analytics(department_id: Optional[int] = None, since: Optional[datetime] = None, until: Optional[datetime] = None, repo: Repository = Depends(get_repository), access: Access = Depends(require(Action.VIEW_ANALYTICS))):
+    """Сводка по статусам задач; ``since``/``until`` фильтруют по дате создания задачи"""
+    counts = await repo.task_status_counts(access.department_scope(department_id), since, until)
+    total_tasks = counts.pop("total")
+    completed = counts.get("completed", 0)
+
+    return {
+        "total_tasks": total_tasks,
+        "completed": completed,
+        "in_progress": counts.get("in_progress", 0),
+        "by_status": counts,
+        "completion_rate": round((completed / total_tasks * 100), 2) if total_tasks > 0 else 0
+    }
+
+@router.get("/employee-performance")
+async def get_employee_performance(department_id: Optional[int] = None, since: Optional[datetime] = None, until: Optional[datetime] = None, repo: Repository = Depends(get_repository), access: Access = Depends(require(Action.VIEW_ANALYTICS))):
+    """Аналитика производительности сотрудников по оценкам менеджеров; ``since``/``until`` фильтруют по дате оценки"""
+    return {
+        row["employee_id"]: {
+            "employee_name": row["employee_name"],
+            "total_tasks": row["total_tasks"],
+            "average_rating": round(float(row["average_rating"]), 2) if row["average_rating"] is not None else 0
+        }
+        for row in await repo.employee_performance(access.department_scope(department_id), since, until)
+    }
+
+@router.get("/late-commenters")
+async def get_late_commenters(department_id: Optional[int] = None, repo: Repository = Depends(get_repository), access: Access = Depends(require(Action.VIEW_ANALYTICS))):
+    """Сотрудники с просроченными комментариями: задача не закрыта, дедлайн прошёл, комментария нет"""
+    return await repo.late_commenters(datetime.now(timezone.utc), access.department_scope(department_id))
+
+DEFAULT_TREND_PERIODS = {"week": 52, "month": 12}
+
+@router.get("/employee/{employee_id}/gar-trend", response_model=GARTrendResponse)
+async def employee_gar_trend(employee_id: int, period: str = Query("month", pattern="^(week|month)$"), periods: Optional[int] = Query(None, ge=1, le=260), db: Session = Depends(get_db), access: Access = Depends(require(Action.VIEW_OWN_ANALYTICS))):
+    await access.check_employee(db, employee_id)
+    points = await gar_crud.get_gar_trend(db, employee_id=employee_id, period=period, periods=periods or DEFAULT_TREND_PERIODS[period])
+    return {"employee_id": employee_id, "period": period, "points": points}
+
+@router.get("/department/{department_id}/gar-trend", response_model=GARTrendResponse)
+async def department_gar_trend(department_id: int, period: str = Query("month", pattern="^(week|month)$"), periods: Optional[int] = Query(None, ge=1, le=260), db: Session = Depends(get_db), access: Access = Depends(require(Action.VIEW_ANALYTICS))):
+    access.department_scope(department_id)
+    points = await gar_crud.get_gar_trend(db, department_id=department_id, period=period, periods=periods or DEFAULT_TREND_PERIODS[period])
+    return {"department_id": department_id, "period": period, "points": points}
+
 class GARWeightsIn(BaseModel):
     TCR: Optional[float] = None
     GoalProgress: Optional[float] = None
@@ -32,10 +87,8 @@ class GARWeightsIn(BaseModel):
     Quality: Optional[float] = None
 
 @router.put("/gar-weights")
-def update_gar_weights(payload: GARWeightsIn, db: Session = Depends(get_db), current_user = Depends(get_current_user)):
-    if current_user.role != UserRole.admin:
-        raise HTTPException(status_code=403, detail="Only admin can update weights")
-    updated = update_gar_weights_db(
+async def update_gar_weights(payload: GARWeightsIn, db: AsyncSession = Depends(get_async_db), access: Access = Depends(require(Action.MANAGE_GAR_WEIGHTS))):
+    updated = await gar_crud.update_gar_weights_db(
         db,
         w_tcr = payload.TCR,
         w_goal = payload.GoalProgress,
@@ -43,3 +96,21 @@ def update_gar_weights(payload: GARWeightsIn, db: Session = Depends(get_db), cur
         w_quality = payload.Quality
     )
     return {"message": "updated", "weights": updated}
+
+class GARSimulationIn(BaseModel):
+    candidates: List[GARWeightsIn] = Field(min_length=1, max_length=100)
+    department_id: Optional[int] = None
+    since: Optional[datetime] = None
+    until: Optional[datetime] = None
+    top: Optional[int] = Field(default=None, ge=1)
+
+@router.post("/gar-weights/simulate")
+async def simulate_gar_weights_endpoint(payload: GARSimulationIn, db: Session = Depends(get_db), access: Access = Depends(require(Action.SIMULATE_GAR_WEIGHTS))):
+    return await gar_crud.simulate_gar_weights(
+        db,
+        [c.model_dump() for c in payload.candidates],
+        department_id = access.department_scope(payload.department_id),
+        since_ts = payload.since,
+        until_ts = payload.until,
+        top = payload.top
+    )
@@ -0,0 +1,24 @@
+from fastapi import APIRouter, Depends, HTTPException
+from typing import List
+from app.auth import get_current_principal
+from app.core.permissions import Action, require
+from app.models.idea import IdeaStatus
+from app.schemas.idea import IdeaCreate, IdeaResponse
+from app.repositories import Repository, get_repository
+
+router = APIRouter(prefix="/api/ideas", tags=["ideas"])
+
+@router.get("", response_model=List[IdeaResponse])
+async def get_ideas(repo: Repository = Depends(get_repository), current_user = Depends(get_current_principal)):
+    return await repo.list_ideas()
+
+@router.post("", response_model=IdeaResponse)
+async def create_idea(idea: IdeaCreate, repo: Repository = Depends(get_repository), current_user = Depends(get_current_principal)):
+    return await repo.create_idea(idea, current_user.id)
+
+@router.put("/{idea_id}/status", response_model=IdeaResponse)
+async def update_idea_status(idea_id: int, status: IdeaStatus, repo: Repository = Depends(get_repository), access = Depends(require(Action.MANAGE_IDEAS))):
+    idea = await repo.set_idea_status(idea_id, status)
+    if not idea:
+        raise HTTPException(status_code=404, detail="Idea not found")
+    return idea
@@ -0,0 +1,114 @@
+import asyncio
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from app.auth import get_current_principal
+from app.database import get_async_db
+from app.core.config import settings
+from app.core.notifications import notification_hub
+from app.core.permissions import Access, Action, require
+from app.core.streaming import dumps
+from app.crud import aio
+from app.crud.notification import notification_event
+from app.schemas.notification import NotificationBase, NotificationBulkCreate, NotificationReadRequest, NotificationResponse
+
+router = APIRouter(prefix="/api/notifications", tags=["notifications"])
+
+SSE_MEDIA_TYPE = "text/event-stream"
+
+def _sse(event: dict) -> str:
+    return f"id: {event['id']}\nevent: notification\ndata: {dumps(event)}\n\n"
+
+@router.get("", response_model=List[NotificationResponse])
+async def get_notifications(
+    before_id: Optional[int] = None,
+    unread_only: bool = False,
+    limit: int = Query(50, ge=1, le=200),
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_current_principal)
+):
+    """Уведомления текущего пользователя, новые первыми; следующая страница — ``before_id`` = последний id"""
+    return await aio.notification.get_notifications(db, current_user.id, before_id, unread_only, limit)
+
+@router.get("/unread-count")
+async def get_unread_count(db: AsyncSession = Depends(get_async_db), current_user = Depends(get_current_principal)):
+    """Число непрочитанных уведомлений (для бейджа)"""
+    return {"count": await aio.notification.count_unread_notifications(db, current_user.id)}
+
+@router.post("/bulk", response_model=List[NotificationResponse])
+async def create_notifications_bulk(data: NotificationBulkCreate, db: AsyncSession = Depends(get_async_db), access: Access = Depends(require(Action.SEND_NOTIFICATIONS))):
+    """Одно уведомление списку сотрудников (``user_ids``) или всему отделу (``department_id``)"""
+    if (data.user_ids is None) == (data.department_id is None):
+        raise HTTPException(status_code=400, detail="Specify either user_ids or department_id")
+    access.check_department(data.department_id)
+    notification = NotificationBase(**data.model_dump(exclude={"user_ids", "department_id"}))
+    if data.department_id is not None:
+        return await aio.notification.create_department_notifications(db, notification, data.department_id)
+    known = await aio.user.get_user_departments(db, data.user_ids)
+    missing = sorted(set(data.user_ids) - known.keys())
+    if missing:
+        raise HTTPException(status_code=400, detail=f"Unknown user ids: {', '.join(map(str, missing))}")
+    access.check_members(known)
+    return await aio.notification.create_notifications(db, notification, data.user_ids)
+
+@router.post("/read")
+async def mark_notifications_read(data: NotificationReadRequest, db: AsyncSession = Depends(get_async_db), current_user = Depends(get_current_principal)):
+    """Отметить прочитанными: по списку ``ids``, все до ``up_to_id`` включительно или все сразу"""
+    updated = await aio.notification.mark_notifications_read(db, current_user.id, data.ids, data.up_to_id)
+    return {"updated": updated}
+
+@router.put("/{notification_id}/read", response_model=NotificationResponse)
+async def mark_notification_read(notification_id: int, db: AsyncSession = Depends(get_async_db), current_user = Depends(get_current_principal)):
+    notification = await aio.notification.mark_notification_as_read(db, notification_id, current_user.id)
+    if not notification:
+        raise HTTPException(status_code=404, detail="Notification not found")
+    return notification
+
+@router.get("/stream")
+async def stream_notifications(
+    last_event_id: Optional[int] = Header(None),
+    after_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_current_principal)
+):
+    """Поток новых уведомлений (Server-Sent Events).
+
+    При переподключении клиент передаёт ``Last-Event-ID`` (или ``after_id``) и
+    сначала получает пропущенные уведомления из базы."""
+    last_seen = last_event_id if last_event_id is not None else after_id
+
+    async def events():
+        sub = notification_hub.subscribe(current_user.id)
+        try:
+            yield "retry: 3000\n\n"
+            # Subscribe before replaying so nothing created in between is lost;
+            # live events the replay already sent are skipped by id. Ids are
+            # not committed in order, so nothing is skipped for being below the
+            # highest replayed id: 101 may commit after 102 was replayed.
+            replayed = set()
+            after = last_seen
+            while last_seen is not None:
+                batch = await aio.notification.get_notifications_after(db, current_user.id, after, settings.NOTIFICATION_REPLAY_LIMIT)
+                for n in batch:
+                    after = n.id
+                    replayed.add(n.id)
+                    yield _sse(notification_event(n))
+                if len(batch) < settings.NOTIFICATION_REPLAY_LIMIT:
+                    break
+            # The stream outlives the request's work; don't hold a pooled connection.
+            await db.close()
+            while not sub.overflowed:
+                try:
+                    event = await asyncio.wait_for(sub.queue.get(), timeout=settings.NOTIFICATION_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                if event["id"] in replayed:
+                    replayed.discard(event["id"])
+                else:
+                    yield _sse(event)
+        finally:
+            notification_hub.unsubscribe(sub)
+
+    return StreamingResponse(events(), media_type=SSE_MEDIA_TYPE, headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
@@ -0,0 +1,201 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional, List
+from datetime import datetime
+from app.database import get_async_db
+from app.auth import get_current_principal
+from app.core.permissions import Access, Action, get_access, require
+from app.models.task import TaskStatus, TaskPriority
+from app.models.user import UserRole
+from app.schemas.task import TaskPage, TaskCreate, TaskUpdate, TaskResponse
+from app.schemas.review import EmployeeCommentBase, EmployeeCommentResponse, ManagerReviewBase, ManagerReviewResponse, TaskWithCommentsResponse
+from app.crud.aio import task as task_crud
+from app.crud.task_bulk import EXPORT_COLUMNS
+from app.core.streaming import streaming_response, parse_ndjson, parse_csv
+from app.repositories import Repository, get_repository
+
+router = APIRouter(prefix="/api/tasks", tags=["tasks"])
+
+def task_filters(
+    assignee_id: Optional[int] = None,
+    creator_id: Optional[int] = None,
+    department_id: Optional[int] = None,
+    status: Optional[List[TaskStatus]] = Query(None),
+    priority: Optional[List[TaskPriority]] = Query(None),
+    deadline_from: Optional[datetime] = None,
+    deadline_to: Optional[datetime] = None
+) -> dict:
+    return {
+        "assignee_id": assignee_id,
+        "creator_id": creator_id,
+        "department_id": department_id,
+        "statuses": status,
+        "priorities": priority,
+        "deadline_from": deadline_from,
+        "deadline_to": deadline_to
+    }
+
+@router.get("", response_model=TaskPage)
+async def list_tasks(
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    filters: dict = Depends(task_filters),
+    db: AsyncSession = Depends(get_async_db),
+    access: Access = Depends(get_access)
+):
+    try:
+        tasks, next_cursor = await task_crud.list_tasks(db, cursor = cursor, limit = limit, visible_to = access.task_visibility(), **filters)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return {"items": tasks, "next_cursor": next_cursor}
+
+@router.get("/export")
+async def export_tasks(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    filters: dict = Depends(task_filters),
+    db: AsyncSession = Depends(get_async_db),
+    access: Access = Depends(require(Action.IMPORT_EXPORT_TASKS))
+):
+    """Выгрузка задач потоком (NDJSON или CSV) без построения списка в памяти"""
+    return streaming_response(task_crud.stream_tasks(db, visible_to = access.task_visibility(), **filters), format, EXPORT_COLUMNS, filename=f"tasks.{format}")
+
+@router.post("/import")
+async def import_tasks(
+    request: Request,
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    db: AsyncSession = Depends(get_async_db),
+    access: Access = Depends(require(Action.IMPORT_EXPORT_TASKS))
+):
+    """Массовый импорт задач из NDJSON или CSV с отчётом об ошибках по строкам"""
+    parser = parse_csv if format == "csv" else parse_ndjson
+    scope = None if access.company_wide else access.department_scope()
+    return await task_crud.import_tasks(db, parser(request.stream()), access.user_id, department_scope = scope)
+
+async def _get_task_or_404(repo: Repository, task_id: int) -> TaskResponse:
+    task = await repo.get_task(task_id)
+    if not task:
+        raise HTTPException(status_code=404, detail="Task not found")
+    return task
+
+@router.get("/{task_id}", response_model=TaskResponse)
+async def get_task(task_id: int, repo: Repository = Depends(get_repository), access: Access = Depends(get_access)):
+    task = await _get_task_or_404(repo, task_id)
+    access.check_task(task)
+    return task
+
+@router.post("", response_model=TaskResponse)
+async def create_task(task: TaskCreate, repo: Repository = Depends(get_repository), db: AsyncSession = Depends(get_async_db), access: Access = Depends(require(Action.MANAGE_TASKS))):
+    access.check_department(task.department_id)
+    await access.check_employees(db, [task.assignee_id])
+    return await repo.create_task(task, access.user_id)
+
+@router.put("/{task_id}", response_model=TaskResponse)
+async def update_task(task_id: int, task_update: TaskUpdate, repo: Repository = Depends(get_repository), db: AsyncSession = Depends(get_async_db), access: Access = Depends(get_access)):
+    task = await _get_task_or_404(repo, task_id)
+    if access.can(Action.UPDATE_ANY_TASK):
+        await access.check_task_scope(db, task.department_id, task.assignee_id)
+        access.check_department(task_update.department_id)
+        await access.check_employees(db, [task_update.assignee_id])
+    elif task.assignee_id != access.user_id:
+        raise HTTPException(status_code=403, detail="Can only update own tasks")
+    return await repo.update_task(task_id, task_update)
+
+@router.post("/{task_id}/assign-commenters")
+async def assign_commenters(
+    task_id: int,
+    commenter_ids: List[int],
+    repo: Repository = Depends(get_repository),
+    db: AsyncSession = Depends(get_async_db),
+    access: Access = Depends(require(Action.MANAGE_TASKS))
+):
+    """Назначить 5 сотрудников для комментариев к задаче"""
+    if len(commenter_ids) != 5 or len(set(commenter_ids)) != 5:
+        raise HTTPException(status_code=400, detail="Exactly 5 commenters required")
+
+    task = await _get_task_or_404(repo, task_id)
+    await access.check_task_scope(db, task.department_id, task.assignee_id)
+
+    roles = await repo.get_user_roles(commenter_ids)
+    for user_id in commenter_ids:
+        if roles.get(user_id) != UserRole.employee:
+            raise HTTPException(status_code=400, detail=f"User {user_id} is not an employee")
+
+    await repo.assign_commenters(task_id, commenter_ids, 5)
+
+    return {
+        "task_id": task_id,
+        "assigned_commenters": commenter_ids,
+        "message": "5 employees assigned for comments"
+    }
+
+@router.post("/{task_id}/comments", response_model=EmployeeCommentResponse)
+async def add_employee_comment(
+    task_id: int,
+    comment_data: EmployeeCommentBase,
+    repo: Repository = Depends(get_repository),
+    current_user = Depends(get_current_principal)
+):
+    task = await _get_task_or_404(repo, task_id)
+
+    if not task.comments_required:
+        raise HTTPException(status_code=400, detail="This task doesn't require comments")
+
+    if not comment_data.comment.strip():
+        raise HTTPException(status_code=400, detail="Comment text is required")
+
+    return await repo.add_comment(task_id, current_user.id, comment_data.comment.strip())
+
+@router.get("/{task_id}/comments", response_model=TaskWithCommentsResponse)
+async def get_task_comments(task_id: int, repo: Repository = Depends(get_repository), access: Access = Depends(get_access)):
+    """Получить все комментарии для задачи"""
+    task = await _get_task_or_404(repo, task_id)
+    access.check_task(task)
+
+    task_comments = await repo.list_comments(task_id)
+    manager_review = await repo.get_review(task_id)
+
+    comments_stats = {
+        "total_comments": len(task_comments),
+        "required_comments": task.min_comments,
+        "completion_percentage": round((len(task_comments) / task.min_comments) * 100, 2) if task.min_comments > 0 else 0
+    }
+
+    return {
+        "task": task.model_dump(),
+        "employee_comments": task_comments,
+        "manager_review": manager_review,
+        "comments_stats": comments_stats
+    }
+
+@router.post("/{task_id}/manager-review", response_model=ManagerReviewResponse)
+async def submit_manager_review(
+    task_id: int,
+    review_data: ManagerReviewBase,
+    repo: Repository = Depends(get_repository),
+    db: AsyncSession = Depends(get_async_db),
+    access: Access = Depends(require(Action.REVIEW_TASKS))
+):
+    """Комментарий и оценка от начальника"""
+    task = await _get_task_or_404(repo, task_id)
+    await access.check_task_scope(db, task.department_id, task.assignee_id)
+
+    if await repo.get_review(task_id):
+        raise HTTPException(status_code=400, detail="Task already has a manager review")
+
+    comments_count = await repo.count_comments(task_id)
+    if comments_count < task.min_comments:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Need at least {task.min_comments} comments, got {comments_count}"
+        )
+
+    if review_data.rating < 1 or review_data.rating > 10:
+        raise HTTPException(status_code=400, detail="Rating must be between 1 and 10")
+
+    try:
+        return await repo.add_review(task_id, access.user_id, review_data.comment, review_data.rating)
+    except IntegrityError:
+        # A concurrent request reviewed the task after the check above.
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="Task already has a manager review")
@@ -1,5 +1,6 @@
 from pydantic import BaseModel
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
+from datetime import date
 
 class GARMetrics(BaseModel):
     TCR: str
@@ -13,3 +14,14 @@ class GARResponse(BaseModel):
     metrics: GARMetrics
     GAR: float
     weights: Dict[str, float]
+
+class GARTrendPoint(BaseModel):
+    period_start: date
+    GAR: float
+    metrics: GARMetrics
+
+class GARTrendResponse(BaseModel):
+    employee_id: Optional[int] = None
+    department_id: Optional[int] = None
+    period: str
+    points: List[GARTrendPoint]
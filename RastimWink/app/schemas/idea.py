@@ -0,0 +1,18 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Optional
+from app.models.idea import IdeaStatus
+
+class IdeaBase(BaseModel):
+    comment: str
+    task_id: Optional[int] = None
+
+class IdeaCreate(IdeaBase):
+    pass
+
+class IdeaResponse(IdeaBase):
+    id: int
+    author_id: int
+    author_name: str = ""
+    status: IdeaStatus
+    created_at: datetime
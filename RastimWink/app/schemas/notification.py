@@ -1,6 +1,6 @@
 from pydantic import BaseModel
 from datetime import datetime
-from typing import Optional
+from typing import Optional, List
 
 class NotificationBase(BaseModel):
     title: str
@@ -15,4 +15,12 @@ class NotificationResponse(NotificationBase):
     created_at: datetime
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class NotificationBulkCreate(NotificationBase):
+    user_ids: Optional[List[int]] = None
+    department_id: Optional[int] = None
+
+class NotificationReadRequest(BaseModel):
+    ids: Optional[List[int]] = None
+    up_to_id: Optional[int] = None
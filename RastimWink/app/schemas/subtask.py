@@ -0,0 +1,22 @@
+from pydantic import BaseModel
+from typing import Optional
+
+class SubtaskBase(BaseModel):
+    title: str
+    weight: float = 1.0
+
+class SubtaskCreate(SubtaskBase):
+    task_id: int
+
+class SubtaskUpdate(BaseModel):
+    title: Optional[str] = None
+    weight: Optional[float] = None
+    completed: Optional[bool] = None
+
+class SubtaskResponse(SubtaskBase):
+    id: int
+    task_id: int
+    completed: bool
+
+    class Config:
+        from_attributes = True
@@ -1,15 +1,22 @@
-from pydantic import BaseModel
-from datetime import datetime
-from typing import Optional
+from pydantic import AfterValidator, BaseModel
+from datetime import datetime, timezone
+from typing import Annotated, Optional, List
 from app.models.task import TaskStatus, TaskPriority
 
+def _assume_utc(value: datetime) -> datetime:
+    return value.replace(tzinfo = timezone.utc) if value.tzinfo is None else value
+
+# Deadlines without an offset are taken as UTC, so they compare with the aware
+# completed_at timestamps.
+UTCDateTime = Annotated[datetime, AfterValidator(_assume_utc)]
+
 class TaskBase(BaseModel):
     title: str
     description: Optional[str] = None
     priority: TaskPriority = TaskPriority.medium
     assignee_id: int
     department_id: Optional[int] = None
-    deadline: Optional[datetime] = None
+    deadline: Optional[UTCDateTime] = None
 
 class TaskCreate(TaskBase):
     pass
@@ -19,16 +26,25 @@ class TaskUpdate(BaseModel):
     description: Optional[str] = None
     status: Optional[TaskStatus] = None
     priority: Optional[TaskPriority] = None
-    asignee_id: Optional[int] = None
+    assignee_id: Optional[int] = None
     department_id: Optional[int] = None
-    deadline: Optional[datetime] = None
+    deadline: Optional[UTCDateTime] = None
 
 class TaskResponse(TaskBase):
     id: int
+    assignee_id: Optional[int] = None
     status: TaskStatus
     creator_id: int
     created_at: datetime
     updated_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+    comments_required: bool = False
+    min_comments: int = 5
+    comments_received: int = 0
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class TaskPage(BaseModel):
+    items: List[TaskResponse]
+    next_cursor: Optional[str] = None
@@ -1,5 +1,5 @@
 from email.utils import format_datetime
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, field_validator
 from datetime import datetime
 from typing import Optional
 from app.models.user import UserRole
@@ -34,4 +34,28 @@ class UserLogin(BaseModel):
 class Token(BaseModel):
     acces_token: str
     token_type: str
-    user: UserResponse
\ No newline at end of file
+    user: UserResponse
+ONBOARDING_ROLES = (UserRole.employee, UserRole.manager)
+
+class OnboardingRow(BaseModel):
+    first_name: str
+    last_name: str
+    email: EmailStr
+    role: UserRole = UserRole.employee
+    department_id: Optional[int] = None
+
+    @field_validator("role")
+    @classmethod
+    def _onboardable_role(cls, role: UserRole) -> UserRole:
+        # HR supplies the invitation address, so onboarding must not mint HR or admin accounts.
+        if role not in ONBOARDING_ROLES:
+            raise ValueError(f"role must be one of: {', '.join(r.value for r in ONBOARDING_ROLES)}")
+        return role
+
+class OnboardingResult(BaseModel):
+    row: int
+    email: str
+    status: str
+    user_id: Optional[int] = None
+    corporate_email: Optional[str] = None
+    error: Optional[str] = None
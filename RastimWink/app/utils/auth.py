@@ -1,9 +1 @@
-from passlib.context import CryptContext
-
-pwd_context = CryptContext(schemes = ["bcrypt"], deprecated = "auto")
-
-def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
-
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
\ No newline at end of file
+from app.core.security import pwd_context, get_password_hash, verify_password, verify_and_update_password
@@ -0,0 +1,111 @@
+"""Throughput and latency of DB-bound GET endpoints under concurrency.
+
+Start the build to compare on one port and the previous (sync) build on
+another, each with a single worker, then run the same load against both::
+
+    git worktree add /tmp/wink-sync <sync-commit>
+    (cd /tmp/wink-sync/RastimWink && uvicorn app.main:app --port 8001 --workers 1) &
+    uvicorn app.main:app --port 8000 --workers 1 &
+
+    python benchmarks/load_test.py --email admin@wink.ru --password admin123 \
+        --target sync=http://localhost:8001 --target async=http://localhost:8000 \
+        --concurrency 50 --concurrency 200 --concurrency 500 --duration 20
+
+The sync build runs every request in Starlette's threadpool (about 40
+threads), so its throughput flattens and its tail latency grows once the
+concurrency passes that; the async build should keep scaling until the
+database pool or the database itself is the limit.
+
+Needs ``httpx`` (``pip install httpx``).
+"""
+import argparse
+import asyncio
+import itertools
+import statistics
+import time
+import httpx
+
+DEFAULT_PATHS = [
+    "/api/stats/{employee_id}",
+    "/api/analytics/employee/{employee_id}/gar",
+    "/api/analytics/employee/{employee_id}/gar-trend",
+    "/api/users/me",
+]
+
+def percentile(values, p):
+    if not values:
+        return float("nan")
+    values = sorted(values)
+    k = max(0, min(len(values) - 1, round(p / 100 * (len(values) - 1))))
+    return values[k]
+
+async def login(client, args) -> dict:
+    r = await client.post("/api/auth/login", json = {"email": args.email, "password": args.password})
+    r.raise_for_status()
+    return {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+async def run_load(base_url: str, args, concurrency: int) -> dict:
+    limits = httpx.Limits(max_connections = concurrency, max_keepalive_connections = concurrency)
+    async with httpx.AsyncClient(base_url = base_url, timeout = args.timeout, limits = limits) as client:
+        headers = await login(client, args)
+        urls = itertools.cycle([
+            path.format(employee_id = employee_id)
+            for employee_id in args.employee_id
+            for path in args.path
+        ])
+        latencies, errors = [], 0
+        deadline = time.perf_counter() + args.duration
+
+        async def worker():
+            nonlocal errors
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                try:
+                    r = await client.get(next(urls), headers = headers)
+                    if r.status_code >= 400:
+                        errors += 1
+                        continue
+                except httpx.HTTPError:
+                    errors += 1
+                    continue
+                latencies.append(time.perf_counter() - start)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    ms = [x * 1000 for x in latencies]
+    return {
+        "requests": len(ms),
+        "errors": errors,
+        "rps": len(ms) / elapsed if elapsed else 0.0,
+        "p50": percentile(ms, 50),
+        "p95": percentile(ms, 95),
+        "p99": percentile(ms, 99),
+        "mean": statistics.fmean(ms) if ms else float("nan"),
+    }
+
+async def main(args):
+    targets = [t.split("=", 1) for t in args.target]
+    print(f"{'target':<10} {'conc':>5} {'requests':>9} {'errors':>7} {'req/s':>9} {'p50':>9} {'p95':>9} {'p99':>9}")
+    for concurrency in args.concurrency:
+        for name, url in targets:
+            r = await run_load(url, args, concurrency)
+            print(f"{name:<10} {concurrency:>5} {r['requests']:>9} {r['errors']:>7} {r['rps']:>9.1f} "
+                  f"{r['p50']:>7.1f}ms {r['p95']:>7.1f}ms {r['p99']:>7.1f}ms")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = __doc__.splitlines()[0])
+    parser.add_argument("--target", action = "append", required = True, help = "name=base_url, repeatable")
+    parser.add_argument("--email", required = True)
+    parser.add_argument("--password", required = True)
+    parser.add_argument("--path", action = "append", help = "URL template, {employee_id} is filled in; repeatable")
+    parser.add_argument("--employee-id", action = "append", type = int)
+    parser.add_argument("--concurrency", action = "append", type = int)
+    parser.add_argument("--duration", type = float, default = 15.0)
+    parser.add_argument("--timeout", type = float, default = 60.0)
+    args = parser.parse_args()
+    args.path = args.path or DEFAULT_PATHS
+    args.employee_id = args.employee_id or [3, 4, 5]
+    args.concurrency = args.concurrency or [50, 200]
+    asyncio.run(main(args))
@@ -0,0 +1,95 @@
+"""Latency of a non-auth endpoint while a burst of logins hits the server.
+
+Run against a live server (``uvicorn app.main:app``), once before and once
+after a change, and compare the percentiles::
+
+    python benchmarks/login_burst.py --base-url http://localhost:8000 \
+        --email employee1@wink.ru --password employee123 --logins 200
+
+Needs ``httpx`` (``pip install httpx``).
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import httpx
+
+def percentile(values, p):
+    if not values:
+        return float("nan")
+    values = sorted(values)
+    k = max(0, min(len(values) - 1, round(p / 100 * (len(values) - 1))))
+    return values[k]
+
+def summary(name, latencies, errors):
+    ms = [x * 1000 for x in latencies]
+    print(f"{name:<10} n={len(ms):<5} errors={errors:<4} "
+          f"p50={percentile(ms, 50):8.1f}ms p95={percentile(ms, 95):8.1f}ms p99={percentile(ms, 99):8.1f}ms "
+          f"max={max(ms, default=float('nan')):8.1f}ms mean={statistics.fmean(ms) if ms else float('nan'):8.1f}ms")
+
+async def login_storm(client, args, results):
+    sem = asyncio.Semaphore(args.login_concurrency)
+
+    async def one():
+        async with sem:
+            start = time.perf_counter()
+            try:
+                r = await client.post("/api/auth/login", json = {"email": args.email, "password": args.password})
+                results["login_status"][r.status_code] = results["login_status"].get(r.status_code, 0) + 1
+            except httpx.HTTPError:
+                results["login_errors"] += 1
+                return
+            results["login"].append(time.perf_counter() - start)
+
+    await asyncio.gather(*(one() for _ in range(args.logins)))
+
+async def probe(client, args, headers, results, stop):
+    while not stop.is_set():
+        start = time.perf_counter()
+        try:
+            r = await client.get(args.probe_path, headers = headers)
+            if r.status_code >= 400:
+                results["probe_errors"] += 1
+            else:
+                results["probe"].append(time.perf_counter() - start)
+        except httpx.HTTPError:
+            results["probe_errors"] += 1
+        await asyncio.sleep(args.probe_interval)
+
+async def main(args):
+    results = {"login": [], "login_errors": 0, "login_status": {}, "probe": [], "probe_errors": 0}
+    limits = httpx.Limits(max_connections = args.login_concurrency + 8)
+    async with httpx.AsyncClient(base_url = args.base_url, timeout = 60, limits = limits) as client:
+        r = await client.post("/api/auth/login", json = {"email": args.email, "password": args.password})
+        r.raise_for_status()
+        headers = {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+        baseline = {"probe": [], "probe_errors": 0}
+        stop = asyncio.Event()
+        task = asyncio.create_task(probe(client, args, headers, baseline, stop))
+        await asyncio.sleep(args.warmup)
+        stop.set()
+        await task
+
+        stop = asyncio.Event()
+        task = asyncio.create_task(probe(client, args, headers, results, stop))
+        await login_storm(client, args, results)
+        stop.set()
+        await task
+
+    summary("idle", baseline["probe"], baseline["probe_errors"])
+    summary("burst", results["probe"], results["probe_errors"])
+    summary("login", results["login"], results["login_errors"])
+    print("login status codes:", results["login_status"])
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = __doc__.splitlines()[0])
+    parser.add_argument("--base-url", default = "http://localhost:8000")
+    parser.add_argument("--email", required = True)
+    parser.add_argument("--password", required = True)
+    parser.add_argument("--logins", type = int, default = 200)
+    parser.add_argument("--login-concurrency", type = int, default = 50)
+    parser.add_argument("--probe-path", default = "/api/users/me")
+    parser.add_argument("--probe-interval", type = float, default = 0.01)
+    parser.add_argument("--warmup", type = float, default = 3.0)
+    asyncio.run(main(parser.parse_args()))
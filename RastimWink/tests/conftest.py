@@ -0,0 +1,24 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from app.database import Base
+from app.models.department import Department
+from app.models.user import User, UserRole
+
+@pytest.fixture
+def db():
+    """Session on a fresh in-memory SQLite database with two departments and
+    four employees (ids 1-4, departments 1, 2, 1, 2)."""
+    engine = create_engine("sqlite://", poolclass = StaticPool, connect_args = {"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind = engine, autoflush = False)()
+    session.add_all([Department(id = 1, name = "d1"), Department(id = 2, name = "d2")])
+    session.add_all([
+        User(id = i, email = f"u{i}@example.com", full_name = f"User {i}", password_hash = "x", role = UserRole.employee, department_id = 2 - i % 2)
+        for i in range(1, 5)
+    ])
+    session.commit()
+    yield session
+    session.close()
+    engine.dispose()
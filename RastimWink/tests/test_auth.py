@@ -0,0 +1,30 @@
+import asyncio
+from types import SimpleNamespace
+import pytest
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+from jose import jwt
+from app import auth
+
+def user_and_token(claims: dict, token_version: int):
+    async def get_cached_user_by_id(db, user_id):
+        return SimpleNamespace(id = user_id, token_version = token_version)
+
+    credentials = HTTPAuthorizationCredentials(scheme = "Bearer", credentials = jwt.encode(claims, auth.SECRET_KEY, algorithm = auth.ALGORITHM))
+    return get_cached_user_by_id, credentials
+
+@pytest.mark.parametrize("claims, token_version, ok", [
+    ({"sub": "1", "ver": 2}, 2, True),
+    ({"sub": "1", "ver": 1}, 2, False),
+    ({"sub": "1"}, 0, True),
+    # Issued before token versions existed, then the user logged out.
+    ({"sub": "1"}, 1, False),
+])
+def test_token_version_is_checked(monkeypatch, claims, token_version, ok):
+    lookup, credentials = user_and_token(claims, token_version)
+    monkeypatch.setattr(auth.aio.user, "get_cached_user_by_id", lookup)
+    if ok:
+        assert asyncio.run(auth.get_current_user(credentials, db = None)).id == 1
+    else:
+        with pytest.raises(HTTPException):
+            asyncio.run(auth.get_current_user(credentials, db = None))
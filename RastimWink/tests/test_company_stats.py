@@ -0,0 +1,26 @@
+import asyncio
+from app.core import company_stats as company_stats_module
+from app.core.company_stats import CompanyStatsSnapshot
+
+class FakeSession:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+def test_concurrent_cold_reads_share_one_refresh(monkeypatch):
+    async def get_company_stats(db):
+        await asyncio.sleep(0.01)
+        return {"employees": 3}
+
+    monkeypatch.setattr(company_stats_module, "AsyncSessionLocal", FakeSession)
+    monkeypatch.setattr(company_stats_module, "get_company_stats", get_company_stats)
+    snapshot = CompanyStatsSnapshot()
+
+    async def scenario():
+        return await asyncio.gather(*(snapshot.get() for _ in range(10)))
+
+    results = asyncio.run(scenario())
+    assert snapshot.refreshes == 1
+    assert all(r["employees"] == 3 for r in results)
@@ -0,0 +1,101 @@
+import socketserver
+import threading
+import pytest
+from sqlalchemy.orm import sessionmaker
+from app.crud.email_outbox import claim_emails, enqueue_email, mark_sent
+from app.email_service import SMTPPool
+from app.email_worker import EmailWorker
+from app.models.email_outbox import EmailOutbox, EmailStatus
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+    """Just enough SMTP for smtplib. Recipients containing ``busy`` get a
+    temporary 451, ``bounce`` a permanent 550."""
+
+    def reply(self, line: str):
+        self.wfile.write(line.encode() + b"\r\n")
+
+    def handle(self):
+        self.server.connections += 1
+        self.reply("220 test")
+        for raw in self.rfile:
+            command = raw.decode().strip()
+            verb = command[:4].upper()
+            if verb == "QUIT":
+                self.reply("221 bye")
+                return
+            if verb == "RCPT":
+                self.reply("451 try later" if "busy" in command else "550 no such user" if "bounce" in command else "250 ok")
+            elif verb == "DATA":
+                self.reply("354 go ahead")
+                for line in self.rfile:
+                    if line == b".\r\n":
+                        break
+                self.server.delivered += 1
+                self.reply("250 queued")
+            else:
+                self.reply("250 ok")
+
+class SMTPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    connections = 0
+    delivered = 0
+
+@pytest.fixture
+def smtp_server():
+    server = SMTPServer(("127.0.0.1", 0), SMTPHandler)
+    thread = threading.Thread(target = server.serve_forever, daemon = True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+@pytest.fixture
+def worker(db, smtp_server):
+    pool = SMTPPool(1, host = "127.0.0.1", port = smtp_server.server_address[1], user = None, starttls = False, timeout = 5)
+    worker = EmailWorker(sessionmaker(bind = db.get_bind()), pool, max_attempts = 2, retry_base = 0, retry_max = 0)
+    yield worker
+    worker.close()
+
+def outbox(db) -> dict:
+    db.expire_all()
+    return {e.to_email: (e.status, e.attempts) for e in db.query(EmailOutbox)}
+
+def test_worker_sends_retries_and_gives_up_over_one_connection(db, smtp_server, worker):
+    for to in ("a@example.com", "b@example.com", "busy@example.com", "bounce@example.com"):
+        enqueue_email(db, to, "subject", "body")
+    db.commit()
+
+    assert worker.run_once() == 4
+    assert outbox(db) == {
+        "a@example.com": (EmailStatus.sent, 1),
+        "b@example.com": (EmailStatus.sent, 1),
+        "busy@example.com": (EmailStatus.pending, 1),
+        "bounce@example.com": (EmailStatus.failed, 1),
+    }
+    # The temporary failure is retried, then given up after max_attempts.
+    assert worker.run_once() == 1
+    assert outbox(db)["busy@example.com"] == (EmailStatus.failed, 2)
+    assert worker.run_once() == 0
+
+    assert smtp_server.delivered == 2
+    assert smtp_server.connections == 1
+    assert worker.metrics["sent"] == 2 and worker.metrics["retried"] == 1 and worker.metrics["failed"] == 2
+
+def test_worker_stops_sending_when_its_lease_runs_out(db, smtp_server, worker):
+    enqueue_email(db, "a@example.com", "subject", "body")
+    db.commit()
+    worker.lease_seconds = 0
+
+    assert worker.run_once() == 1
+    assert smtp_server.delivered == 0
+    assert outbox(db)["a@example.com"] == (EmailStatus.sending, 1)
+    assert worker.metrics["expired"] == 1
+
+def test_outcome_of_a_lost_lease_is_not_recorded(db):
+    enqueue_email(db, "a@example.com", "subject", "body")
+    db.commit()
+    [stale] = claim_emails(db, 10, lease_seconds = -1)
+    [current] = claim_emails(db, 10, lease_seconds = 300)
+
+    assert mark_sent(db, [stale.id], stale.locked_until) == 0
+    assert mark_sent(db, [current.id], current.locked_until) == 1
@@ -0,0 +1,50 @@
+from datetime import datetime, timedelta, timezone
+from app.crud import review as review_crud
+from app.crud import subtask as subtask_crud
+from app.crud import task as task_crud
+from app.crud.gar import calculate_gar, calculate_gar_batch
+from app.crud.gar_aggregate import check_gar_aggregates, get_gar_from_aggregate
+from app.models.task import TaskStatus
+from app.schemas.review import ManagerReviewCreate
+from app.schemas.subtask import SubtaskCreate, SubtaskUpdate
+from app.schemas.task import TaskCreate, TaskUpdate
+
+def seed_tasks(db):
+    """A mix of open, completed, late, reviewed and reassigned tasks with subtasks."""
+    now = datetime.now(timezone.utc)
+    tasks = [
+        task_crud.create_task(db, TaskCreate(title = f"t{i}", assignee_id = 1 + i % 4, deadline = now + timedelta(days = i - 3)), creator_id = 1)
+        for i in range(8)
+    ]
+    subtasks = []
+    for task in tasks[:4]:
+        subtasks.append(subtask_crud.create_subtask(db, SubtaskCreate(task_id = task.id, title = "a", weight = 2)))
+        subtasks.append(subtask_crud.create_subtask(db, SubtaskCreate(task_id = task.id, title = "b")))
+    subtask_crud.set_subtask_completed(db, subtasks[0].id)
+    subtask_crud.set_subtask_completed(db, subtasks[2].id)
+    subtask_crud.update_subtask(db, subtasks[3].id, SubtaskUpdate(weight = 3))
+    subtask_crud.delete_subtask(db, subtasks[4].id)
+    task_crud.update_task(db, tasks[1].id, TaskUpdate(status = TaskStatus.completed))
+    task_crud.update_task(db, tasks[5].id, TaskUpdate(status = TaskStatus.completed))
+    task_crud.update_task(db, tasks[2].id, TaskUpdate(assignee_id = 3))
+    review_crud.submit_manager_review(db, ManagerReviewCreate(task_id = tasks[3].id, comment = "ok", rating = 4), manager_id = 2)
+    review_crud.submit_manager_review(db, ManagerReviewCreate(task_id = tasks[6].id, comment = "late", rating = 2.5), manager_id = 2)
+    task_crud.update_task(db, tasks[6].id, TaskUpdate(deadline = now - timedelta(days = 30)))
+    task_crud.delete_task(db, tasks[7].id)
+    return tasks
+
+def test_writes_keep_the_aggregates_in_step(db):
+    seed_tasks(db)
+    assert check_gar_aggregates(db) == []
+    for employee_id in range(1, 5):
+        assert get_gar_from_aggregate(db, employee_id)[0]["GAR"] == calculate_gar(db, employee_id)[0]["GAR"]
+
+def test_batch_equals_per_employee(db):
+    seed_tasks(db)
+    since = datetime.now(timezone.utc) - timedelta(days = 1)
+    for window in ({}, {"since_ts": since}):
+        batch = calculate_gar_batch(db, employee_ids = range(1, 5), **window)
+        assert batch == {employee_id: calculate_gar(db, employee_id, **window) for employee_id in range(1, 5)}
+    department = calculate_gar_batch(db, department_id = 1)
+    assert set(department) == {1, 3}
+    assert department == {employee_id: calculate_gar(db, employee_id) for employee_id in (1, 3)}
@@ -0,0 +1,148 @@
+import asyncio
+from types import SimpleNamespace
+import pytest
+from app.auth import Principal
+from app.core.notifications import MemoryBroker, NotificationHub
+from app.crud.notification import EVENT_COLUMNS
+from app.models.user import UserRole
+from app.routers import notifications_router
+
+def event(id: int, user_id: int = 1) -> dict:
+    return {"id": id, "user_id": user_id, "title": "t", "message": "m", "type": "info", "related_entity_id": None, "is_read": False, "created_at": None}
+
+def row(id: int, user_id: int = 1):
+    return SimpleNamespace(**{c: event(id, user_id)[c] for c in EVENT_COLUMNS})
+
+class FakeSession:
+    closed = False
+
+    async def close(self):
+        self.closed = True
+
+async def next_event(stream, timeout: float = 1.0) -> str:
+    """Next ``notification`` SSE frame, skipping the retry hint and keep-alives."""
+    while True:
+        frame = await asyncio.wait_for(stream.__anext__(), timeout)
+        if frame.startswith("id: "):
+            return frame
+
+def frame_id(frame: str) -> int:
+    return int(frame.split("\n", 1)[0][len("id: "):])
+
+@pytest.fixture
+def hub(monkeypatch):
+    hub = NotificationHub(MemoryBroker(), queue_size = 3)
+    monkeypatch.setattr(notifications_router, "notification_hub", hub)
+    return hub
+
+@pytest.fixture
+def stored(monkeypatch):
+    """Notifications the replay reads, as if already committed."""
+    rows = []
+
+    async def get_notifications_after(db, user_id, after_id, limit):
+        return [r for r in rows if r.user_id == user_id and r.id > after_id][:limit]
+
+    monkeypatch.setattr(notifications_router.aio.notification, "get_notifications_after", get_notifications_after)
+    return rows
+
+async def open_stream(user_id: int = 1, last_event_id = None, db = None):
+    user = Principal(id = user_id, role = UserRole.employee, department_id = None, token_version = 0)
+    response = await notifications_router.stream_notifications(last_event_id = last_event_id, after_id = None, db = db or FakeSession(), current_user = user)
+    return response.body_iterator
+
+def test_hub_fans_out_to_every_stream_of_the_recipient_across_hubs():
+    async def scenario():
+        broker = MemoryBroker()
+        worker_a, worker_b = NotificationHub(broker), NotificationHub(broker)
+        await worker_a.start()
+        await worker_b.start()
+        first, second = worker_a.subscribe(1), worker_b.subscribe(1)
+        other = worker_b.subscribe(2)
+
+        worker_a.publish(event(10, user_id = 1))
+        await asyncio.sleep(0)
+
+        assert (await first.queue.get())["id"] == 10
+        assert (await second.queue.get())["id"] == 10
+        assert other.queue.empty()
+        worker_b.unsubscribe(second)
+        assert worker_b.stats()["streams"] == 1
+        await worker_a.stop()
+        await worker_b.stop()
+
+    asyncio.run(scenario())
+
+def test_publish_before_start_is_dropped():
+    hub = NotificationHub(MemoryBroker())
+    sub = hub.subscribe(1)
+    hub.publish(event(1))
+    assert sub.queue.empty() and hub.published == 0
+
+def test_stream_replays_after_last_event_id_then_skips_replayed_live_events(hub, stored):
+    async def scenario():
+        await hub.start()
+        stored.extend([row(1), row(2), row(3)])
+        db = FakeSession()
+        stream = await open_stream(last_event_id = 1, db = db)
+
+        assert [frame_id(await next_event(stream)) for _ in range(2)] == [2, 3]
+        # A live copy of a replayed notification is not sent twice.
+        hub.publish(event(3))
+        hub.publish(event(4))
+        await asyncio.sleep(0)
+        assert frame_id(await next_event(stream)) == 4
+        assert db.closed
+        await stream.aclose()
+        assert hub.stats()["streams"] == 0
+
+    asyncio.run(scenario())
+
+def test_stream_keeps_live_events_below_the_highest_replayed_id(hub, stored):
+    async def scenario():
+        await hub.start()
+        stored.extend([row(2), row(5)])
+        stream = await open_stream(last_event_id = 1)
+
+        assert [frame_id(await next_event(stream)) for _ in range(2)] == [2, 5]
+        # 4 committed after the replay read 5; only 5 itself is a duplicate.
+        hub.publish(event(5))
+        hub.publish(event(4))
+        await asyncio.sleep(0)
+        assert frame_id(await next_event(stream)) == 4
+        await stream.aclose()
+
+    asyncio.run(scenario())
+
+def test_stream_keeps_live_events_committed_out_of_id_order(hub, stored):
+    async def scenario():
+        await hub.start()
+        stream = await open_stream()
+        await asyncio.wait_for(stream.__anext__(), 1)  # retry hint; subscribed from here on
+
+        hub.publish(event(102))
+        hub.publish(event(101))
+        await asyncio.sleep(0)
+        assert [frame_id(await next_event(stream)) for _ in range(2)] == [102, 101]
+        await stream.aclose()
+
+    asyncio.run(scenario())
+
+def test_stream_ends_when_the_client_falls_behind(hub, stored):
+    async def scenario():
+        await hub.start()
+        stream = await open_stream()
+        await asyncio.wait_for(stream.__anext__(), 1)
+
+        for i in range(1, 6):  # queue_size is 3
+            hub.publish(event(i))
+        await asyncio.sleep(0)
+        assert hub.overflows == 2
+
+        # The queued events are not delivered: the stream ends so the client
+        # reconnects with Last-Event-ID and replays from the database.
+        with pytest.raises(StopAsyncIteration):
+            await next_event(stream)
+        assert hub.stats()["streams"] == 0
+
+    asyncio.run(scenario())
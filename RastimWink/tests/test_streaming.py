@@ -0,0 +1,24 @@
+import asyncio
+from app.core.streaming import parse_csv, parse_ndjson
+
+async def chunked(*chunks: bytes):
+    for chunk in chunks:
+        yield chunk
+
+def parse(parser, *chunks: bytes) -> list:
+    async def collect():
+        return [item async for item in parser(chunked(*chunks))]
+    return asyncio.run(collect())
+
+def test_csv_header_after_byte_order_mark():
+    body = "\ufefftitle,priority\nЗадача,high\n".encode("utf-8")
+    assert parse(parse_csv, body) == [(2, {"title": "Задача", "priority": "high"}, None)]
+
+def test_invalid_bytes_are_reported_per_line():
+    rows = parse(parse_ndjson, b'{"title": "a"}\n{"title": "\xff"}\n', b'{"title": "c"}\n')
+    assert [(n, record) for n, record, _ in rows] == [(1, {"title": "a"}), (2, None), (3, {"title": "c"})]
+    assert rows[1][2].startswith("Invalid utf-8")
+
+def test_multibyte_character_split_across_chunks():
+    body = 'title\n"Ёж"\n'.encode("utf-8")
+    assert parse(parse_csv, body[:8], body[8:]) == [(2, {"title": "Ёж"}, None)]
@@ -0,0 +1,17 @@
+from datetime import datetime, timezone
+from app.crud import task as task_crud
+from app.models.task import TaskStatus
+from app.schemas.task import TaskCreate, TaskUpdate
+
+def test_naive_deadline_is_taken_as_utc():
+    update = TaskUpdate(deadline = "2025-03-01T12:00:00")
+    assert update.deadline == datetime(2025, 3, 1, 12, tzinfo = timezone.utc)
+
+def test_completing_a_task_with_a_naive_deadline(db):
+    task = task_crud.create_task(db, TaskCreate(title = "t", assignee_id = 1), creator_id = 1)
+
+    # Used to raise TypeError comparing the aware completed_at with a naive deadline.
+    updated = task_crud.update_task(db, task.id, TaskUpdate.model_validate({"status": "completed", "deadline": "2099-01-01T00:00:00"}))
+
+    assert updated.status == TaskStatus.completed
+    assert updated.deadline.replace(tzinfo = None) == datetime(2099, 1, 1)
@@ -0,0 +1,16 @@
+from app.crud import invitations as invitation_crud
+from app.crud import user as user_crud
+from app.models.user import User, UserRole
+from app.schemas.stats import InvitationCreate
+
+def test_login_email_of_an_activated_invitee_is_taken(db):
+    # Activated through an invitation before corporate_email was filled in.
+    db.add(User(email = "ivan.petrov@wink.ru", full_name = "Ivan Petrov", password_hash = "x", role = UserRole.employee, department_id = 1))
+    db.commit()
+    assert user_crud.allocate_corporate_emails(db, ["ivan.petrov", "ivan.petrov"]) == ["ivan.petrov1@wink.ru", "ivan.petrov2@wink.ru"]
+
+def test_activated_invitation_keeps_the_corporate_address(db):
+    invitation = invitation_crud.create_invitation(db, InvitationCreate(email = "anna@example.com", full_name = "Anna Smirnova"), invited_by = 1)
+    user = invitation_crud.activate_invitation(db, invitation.token, "x")
+    assert user.corporate_email == user.email == "anna.smirnova@wink.ru"
+    assert user_crud.allocate_corporate_emails(db, ["anna.smirnova"]) == ["anna.smirnova1@wink.ru"]